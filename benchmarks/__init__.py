@@ -0,0 +1,7 @@
+"""
+Benchmark suite for the document processing pipeline.
+
+The suite generates a seeded synthetic corpus (see ``corpus.py``), times each
+public pipeline stage (see ``run_benchmarks.py``) and compares the stored JSON
+results against a baseline (see ``compare.py``).
+"""
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Compare bundle rendering with one PDF per document.
+
+The separate mode renders every document of a corpus kind with
+``markdown_to_pdf`` through WeasyPrint, as a statement pack was produced
+before bundles; the bundle mode lays them all out with
+``markdown_to_pdf_bundle`` in one pass.
+"""
+import contextlib
+import io
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add the project root to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.corpus import generate_corpus  # noqa: E402
+from enclose.converters.markdown_converter import (  # noqa: E402
+    markdown_to_pdf,
+    markdown_to_pdf_bundle,
+)
+
+# Corpus kinds made of many documents
+BUNDLE_KINDS = ['small_notes', 'code_heavy', 'image_heavy']
+MODES = ['separate', 'bundle']
+
+
+def _render(mode, files, output_dir):
+    if mode == 'bundle':
+        return [markdown_to_pdf_bundle(files, output_dir)]
+    return [markdown_to_pdf(f, output_dir, pdf_backend='weasyprint') for f in files]
+
+
+def benchmark_bundle(
+    corpus_dir: str = "benchmarks/corpus",
+    seed: int = 42,
+    scale: float = 1.0,
+    kinds: Optional[List[str]] = None,
+    repeat: int = 3,
+) -> Dict[str, Any]:
+    """Time separate renders against one bundle render.
+
+    Returns:
+        Results dictionary: mode -> kind -> timing record
+    """
+    kinds = kinds or BUNDLE_KINDS
+    corpus = generate_corpus(corpus_dir, seed, scale, kinds)
+
+    results: Dict[str, Any] = {mode: {} for mode in MODES}
+    with tempfile.TemporaryDirectory() as output_dir:
+        for kind, files in corpus.items():
+            for mode in MODES:
+                runs = []
+                sizes = 0
+                for _ in range(repeat):
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        start = time.perf_counter()
+                        pdfs = _render(mode, files, output_dir)
+                        runs.append(time.perf_counter() - start)
+                    sizes = sum(Path(pdf).stat().st_size for pdf in pdfs)
+                median = statistics.median(runs)
+                results[mode][kind] = {
+                    'runs': runs,
+                    'median_s': median,
+                    'docs': len(files),
+                    'docs_per_s': len(files) / median if median else None,
+                    'output_bytes': sizes,
+                }
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare bundle and per-document PDF rendering')
+    parser.add_argument('--output', default='benchmarks/results/bundle.json',
+                        help='Where to write the JSON results')
+    parser.add_argument('--corpus-dir', default='benchmarks/corpus',
+                        help='Directory for the generated corpus')
+    parser.add_argument('--seed', type=int, default=42, help='Corpus seed (default: 42)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Corpus size multiplier (default: 1.0)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Timed runs per mode (default: 3)')
+    parser.add_argument('--kinds', nargs='+', choices=BUNDLE_KINDS,
+                        help='Subset of corpus kinds to benchmark')
+
+    args = parser.parse_args()
+    results = benchmark_bundle(
+        args.corpus_dir, args.seed, args.scale, args.kinds, args.repeat,
+    )
+
+    print(f"{'Corpus':<14} {'Separate':>10} {'Bundle':>10} {'Speedup':>8} {'Size':>8}")
+    print("-" * 54)
+    for kind in results['separate']:
+        separate = results['separate'][kind]
+        bundle = results['bundle'][kind]
+        speedup = f"{separate['median_s'] / bundle['median_s']:.2f}x" if bundle['median_s'] else "-"
+        size = f"{bundle['output_bytes'] / separate['output_bytes']:.0%}" if separate['output_bytes'] else "-"
+        print(f"{kind:<14} {separate['median_s']:>9.3f}s {bundle['median_s']:>9.3f}s "
+              f"{speedup:>8} {size:>8}")
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved results: {output_path}")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Compare benchmark results against a baseline and flag regressions.
+
+A stage/corpus pair regresses when its median time grows by more than the
+relative threshold *and* by more than the absolute noise floor. A pair
+without a timing in either file (the stage failed) counts as an error. The
+script exits with status 1 when any regression or error is found so it can
+gate CI.
+"""
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Load a results file written by ``run_benchmarks.py``."""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = 0.10,
+    min_delta: float = 0.05,
+) -> List[Dict[str, Any]]:
+    """Compare two results dictionaries.
+
+    Args:
+        baseline: Baseline results
+        current: Current results
+        threshold: Relative slowdown that counts as a regression (0.10 = 10%)
+        min_delta: Absolute slowdown in seconds below which changes are noise
+
+    Returns:
+        One row per stage/corpus pair present in both results, with a
+        ``status`` of ``regression``, ``improvement``, ``unchanged`` or ``error``
+    """
+    rows = []
+    for stage, kinds in current.get('results', {}).items():
+        for kind, record in kinds.items():
+            base = baseline.get('results', {}).get(stage, {}).get(kind)
+            if base is None:
+                continue
+
+            row = {'stage': stage, 'kind': kind}
+            if 'median_s' not in record or 'median_s' not in base:
+                row['status'] = 'error'
+                row['error'] = record.get('error') or base.get('error')
+                rows.append(row)
+                continue
+
+            before = base['median_s']
+            after = record['median_s']
+            delta = after - before
+            ratio = after / before if before else float('inf')
+            row.update({'baseline_s': before, 'current_s': after, 'ratio': ratio})
+
+            if delta > min_delta and ratio > 1 + threshold:
+                row['status'] = 'regression'
+            elif -delta > min_delta and ratio < 1 - threshold:
+                row['status'] = 'improvement'
+            else:
+                row['status'] = 'unchanged'
+            rows.append(row)
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]]) -> None:
+    """Print comparison rows as a table."""
+    print(f"{'Stage':<20} {'Corpus':<14} {'Baseline':>10} {'Current':>10} {'Ratio':>7}  Status")
+    print("-" * 80)
+    for row in rows:
+        if row['status'] == 'error':
+            print(f"{row['stage']:<20} {row['kind']:<14} {'-':>10} {'-':>10} {'-':>7}  "
+                  f"error: {row['error']}")
+            continue
+        print(f"{row['stage']:<20} {row['kind']:<14} {row['baseline_s']:>9.3f}s "
+              f"{row['current_s']:>9.3f}s {row['ratio']:>6.2f}x  {row['status']}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare benchmark results against a baseline')
+    parser.add_argument('baseline', help='Baseline results JSON')
+    parser.add_argument('current', help='Current results JSON')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Relative slowdown flagged as a regression (default: 0.10)')
+    parser.add_argument('--min-delta', type=float, default=0.05,
+                        help='Absolute slowdown in seconds ignored as noise (default: 0.05)')
+
+    args = parser.parse_args()
+    if not Path(args.baseline).exists():
+        print(f"Baseline not found: {args.baseline}", file=sys.stderr)
+        print("Run 'make bench-baseline' first", file=sys.stderr)
+        sys.exit(2)
+
+    rows = compare_results(
+        load_results(args.baseline), load_results(args.current),
+        args.threshold, args.min_delta,
+    )
+    print_comparison(rows)
+
+    regressions = [row for row in rows if row['status'] == 'regression']
+    errors = [row for row in rows if row['status'] == 'error']
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) above {args.threshold:.0%}")
+    if errors:
+        print(f"\n❌ {len(errors)} stage(s) failed to run")
+    if regressions or errors:
+        sys.exit(1)
+    print("\n✅ No regressions")
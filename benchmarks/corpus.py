@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Seeded synthetic corpus generator for benchmarks.
+
+Every corpus kind is generated from a ``random.Random`` seeded with the
+corpus seed, so the same seed and scale always produce byte-identical
+Markdown files and images.
+"""
+import json
+import random
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from PIL import Image, ImageDraw
+
+WORDS = (
+    "invoice payment customer service document amount total period report "
+    "account balance summary delivery contract order tax rate quantity item "
+    "section review analysis revenue process pipeline system archive record "
+    "detail statement budget forecast quarter annual monthly schedule entry"
+).split()
+
+CODE_LINES = [
+    "def process(items):",
+    "    total = 0",
+    "    for item in items:",
+    "        total += item.amount * item.quantity",
+    "    return total",
+    "",
+    "class Invoice:",
+    "    def __init__(self, number, lines):",
+    "        self.number = number",
+    "        self.lines = list(lines)",
+    "",
+    "result = {key: value for key, value in zip(keys, values)}",
+    "print(f\"Processed {len(result)} records\")",
+]
+
+# Rough number of Markdown words WeasyPrint fits on one A4 page with the
+# default stylesheet; used to size the large report.
+WORDS_PER_PAGE = 450
+
+# Corpus kinds, in the order they are generated and reported
+CORPUS_KINDS = [
+    'small_notes',
+    'large_report',
+    'huge_table',
+    'code_heavy',
+    'image_heavy',
+]
+
+
+def _sentence(rng: random.Random, min_words: int = 6, max_words: int = 18) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(rng: random.Random, sentences: int = 4) -> str:
+    return " ".join(_sentence(rng) for _ in range(sentences))
+
+
+def _scaled(value: int, scale: float) -> int:
+    return max(1, int(round(value * scale)))
+
+
+def _write(path: Path, content: str) -> Path:
+    path.write_text(content, encoding='utf-8')
+    return path
+
+
+def generate_small_notes(output_dir: Path, rng: random.Random, scale: float) -> List[Path]:
+    """Generate many short notes, similar to a bulk invoice run."""
+    files = []
+    for i in range(_scaled(50, scale)):
+        lines = [f"# Note {i + 1}", "", _paragraph(rng, 3), ""]
+        for _ in range(rng.randint(2, 5)):
+            lines.append(f"- {_sentence(rng, 3, 8)}")
+        lines.append("")
+        files.append(_write(output_dir / f"note_{i + 1:04d}.md", "\n".join(lines)))
+    return files
+
+
+def generate_large_report(output_dir: Path, rng: random.Random, scale: float) -> List[Path]:
+    """Generate a single report of roughly 500 pages at scale 1.0."""
+    target_words = _scaled(500 * WORDS_PER_PAGE, scale)
+    lines = ["# Annual Report", ""]
+    words = 0
+    chapter = 0
+    while words < target_words:
+        chapter += 1
+        lines += [f"# Chapter {chapter}", ""]
+        for section in range(1, 6):
+            lines += [f"## Section {chapter}.{section}", ""]
+            for _ in range(3):
+                paragraph = _paragraph(rng, 5)
+                words += len(paragraph.split())
+                lines += [paragraph, ""]
+            for _ in range(4):
+                lines.append(f"- {_sentence(rng, 4, 10)}")
+            lines.append("")
+    return [_write(output_dir / "large_report.md", "\n".join(lines))]
+
+
+def generate_huge_table(output_dir: Path, rng: random.Random, scale: float) -> List[Path]:
+    """Generate a document dominated by one very long table."""
+    columns = ["ID", "Item", "Description", "Quantity", "Rate", "Amount", "Tax", "Total"]
+    lines = ["# Ledger", "", "| " + " | ".join(columns) + " |",
+             "|" + "|".join("---" for _ in columns) + "|"]
+    for row in range(_scaled(5000, scale)):
+        quantity = rng.randint(1, 100)
+        rate = rng.randint(10, 500)
+        amount = quantity * rate
+        cells = [
+            str(row + 1),
+            rng.choice(WORDS),
+            _sentence(rng, 2, 5),
+            str(quantity),
+            f"${rate}",
+            f"${amount}",
+            f"${amount * 0.085:.2f}",
+            f"${amount * 1.085:.2f}",
+        ]
+        lines.append("| " + " | ".join(cells) + " |")
+    lines.append("")
+    return [_write(output_dir / "huge_table.md", "\n".join(lines))]
+
+
+def generate_code_heavy(output_dir: Path, rng: random.Random, scale: float) -> List[Path]:
+    """Generate documents made mostly of highlighted fenced code blocks."""
+    files = []
+    for i in range(_scaled(5, scale)):
+        lines = [f"# Code Listing {i + 1}", ""]
+        for block in range(_scaled(40, scale)):
+            lines += [f"## Listing {block + 1}", "", _sentence(rng), "", "```python"]
+            lines += [rng.choice(CODE_LINES) for _ in range(rng.randint(8, 30))]
+            lines += ["```", ""]
+        files.append(_write(output_dir / f"code_{i + 1:03d}.md", "\n".join(lines)))
+    return files
+
+
+def generate_image_heavy(output_dir: Path, rng: random.Random, scale: float) -> List[Path]:
+    """Generate documents that reference many local PNG images."""
+    image_dir = output_dir / "images"
+    image_dir.mkdir(exist_ok=True)
+
+    images = []
+    for i in range(_scaled(10, scale)):
+        color = tuple(rng.randint(0, 255) for _ in range(3))
+        image = Image.new('RGB', (800, 400), color)
+        draw = ImageDraw.Draw(image)
+        for _ in range(20):
+            x0, y0 = rng.randint(0, 700), rng.randint(0, 300)
+            draw.rectangle(
+                [x0, y0, x0 + rng.randint(20, 100), y0 + rng.randint(20, 100)],
+                fill=tuple(rng.randint(0, 255) for _ in range(3)),
+            )
+        image_path = image_dir / f"figure_{i + 1:03d}.png"
+        image.save(image_path, format='PNG')
+        images.append(image_path)
+
+    files = []
+    for i in range(_scaled(5, scale)):
+        lines = [f"# Gallery {i + 1}", ""]
+        for figure in range(_scaled(20, scale)):
+            image_path = rng.choice(images)
+            lines += [
+                f"![Figure {figure + 1}](images/{image_path.name})",
+                "",
+                _sentence(rng),
+                "",
+            ]
+        files.append(_write(output_dir / f"gallery_{i + 1:03d}.md", "\n".join(lines)))
+    return files
+
+
+GENERATORS: Dict[str, Callable[[Path, random.Random, float], List[Path]]] = {
+    'small_notes': generate_small_notes,
+    'large_report': generate_large_report,
+    'huge_table': generate_huge_table,
+    'code_heavy': generate_code_heavy,
+    'image_heavy': generate_image_heavy,
+}
+
+
+def generate_corpus(
+    output_dir: str = "benchmarks/corpus",
+    seed: int = 42,
+    scale: float = 1.0,
+    kinds: Optional[List[str]] = None,
+) -> Dict[str, List[Path]]:
+    """Generate the benchmark corpus.
+
+    Args:
+        output_dir: Directory to write the corpus into (one subdirectory per kind)
+        seed: Random seed; the same seed and scale produce identical files
+        scale: Size multiplier; 1.0 produces the full-size corpus
+        kinds: Optional subset of corpus kinds to generate
+
+    Returns:
+        Dictionary mapping corpus kind to the list of generated Markdown files
+    """
+    output_path = Path(output_dir)
+    kinds = kinds or CORPUS_KINDS
+    corpus = {}
+
+    for kind in kinds:
+        if kind not in GENERATORS:
+            raise ValueError(f"Unknown corpus kind: {kind}")
+        kind_dir = output_path / kind
+        kind_dir.mkdir(parents=True, exist_ok=True)
+        # Derive an independent stream per kind so subsets stay reproducible
+        rng = random.Random(f"{seed}:{kind}")
+        corpus[kind] = GENERATORS[kind](kind_dir, rng, scale)
+
+    manifest = {
+        'seed': seed,
+        'scale': scale,
+        'kinds': {kind: [str(f) for f in files] for kind, files in corpus.items()},
+    }
+    with open(output_path / "corpus.json", 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    return corpus
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate the benchmark corpus')
+    parser.add_argument('--output-dir', default='benchmarks/corpus',
+                        help='Directory to write the corpus into (default: benchmarks/corpus)')
+    parser.add_argument('--seed', type=int, default=42,
+                        help='Random seed (default: 42)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Corpus size multiplier (default: 1.0)')
+    parser.add_argument('--kinds', nargs='+', choices=CORPUS_KINDS,
+                        help='Subset of corpus kinds to generate')
+
+    args = parser.parse_args()
+    corpus = generate_corpus(args.output_dir, args.seed, args.scale, args.kinds)
+    for kind, files in corpus.items():
+        print(f"{kind}: {len(files)} file(s)")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Compare Markdown parsing backends on the benchmark corpus.
+
+Only the Markdown to HTML fragment conversion is timed, so the numbers show
+parser cost without template, file or PDF overhead.
+"""
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add the project root to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.corpus import CORPUS_KINDS, generate_corpus  # noqa: E402
+from enclose.converters.markdown_backends import (  # noqa: E402
+    available_backends,
+    get_markdown_backend,
+)
+
+
+def benchmark_backends(
+    corpus_dir: str = "benchmarks/corpus",
+    seed: int = 42,
+    scale: float = 1.0,
+    kinds: Optional[List[str]] = None,
+    backends: Optional[List[str]] = None,
+    repeat: int = 3,
+) -> Dict[str, Any]:
+    """Time every backend on every corpus kind.
+
+    Returns:
+        Results dictionary: backend -> kind -> timing record
+    """
+    kinds = kinds or CORPUS_KINDS
+    backends = backends or available_backends()
+    corpus = generate_corpus(corpus_dir, seed, scale, kinds)
+    sources = {
+        kind: [f.read_text(encoding='utf-8') for f in files]
+        for kind, files in corpus.items()
+    }
+
+    results: Dict[str, Any] = {}
+    for name in backends:
+        backend = get_markdown_backend(name)
+        results[name] = {}
+        for kind, documents in sources.items():
+            runs = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                for document in documents:
+                    backend.convert(document)
+                runs.append(time.perf_counter() - start)
+            median = statistics.median(runs)
+            results[name][kind] = {
+                'runs': runs,
+                'median_s': median,
+                'docs': len(documents),
+                'docs_per_s': len(documents) / median if median else None,
+            }
+    return results
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    """Print per-kind timings with the speedup over python-markdown."""
+    baseline = results.get('python-markdown', {})
+    print(f"{'Backend':<18} {'Corpus':<14} {'Median':>10} {'Speedup':>8}")
+    print("-" * 54)
+    for name, kinds in results.items():
+        for kind, record in kinds.items():
+            base = baseline.get(kind, {}).get('median_s')
+            speedup = f"{base / record['median_s']:.2f}x" if base and record['median_s'] else "-"
+            print(f"{name:<18} {kind:<14} {record['median_s']:>9.3f}s {speedup:>8}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare Markdown parsing backends')
+    parser.add_argument('--output', default='benchmarks/results/markdown_backends.json',
+                        help='Where to write the JSON results')
+    parser.add_argument('--corpus-dir', default='benchmarks/corpus',
+                        help='Directory for the generated corpus')
+    parser.add_argument('--seed', type=int, default=42, help='Corpus seed (default: 42)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Corpus size multiplier (default: 1.0)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Timed runs per backend (default: 3)')
+    parser.add_argument('--kinds', nargs='+', choices=CORPUS_KINDS,
+                        help='Subset of corpus kinds to benchmark')
+    parser.add_argument('--backends', nargs='+',
+                        help='Backends to compare (default: all installed)')
+
+    args = parser.parse_args()
+    results = benchmark_backends(
+        args.corpus_dir, args.seed, args.scale, args.kinds, args.backends, args.repeat,
+    )
+    print_results(results)
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved results: {output_path}")
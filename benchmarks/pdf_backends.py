@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Compare the WeasyPrint and ReportLab PDF backends on the benchmark corpus.
+
+Only corpus kinds whose documents the ReportLab backend supports are timed,
+since everything else falls back to WeasyPrint anyway.
+"""
+import contextlib
+import io
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add the project root to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.corpus import generate_corpus  # noqa: E402
+from enclose.converters.markdown_converter import markdown_to_pdf  # noqa: E402
+
+# Corpus kinds made only of headings, paragraphs, lists and tables
+SIMPLE_KINDS = ['small_notes', 'large_report', 'huge_table']
+PDF_BACKENDS = ['weasyprint', 'reportlab']
+
+
+def benchmark_pdf_backends(
+    corpus_dir: str = "benchmarks/corpus",
+    seed: int = 42,
+    scale: float = 1.0,
+    kinds: Optional[List[str]] = None,
+    repeat: int = 3,
+) -> Dict[str, Any]:
+    """Time markdown_to_pdf with each PDF backend.
+
+    Returns:
+        Results dictionary: backend -> kind -> timing record
+    """
+    kinds = kinds or SIMPLE_KINDS
+    corpus = generate_corpus(corpus_dir, seed, scale, kinds)
+
+    results: Dict[str, Any] = {name: {} for name in PDF_BACKENDS}
+    with tempfile.TemporaryDirectory() as output_dir:
+        for kind, files in corpus.items():
+            for name in PDF_BACKENDS:
+                runs = []
+                sizes = 0
+                for _ in range(repeat):
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        start = time.perf_counter()
+                        pdfs = [markdown_to_pdf(f, output_dir, pdf_backend=name) for f in files]
+                        runs.append(time.perf_counter() - start)
+                    sizes = sum(Path(pdf).stat().st_size for pdf in pdfs)
+                median = statistics.median(runs)
+                results[name][kind] = {
+                    'runs': runs,
+                    'median_s': median,
+                    'docs': len(files),
+                    'docs_per_s': len(files) / median if median else None,
+                    'output_bytes': sizes,
+                }
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare WeasyPrint and ReportLab PDF backends')
+    parser.add_argument('--output', default='benchmarks/results/pdf_backends.json',
+                        help='Where to write the JSON results')
+    parser.add_argument('--corpus-dir', default='benchmarks/corpus',
+                        help='Directory for the generated corpus')
+    parser.add_argument('--seed', type=int, default=42, help='Corpus seed (default: 42)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Corpus size multiplier (default: 1.0)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Timed runs per backend (default: 3)')
+    parser.add_argument('--kinds', nargs='+', choices=SIMPLE_KINDS,
+                        help='Subset of corpus kinds to benchmark')
+
+    args = parser.parse_args()
+    results = benchmark_pdf_backends(
+        args.corpus_dir, args.seed, args.scale, args.kinds, args.repeat,
+    )
+
+    print(f"{'Corpus':<14} {'WeasyPrint':>11} {'ReportLab':>11} {'Speedup':>8}")
+    print("-" * 48)
+    for kind in results['weasyprint']:
+        weasy = results['weasyprint'][kind]['median_s']
+        report = results['reportlab'][kind]['median_s']
+        speedup = f"{weasy / report:.2f}x" if report else "-"
+        print(f"{kind:<14} {weasy:>10.3f}s {report:>10.3f}s {speedup:>8}")
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved results: {output_path}")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Compare raster encodings: encode time against file size.
+
+Synthetic text pages (A4, seeded from the corpus word list) are drawn once at
+each resolution and encoded with every preset in
+``raster.ENCODING_PRESETS`` plus Pillow's default PNG settings, so only the
+encoder is timed.
+"""
+import io
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add the project root to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+from benchmarks.corpus import _paragraph  # noqa: E402
+from enclose.converters.raster import (  # noqa: E402
+    ENCODING_PRESETS,
+    OutputProfile,
+    encode_image,
+    with_encoding,
+)
+
+# A4 at the OCR and preview resolutions
+PAGE_SIZES = {'300dpi': (2480, 3508), '96dpi': (794, 1123)}
+ENCODINGS = ['default'] + list(ENCODING_PRESETS)
+
+
+def draw_page(size, rng: random.Random) -> Image.Image:
+    """Draw a page of black text lines on white."""
+    page = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(page)
+    margin = size[0] // 12
+    line_height = max(12, size[1] // 60)
+    y = margin
+    while y < size[1] - margin:
+        draw.text((margin, y), _paragraph(rng, 1)[:120], fill='black')
+        y += line_height
+    return page
+
+
+def benchmark_raster_encoding(
+    seed: int = 42,
+    scale: float = 1.0,
+    encodings: Optional[List[str]] = None,
+    repeat: int = 3,
+) -> Dict[str, Any]:
+    """Time every encoding on synthetic pages.
+
+    Returns:
+        Results dictionary: encoding -> page size -> timing record
+    """
+    encodings = encodings or ENCODINGS
+    rng = random.Random(f"{seed}:raster")
+    pages = max(1, int(round(4 * scale)))
+    images = {
+        name: [draw_page(size, rng) for _ in range(pages)]
+        for name, size in PAGE_SIZES.items()
+    }
+
+    results: Dict[str, Any] = {name: {} for name in encodings}
+    for name in encodings:
+        profile = OutputProfile(name)
+        if name != 'default':
+            profile = with_encoding([profile], name)[0]
+        for size_name, page_images in images.items():
+            runs = []
+            sizes = 0
+            for _ in range(repeat):
+                buffers = [io.BytesIO() for _ in page_images]
+                start = time.perf_counter()
+                for image, buffer in zip(page_images, buffers):
+                    encode_image(image, profile, buffer)
+                runs.append(time.perf_counter() - start)
+                sizes = sum(buffer.tell() for buffer in buffers)
+            median = statistics.median(runs)
+            results[name][size_name] = {
+                'runs': runs,
+                'median_s': median,
+                'pages': pages,
+                'pages_per_s': pages / median if median else None,
+                'output_bytes': sizes,
+            }
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare raster encodings')
+    parser.add_argument('--output', default='benchmarks/results/raster_encoding.json',
+                        help='Where to write the JSON results')
+    parser.add_argument('--seed', type=int, default=42, help='Page text seed (default: 42)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Page count multiplier (default: 1.0, 4 pages)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Timed runs per encoding (default: 3)')
+    parser.add_argument('--encodings', nargs='+', choices=ENCODINGS,
+                        help='Subset of encodings to benchmark')
+
+    args = parser.parse_args()
+    results = benchmark_raster_encoding(args.seed, args.scale, args.encodings, args.repeat)
+
+    print(f"{'Encoding':<10} {'Size':<7} {'Time':>9} {'Pages/s':>8} {'Bytes':>10} {'vs PNG':>7}")
+    print("-" * 56)
+    for name, by_size in results.items():
+        for size_name, record in by_size.items():
+            default = results.get('default', {}).get(size_name)
+            ratio = f"{record['output_bytes'] / default['output_bytes']:.0%}" if default else "-"
+            print(f"{name:<10} {size_name:<7} {record['median_s']:>8.3f}s "
+                  f"{record['pages_per_s']:>8.1f} {record['output_bytes']:>10} {ratio:>7}")
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved results: {output_path}")
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Time every public pipeline stage on the synthetic benchmark corpus.
+
+Each stage is run ``--repeat`` times per corpus kind. The median wall-clock
+time is reported together with throughput in documents and pages per second,
+and the results are stored as JSON for ``compare.py``.
+"""
+import contextlib
+import io
+import json
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Add the project root to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.corpus import CORPUS_KINDS, generate_corpus  # noqa: E402
+
+# Public stages, in pipeline order
+STAGES = [
+    'markdown_to_html',
+    'markdown_to_pdf',
+    'pdf_to_svg',
+    'svg_to_png',
+    'process_ocr',
+    'search_svg_files',
+    'validation',
+]
+
+# Stages whose outputs feed later stages
+PRODUCER_STAGES = ('markdown_to_pdf', 'pdf_to_svg', 'svg_to_png')
+
+PAGE_PATTERN = re.compile(rb'/Type\s*/Page(?![a-zA-Z])')
+
+
+def count_pdf_pages(pdf_path: Path) -> int:
+    """Count pages in a PDF by scanning for page objects."""
+    return len(PAGE_PATTERN.findall(Path(pdf_path).read_bytes()))
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def _timed(fn: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """Run ``fn`` ``repeat`` times and return timings plus the last result."""
+    runs = []
+    result = None
+    for _ in range(repeat):
+        # Stage functions print per file; keep that out of the terminal
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = fn()
+            runs.append(time.perf_counter() - start)
+    return {'runs': runs, 'result': result}
+
+
+def _stage_functions() -> Dict[str, Callable[..., Any]]:
+    """Import the pipeline lazily so ``--help`` works without native deps."""
+    from enclose.converters.markdown_converter import markdown_to_html, markdown_to_pdf
+    from enclose.converters.pdf_converter import pdf_to_svg, svg_to_png
+    from enclose.utils.file_utils import search_svg_files
+    from enclose.utils.file_validation import validate_converted_file
+    from enclose.utils.ocr_processor import process_ocr
+
+    return {
+        'markdown_to_html': markdown_to_html,
+        'markdown_to_pdf': markdown_to_pdf,
+        'pdf_to_svg': pdf_to_svg,
+        'svg_to_png': svg_to_png,
+        'process_ocr': process_ocr,
+        'search_svg_files': search_svg_files,
+        'validation': validate_converted_file,
+    }
+
+
+def benchmark_kind(
+    md_files: List[Path],
+    work_dir: Path,
+    stages: List[str],
+    repeat: int,
+) -> Dict[str, Dict[str, Any]]:
+    """Run the selected stages on one corpus kind.
+
+    Args:
+        md_files: Markdown inputs for this kind
+        work_dir: Scratch directory for stage outputs
+        stages: Stages to time
+        repeat: Number of timed runs per stage
+
+    Returns:
+        Dictionary mapping stage name to its timing record
+    """
+    fn = _stage_functions()
+    html_dir = work_dir / "html"
+    pdf_dir = work_dir / "pdf"
+    svg_dir = work_dir / "svg"
+    png_dir = work_dir / "png"
+    for directory in (html_dir, pdf_dir, svg_dir, png_dir):
+        directory.mkdir(parents=True, exist_ok=True)
+
+    pdf_files: List[Path] = []
+    svg_files: List[Any] = []
+    png_pages: List[Dict[str, Any]] = []
+    results: Dict[str, Dict[str, Any]] = {}
+
+    # Stage bodies; each returns the outputs the next stage needs
+    def run_html():
+        return [fn['markdown_to_html'](md, html_dir) for md in md_files]
+
+    def run_pdf():
+        return [Path(fn['markdown_to_pdf'](md, pdf_dir)) for md in md_files]
+
+    def run_svg():
+        return [fn['pdf_to_svg'](pdf, svg_dir) for pdf in pdf_files]
+
+    def run_png():
+        pages = []
+        for svg_path, metadata in svg_files:
+            page_info, _ = fn['svg_to_png'](svg_path, dict(metadata), png_dir)
+            pages.extend(page_info)
+        return pages
+
+    def run_ocr():
+        return fn['process_ocr'](list(png_pages), {})
+
+    def run_search():
+        return fn['search_svg_files'](svg_dir)
+
+    def run_validation():
+        outputs = [p for d in (pdf_dir, svg_dir, png_dir) for p in sorted(d.iterdir())]
+        return [fn['validation'](p) for p in outputs]
+
+    bodies = {
+        'markdown_to_html': run_html,
+        'markdown_to_pdf': run_pdf,
+        'pdf_to_svg': run_svg,
+        'svg_to_png': run_png,
+        'process_ocr': run_ocr,
+        'search_svg_files': run_search,
+        'validation': run_validation,
+    }
+
+    # Producer stages run (once, untimed) whenever a later stage needs them
+    last = max(STAGES.index(stage) for stage in stages)
+    needed = set(stages) | {
+        stage for stage in PRODUCER_STAGES if STAGES.index(stage) < last
+    }
+
+    failed = None
+    for stage in STAGES:
+        if stage not in needed:
+            continue
+        if failed:
+            results[stage] = {'error': f"skipped: {failed} failed"}
+            continue
+        timed_repeat = repeat if stage in stages else 1
+        try:
+            timed = _timed(bodies[stage], timed_repeat)
+        except Exception as e:
+            if stage in PRODUCER_STAGES:
+                failed = stage
+            results[stage] = {'error': str(e)}
+            print(f"  {stage}: FAILED ({e})")
+            continue
+
+        if stage == 'markdown_to_pdf':
+            pdf_files = timed['result']
+        elif stage == 'pdf_to_svg':
+            svg_files = timed['result']
+        elif stage == 'svg_to_png':
+            png_pages = timed['result']
+
+        if stage in stages:
+            median = statistics.median(timed['runs'])
+            results[stage] = {
+                'runs': timed['runs'],
+                'median_s': median,
+                'min_s': min(timed['runs']),
+                'docs': len(md_files),
+            }
+            print(f"  {stage}: {median:.3f}s")
+
+    # Pages are only known once the PDFs exist; apply them to every stage
+    pages = sum(count_pdf_pages(p) for p in pdf_files) if pdf_files else None
+    for record in results.values():
+        if 'median_s' not in record:
+            continue
+        median = record['median_s'] or float('inf')
+        record['pages'] = pages
+        record['docs_per_s'] = record['docs'] / median
+        record['pages_per_s'] = pages / median if pages else None
+
+    return {stage: record for stage, record in results.items() if stage in stages}
+
+
+def run_benchmarks(
+    corpus_dir: str = "benchmarks/corpus",
+    work_dir: str = "benchmarks/work",
+    seed: int = 42,
+    scale: float = 1.0,
+    kinds: Optional[List[str]] = None,
+    stages: Optional[List[str]] = None,
+    repeat: int = 3,
+) -> Dict[str, Any]:
+    """Generate the corpus and benchmark every selected stage.
+
+    Returns:
+        Results dictionary with ``meta`` and ``results`` (stage -> kind -> record)
+    """
+    kinds = kinds or CORPUS_KINDS
+    stages = stages or STAGES
+    corpus = generate_corpus(corpus_dir, seed, scale, kinds)
+
+    report: Dict[str, Any] = {
+        'meta': {
+            'created_at': datetime.now().isoformat(),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'scale': scale,
+            'repeat': repeat,
+        },
+        'results': {stage: {} for stage in stages},
+    }
+
+    for kind in kinds:
+        print(f"Benchmarking {kind} ({len(corpus[kind])} document(s))")
+        kind_work_dir = Path(work_dir) / kind
+        if kind_work_dir.exists():
+            shutil.rmtree(kind_work_dir)
+        kind_results = benchmark_kind(corpus[kind], kind_work_dir, stages, repeat)
+        for stage, record in kind_results.items():
+            report['results'][stage][kind] = record
+
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the document processing pipeline')
+    parser.add_argument('--output', default='benchmarks/results/latest.json',
+                        help='Where to write the JSON results')
+    parser.add_argument('--corpus-dir', default='benchmarks/corpus',
+                        help='Directory for the generated corpus')
+    parser.add_argument('--work-dir', default='benchmarks/work',
+                        help='Scratch directory for stage outputs')
+    parser.add_argument('--seed', type=int, default=42, help='Corpus seed (default: 42)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Corpus size multiplier (default: 1.0)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Timed runs per stage (default: 3)')
+    parser.add_argument('--kinds', nargs='+', choices=CORPUS_KINDS,
+                        help='Subset of corpus kinds to benchmark')
+    parser.add_argument('--stages', nargs='+', choices=STAGES,
+                        help='Subset of stages to benchmark')
+
+    args = parser.parse_args()
+    report = run_benchmarks(
+        args.corpus_dir, args.work_dir, args.seed, args.scale,
+        args.kinds, args.stages, args.repeat,
+    )
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved results: {output_path}")
@@ -8,9 +8,29 @@ processing tool.
 
 import argparse
 import sys
-from typing import Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 
+from .converters.raster import ENCODING_PRESETS, parse_profiles
+from .core.batch import BatchRunner, RetryPolicy, expand_inputs
 from .core.document_processor import DocumentProcessor
+from .core.pipeline import STAGES, parse_stages
+from .utils.page_ranges import parse_pages
+from .utils.reproducible import set_reproducible
+from .utils.resource_governor import apply_thread_env, configure_governor
+from .utils.worker_pool import TIMEOUT_STAGES, WorkerLimits, WorkerPool, parse_timeouts
+
+
+# Command-line flags setting each conversion option, for error messages
+OPTION_FLAGS = {
+    'chunked': '--chunked',
+    'workers': '--workers',
+    'compresslevel': '--compress-level',
+    'profiles': '--profiles',
+    'encoding': '--encoding/--quality/--png-level/--optimize/--colors',
+    'tile_size': '--tile-size',
+    'tile_overlap': '--tile-overlap',
+}
 
 
 def list_formats() -> None:
@@ -30,7 +50,9 @@ def list_formats() -> None:
 def convert_file(
     input_path: str,
     output_format: str,
-    output_path: Optional[str] = None
+    output_path: Optional[str] = None,
+    document_limits: Optional[WorkerLimits] = None,
+    **options: Any
 ) -> None:
     """Convert a file to the specified format.
     
@@ -38,16 +60,92 @@ def convert_file(
         input_path: Path to the input file
         output_format: Desired output format
         output_path: Optional output file path
+        document_limits: Convert in a worker process with these limits
+        **options: Extra conversion options (e.g. ``chunked``, ``workers``)
+    """
+    processor = DocumentProcessor()
+    try:
+        if document_limits is None:
+            result = processor.process(input_path, output_format, output_path, **options)
+        else:
+            with WorkerPool(1, document_limits, stage=output_format) as pool:
+                result = pool.call(
+                    processor.process, input_path, output_format, output_path, **options
+                )
+        print(f"Successfully created: {result}")
+    except Exception as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+
+def bundle_files(
+    input_paths: List[str],
+    output_path: Optional[str] = None
+) -> None:
+    """Render several Markdown files into one PDF.
+    
+    Args:
+        input_paths: Paths to the input Markdown files, in bundle order
+        output_path: Optional output file path
     """
     processor = DocumentProcessor()
     try:
-        result = processor.process(input_path, output_format, output_path)
+        result = processor.markdown_to_pdf_bundle(input_paths, output_path)
         print(f"Successfully created: {result}")
     except Exception as e:
         print(f"Error: {str(e)}", file=sys.stderr)
         sys.exit(1)
 
 
+def run_batch(
+    input_paths: List[str],
+    output_format: str,
+    output_dir: Optional[str] = None,
+    resume: bool = False,
+    runner_options: Optional[dict] = None,
+    **options: Any
+) -> None:
+    """Convert many files, checkpointing each one to a manifest.
+    
+    Args:
+        input_paths: Input files and directories (searched for inputs)
+        output_format: Desired output format
+        output_dir: Output directory (default: output)
+        resume: Skip inputs the manifest records as done
+        runner_options: ``BatchRunner`` options (manifest, retry,
+            quarantine_dir, verify)
+        **options: Extra conversion options
+    """
+    runner = BatchRunner(output_dir or "output", **(runner_options or {}))
+    inputs = expand_inputs(input_paths, runner.processor.supported_formats)
+    summary = runner.run(inputs, output_format, resume, **options)
+    print(f"Batch: {summary['done']} converted, {summary['skipped']} skipped, "
+          f"{summary['failed']} failed, {summary['quarantined']} quarantined "
+          f"(manifest: {summary['manifest']})")
+    if summary['failed']:
+        sys.exit(1)
+
+
+def stage_limits(args: argparse.Namespace) -> Dict[str, WorkerLimits]:
+    """Worker limits per stage from the command line; empty without any.
+
+    Raises:
+        ValueError: If a timeout or limit is invalid
+    """
+    timeouts = parse_timeouts(args.timeout) if args.timeout else {}
+    shared = {
+        'max_memory_mb': args.max_memory,
+        'max_tasks': args.max_tasks,
+        'recycle_mb': args.recycle_mb,
+    }
+    if not timeouts and all(value is None for value in shared.values()):
+        return {}
+    return {
+        stage: WorkerLimits(timeout=timeouts.get(stage), **shared)
+        for stage in TIMEOUT_STAGES
+    }
+
+
 def parse_args() -> argparse.Namespace:
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(
@@ -79,7 +177,7 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         'output_format',
         nargs='?',
-        choices=['pdf', 'png', 'svg', 'html'],
+        choices=['pdf', 'png', 'svg', 'svgz', 'html'],
         help='Output format (required for conversion)',
     )
 
@@ -89,6 +187,211 @@ def parse_args() -> argparse.Namespace:
         '--output',
         help='Output file path (default: auto-generated)',
     )
+
+    # Large document rendering
+    parser.add_argument(
+        '--chunked',
+        action='store_true',
+        help='Render large Markdown documents to PDF in parallel chunks',
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='Worker processes for --chunked rendering (default: CPU count)',
+    )
+
+    parser.add_argument(
+        '--compress-level',
+        type=int,
+        choices=range(1, 10),
+        metavar='1-9',
+        help='gzip level for svgz output (default: 6)',
+    )
+
+    parser.add_argument(
+        '--profiles',
+        help='Comma-separated raster profiles for png output, rendered in one '
+             'pass per page (ocr, preview, thumbnail)',
+    )
+
+    parser.add_argument(
+        '--encoding',
+        choices=list(ENCODING_PRESETS),
+        help='Raster encoding preset for png output: fast, archival (max PNG '
+             'compression), palette, webp or jpeg',
+    )
+
+    parser.add_argument(
+        '--quality',
+        type=int,
+        choices=range(1, 101),
+        metavar='1-100',
+        help='WebP/JPEG quality for raster output',
+    )
+
+    parser.add_argument(
+        '--png-level',
+        type=int,
+        choices=range(0, 10),
+        metavar='0-9',
+        help='zlib level for PNG raster output (default: 6)',
+    )
+
+    parser.add_argument(
+        '--optimize',
+        action='store_true',
+        help='Extra encoder pass for smaller raster files',
+    )
+
+    parser.add_argument(
+        '--colors',
+        type=int,
+        choices=range(2, 257),
+        metavar='2-256',
+        help='Quantize raster output to a palette of this many colors',
+    )
+
+    parser.add_argument(
+        '--tile-size',
+        type=int,
+        metavar='PX',
+        help='Render png output as tiles of this size to bound memory on '
+             'large-format pages (default profile: ocr)',
+    )
+
+    parser.add_argument(
+        '--tile-overlap',
+        type=int,
+        metavar='PX',
+        help='Pixels shared by neighbouring tiles (default: 128)',
+    )
+
+    parser.add_argument(
+        '--pages',
+        metavar='RANGES',
+        help='Pages of a PDF to process for png output, e.g. 1-3,10 or 5- '
+             '(default: all); other pages are never rendered',
+    )
+
+    parser.add_argument(
+        '--stages',
+        metavar='STAGES',
+        help=f"Comma-separated stages for PDF to png output: "
+             f"{', '.join(STAGES)} (default: all); 'ocr' alone writes the "
+             f"OCR text as JSON Lines without page images",
+    )
+
+    parser.add_argument(
+        '--reproducible',
+        action='store_true',
+        help='Produce byte-identical output for identical input '
+             '(build date from SOURCE_DATE_EPOCH)',
+    )
+
+    parser.add_argument(
+        '--bundle',
+        nargs='+',
+        metavar='MD',
+        help='Render these Markdown files after the input into one PDF',
+    )
+
+    parser.add_argument(
+        '--batch',
+        nargs='+',
+        metavar='PATH',
+        help='Also convert these files (and the supported files in these '
+             'directories) as a batch checkpointed to a manifest; -o is the '
+             'output directory',
+    )
+
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Skip batch inputs the manifest records as done with intact '
+             'outputs',
+    )
+
+    parser.add_argument(
+        '--manifest',
+        help='Batch manifest path (default: <output dir>/manifest.jsonl)',
+    )
+
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Retries of a failed batch input per run (default: 1)',
+    )
+
+    parser.add_argument(
+        '--max-failures',
+        type=int,
+        default=3,
+        metavar='N',
+        help='Quarantine a batch input after N failures across runs; 0 '
+             'never quarantines (default: 3)',
+    )
+
+    parser.add_argument(
+        '--quarantine',
+        metavar='DIR',
+        help='Copy quarantined batch inputs to this directory',
+    )
+
+    parser.add_argument(
+        '--timeout',
+        metavar='SECONDS',
+        help='Wall-clock timeout of a conversion, or per stage as '
+             'document=600,layout=120,ocr=30 (layout: per --chunked chunk, '
+             'ocr: per page of PDF to png); timed-out work fails instead of '
+             'hanging',
+    )
+
+    parser.add_argument(
+        '--max-memory',
+        type=int,
+        metavar='MB',
+        help='Address space cap of each worker process',
+    )
+
+    parser.add_argument(
+        '--max-tasks',
+        type=int,
+        metavar='N',
+        help='Replace a worker process after N documents, chunks or pages',
+    )
+
+    parser.add_argument(
+        '--recycle-mb',
+        type=int,
+        metavar='MB',
+        help='Replace a worker process whose resident memory exceeds MB',
+    )
+
+    parser.add_argument(
+        '--cpus',
+        type=int,
+        metavar='N',
+        help='CPU budget shared by rendering, layout and OCR '
+             '(default: $ENCLOSE_CPUS or the available CPUs)',
+    )
+
+    parser.add_argument(
+        '--memory-budget',
+        type=int,
+        metavar='MB',
+        help='Memory budget for page images being recognized '
+             '(default: $ENCLOSE_MEMORY_MB or unlimited)',
+    )
+
+    parser.add_argument(
+        '--verify',
+        choices=['size', 'hash'],
+        default='hash',
+        help='How --resume checks finished outputs (default: hash)',
+    )
     
     return parser.parse_args()
 
@@ -106,7 +409,106 @@ def main() -> None:
         print("Use 'enclose --help' for usage information")
         sys.exit(1)
     
-    convert_file(args.input, args.output_format, args.output)
+    if args.reproducible:
+        set_reproducible(True)
+
+    # This process and its workers: one tesseract/BLAS thread per CPU token
+    apply_thread_env()
+
+    if args.cpus is not None or args.memory_budget is not None:
+        try:
+            configure_governor(args.cpus, args.memory_budget)
+        except ValueError as e:
+            print(f"Error: {str(e)}", file=sys.stderr)
+            sys.exit(1)
+
+    if args.bundle:
+        if args.output_format != 'pdf':
+            print("Error: --bundle only supports PDF output", file=sys.stderr)
+            sys.exit(1)
+        bundle_files([args.input] + args.bundle, args.output)
+        return
+
+    options = {}
+    if args.chunked:
+        options = {'chunked': True, 'workers': args.workers}
+    if args.compress_level is not None:
+        options['compresslevel'] = args.compress_level
+    if args.profiles:
+        try:
+            options['profiles'] = parse_profiles(args.profiles)
+        except ValueError as e:
+            print(f"Error: {str(e)}", file=sys.stderr)
+            sys.exit(1)
+    encoding = {
+        'preset': args.encoding,
+        'quality': args.quality,
+        'compress_level': args.png_level,
+        'optimize': args.optimize or None,
+        'colors': args.colors,
+    }
+    if any(value is not None for value in encoding.values()):
+        options['encoding'] = encoding
+    if args.tile_size:
+        options['tile_size'] = args.tile_size
+    if args.tile_overlap is not None:
+        options['tile_overlap'] = args.tile_overlap
+    pdf_to_png = args.input.lower().endswith('.pdf') and args.output_format == 'png'
+    if args.pages or args.stages:
+        if not pdf_to_png:
+            print("Error: --pages and --stages apply to PDF to png conversion",
+                  file=sys.stderr)
+            sys.exit(1)
+        try:
+            if args.pages:
+                options['pages'] = parse_pages(args.pages)
+            if args.stages:
+                options['stages'] = parse_stages(args.stages)
+        except ValueError as e:
+            print(f"Error: {str(e)}", file=sys.stderr)
+            sys.exit(1)
+
+    try:
+        limits = stage_limits(args)
+    except ValueError as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    if limits and args.chunked:
+        options['limits'] = limits['layout']
+    elif limits and pdf_to_png:
+        options['limits'] = limits['ocr']
+
+    if not (args.batch or args.resume):
+        # Batches may mix inputs; each conversion takes its own options there
+        input_format = Path(args.input).suffix[1:].lower()
+        accepted = DocumentProcessor.conversion_options(input_format, args.output_format)
+        unused = [OPTION_FLAGS[name] for name in options
+                  if name in OPTION_FLAGS and name not in accepted]
+        if unused:
+            print(f"Error: {', '.join(unused)} not used by "
+                  f"{input_format} to {args.output_format} conversion", file=sys.stderr)
+            sys.exit(1)
+
+    if args.batch or args.resume:
+        try:
+            retry = RetryPolicy(attempts=args.retries + 1,
+                                max_failures=args.max_failures or None)
+        except ValueError as e:
+            print(f"Error: {str(e)}", file=sys.stderr)
+            sys.exit(1)
+        runner_options = {
+            'manifest': args.manifest,
+            'retry': retry,
+            'quarantine_dir': args.quarantine,
+            'verify': args.verify,
+            'limits': limits.get('document'),
+        }
+        run_batch([args.input] + (args.batch or []), args.output_format,
+                  args.output, args.resume, runner_options, **options)
+        return
+
+    convert_file(args.input, args.output_format, args.output,
+                 limits.get('document'), **options)
 
 
 if __name__ == "__main__":
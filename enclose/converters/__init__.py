@@ -2,12 +2,26 @@
 Document format converters for the processing pipeline.
 """
 
-from .markdown_converter import create_example_markdown, markdown_to_pdf
+from .chunked_pdf import render_chunked_pdf
+from .markdown_converter import (
+    MarkdownRenderer,
+    create_example_markdown,
+    markdown_to_html,
+    markdown_to_pdf,
+    markdown_to_pdf_bundle,
+)
 from .pdf_converter import pdf_to_svg, svg_to_png
+from .render_context import RenderContext, get_render_context
 
 __all__ = [
+    'MarkdownRenderer',
+    'RenderContext',
     'create_example_markdown',
+    'markdown_to_html',
+    'get_render_context',
     'markdown_to_pdf',
+    'markdown_to_pdf_bundle',
+    'render_chunked_pdf',
     'pdf_to_svg',
     'svg_to_png'
 ]
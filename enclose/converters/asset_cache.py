@@ -0,0 +1,242 @@
+"""
+Cached, parallel fetching of assets referenced from documents.
+
+WeasyPrint fetches and decodes images and stylesheets one at a time during
+layout, and again for every document that references the same logo. The
+asset cache is a WeasyPrint URL fetcher that keeps fetched content in memory
+and remote content on disk, and prefetches every asset a document references
+in parallel before layout starts. Decoded images are kept in ``images``, which
+is passed to WeasyPrint as its image cache so they are shared by all
+documents rendered in the process.
+
+Local files are re-read only when their size or modification time changes.
+Remote assets are treated as immutable once cached on disk; call ``clear()``
+to drop them.
+"""
+
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import unquote, urljoin, urlparse
+
+import lxml.html
+from weasyprint.urls import default_url_fetcher, path2url
+
+ASSET_CACHE_ENV_VAR = 'ENCLOSE_ASSET_CACHE_DIR'
+
+# Upper bounds for the in-memory caches of one process
+MAX_MEMORY_BYTES = 64 * 1024 * 1024
+MAX_IMAGES = 256
+
+# Result keys of a WeasyPrint URL fetcher that are kept with cached content
+_RESULT_KEYS = ('mime_type', 'encoding', 'redirected_url', 'filename')
+
+
+def default_cache_dir():
+    """Return ``$ENCLOSE_ASSET_CACHE_DIR`` or the user cache directory."""
+    if os.environ.get(ASSET_CACHE_ENV_VAR):
+        return Path(os.environ[ASSET_CACHE_ENV_VAR])
+    cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(cache_home) / 'enclose' / 'assets'
+
+
+def as_base_url(base_url):
+    """Turn a directory path into a file URL; URLs are returned unchanged."""
+    if base_url is None or urlparse(str(base_url)).scheme in ('file', 'http', 'https'):
+        return base_url
+    return path2url(base_url)
+
+
+def find_asset_urls(fragment, base_url=None):
+    """List the absolute URLs of images and stylesheets an HTML fragment uses.
+
+    Args:
+        fragment: HTML fragment or page
+        base_url: Base URL (or directory) relative references resolve against
+
+    Returns:
+        Unique absolute URLs, in document order
+    """
+    base_url = as_base_url(base_url)
+    root = lxml.html.fragment_fromstring(fragment or "<p></p>", create_parent='div')
+    urls = []
+    for element in root.iter('img', 'link'):
+        if element.tag == 'link' and 'stylesheet' not in element.get('rel', ''):
+            continue
+        value = (element.get('src') if element.tag == 'img' else element.get('href')) or ''
+        value = value.strip()
+        if not value or value.startswith(('data:', '#')):
+            continue
+        url = urljoin(base_url, value) if base_url else value
+        if urlparse(url).scheme in ('file', 'http', 'https') and url not in urls:
+            urls.append(url)
+    return urls
+
+
+def _local_path(url):
+    parsed = urlparse(url)
+    if parsed.scheme != 'file':
+        return None
+    return Path(unquote(parsed.path))
+
+
+class AssetCache:
+    """WeasyPrint URL fetcher with memory, disk and decoded image caches."""
+
+    def __init__(self, cache_dir=None, fetcher=default_url_fetcher, max_workers=8,
+                 max_memory=MAX_MEMORY_BYTES, max_images=MAX_IMAGES):
+        """Create an asset cache.
+
+        Args:
+            cache_dir: Directory for cached remote assets (default:
+                ``default_cache_dir()``)
+            fetcher: Underlying URL fetcher for cache misses
+            max_workers: Parallel fetches during ``prefetch``
+            max_memory: Bytes of fetched content kept in memory
+            max_images: Decoded images kept in ``images``
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.fetcher = fetcher
+        self.max_workers = max_workers
+        self.max_memory = max_memory
+        self.max_images = max_images
+        self.images = {}
+        self._memory = {}
+        self._memory_size = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, url):
+        return self.fetch(url)
+
+    def fetch(self, url):
+        """Fetch a URL through the cache; same contract as WeasyPrint's fetcher."""
+        if not url.startswith(('file:', 'http:', 'https:')):
+            return self.fetcher(url)
+
+        path = _local_path(url)
+        version = None
+        if path is not None:
+            stat = path.stat()
+            version = (stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            entry = self._memory.get(url)
+            if entry is not None and entry[0] == version:
+                return dict(entry[1])
+            if entry is not None:
+                # The file changed: forget its content and decoded image
+                self._forget(url)
+
+        result = self._read_file(url, path) if path is not None else self._fetch_remote(url)
+        self._remember(url, version, result)
+        return dict(result)
+
+    def prefetch(self, urls):
+        """Fetch URLs in parallel so layout finds them in the cache.
+
+        Failures are ignored here; WeasyPrint reports them when it requests
+        the asset during layout.
+
+        Returns:
+            Number of URLs fetched successfully
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return 0
+
+        def fetch(url):
+            try:
+                self.fetch(url)
+                return True
+            except Exception:
+                return False
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as pool:
+            return sum(pool.map(fetch, urls))
+
+    def clear(self, disk=False):
+        """Drop the in-memory caches, and optionally the on-disk cache."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+            self.images.clear()
+        if disk and self.cache_dir.exists():
+            for cached in self.cache_dir.iterdir():
+                cached.unlink()
+
+    def _read_file(self, url, path):
+        return {
+            'string': path.read_bytes(),
+            'mime_type': mimetypes.guess_type(path.name)[0],
+            'redirected_url': url,
+        }
+
+    def _fetch_remote(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        data_path = self.cache_dir / key
+        meta_path = self.cache_dir / f"{key}.json"
+        if data_path.exists() and meta_path.exists():
+            with open(meta_path, 'r') as f:
+                result = json.load(f)
+            result['string'] = data_path.read_bytes()
+            return result
+
+        fetched = self.fetcher(url)
+        if 'string' in fetched:
+            data = fetched['string']
+        else:
+            try:
+                data = fetched['file_obj'].read()
+            finally:
+                fetched['file_obj'].close()
+        result = {name: fetched[name] for name in _RESULT_KEYS if fetched.get(name)}
+
+        # Write through temporary files so concurrent workers never read a
+        # partially written entry
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(f"{data_path}{suffix}", 'wb') as f:
+            f.write(data)
+        os.replace(f"{data_path}{suffix}", data_path)
+        with open(f"{meta_path}{suffix}", 'w') as f:
+            json.dump(result, f)
+        os.replace(f"{meta_path}{suffix}", meta_path)
+
+        result['string'] = data
+        return result
+
+    def _remember(self, url, version, result):
+        size = len(result['string'])
+        if size > self.max_memory:
+            return
+        with self._lock:
+            self._forget(url)
+            while self._memory and self._memory_size + size > self.max_memory:
+                self._forget(next(iter(self._memory)))
+            self._memory[url] = (version, result)
+            self._memory_size += size
+            if len(self.images) > self.max_images:
+                self.images.clear()
+
+    def _forget(self, url):
+        entry = self._memory.pop(url, None)
+        if entry is not None:
+            self._memory_size -= len(entry[1]['string'])
+        self.images.pop(url, None)
+
+
+_lock = threading.Lock()
+_cache = None
+
+
+def get_asset_cache():
+    """Return the process-wide asset cache."""
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = AssetCache()
+        return _cache
@@ -0,0 +1,218 @@
+"""
+Chunked parallel rendering of very large Markdown documents.
+
+A single WeasyPrint layout of a book-sized document runs on one core and keeps
+the whole layout tree in memory. Chunked rendering splits the Markdown source
+at top-level (``#``) headings, renders groups of sections to temporary PDFs in
+worker processes and merges them into one PDF with pypdf. Each worker only
+lays out one chunk at a time, so peak memory is bounded by the chunk size.
+
+The merged PDF keeps every chunk's outline (bookmarks) with page destinations
+remapped to the merged page order, and carries a single decimal page-label
+range so viewers number the pages continuously. Page numbers printed through
+CSS ``counter(page)`` in a custom theme restart in every chunk.
+
+With ``limits`` the chunks are laid out in supervised workers (see
+``utils.worker_pool``), so a chunk whose layout explodes fails with a
+``StageTimeout`` or ``WorkerMemoryExceeded`` instead of stalling the render.
+
+The pool takes its workers from the process-wide ``ResourceGovernor``: it
+starts with as many as the CPU budget has free, at least one.
+"""
+
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    from pypdf import PdfWriter
+except ImportError:  # optional dependency
+    PdfWriter = None
+
+from ..utils.resource_governor import get_governor
+from ..utils.worker_pool import WorkerPool
+from .markdown_converter import (
+    get_markdown_renderer,
+    render_markdown_pdf,
+    select_pdf_backend,
+)
+
+# Target size of a chunk in Markdown characters (~40 pages of prose)
+DEFAULT_CHUNK_CHARS = 100_000
+
+_FENCE_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+_TOP_HEADING_RE = re.compile(r'^#(?:[ \t]|$)')
+_REFERENCE_RE = re.compile(r'^ {0,3}\[[^\]]+\]:\s*\S')
+
+
+def split_sections(md_content):
+    """Split Markdown text before every top-level heading outside code fences.
+
+    Link reference definitions are also returned, because a reference may be
+    used in one section and defined in another.
+
+    Returns:
+        Tuple of (list of section texts, reference definition text)
+    """
+    sections = []
+    current = []
+    references = []
+    fence = None
+    for line in md_content.splitlines(keepends=True):
+        match = _FENCE_RE.match(line)
+        if fence is not None:
+            if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence):
+                fence = None
+        elif match:
+            fence = match.group(1)
+        elif _TOP_HEADING_RE.match(line) and current:
+            sections.append("".join(current))
+            current = []
+        elif _REFERENCE_RE.match(line):
+            references.append(line if line.endswith("\n") else line + "\n")
+        current.append(line)
+    if current:
+        sections.append("".join(current))
+    return sections, "".join(references)
+
+
+def split_markdown(md_content, chunk_chars=DEFAULT_CHUNK_CHARS):
+    """Split Markdown text into chunks of whole top-level sections.
+
+    Consecutive sections are grouped until a chunk reaches ``chunk_chars``; a
+    single section larger than that becomes a chunk of its own. Every chunk
+    gets a copy of the document's link reference definitions.
+
+    Args:
+        md_content: Markdown text
+        chunk_chars: Target chunk size in characters
+
+    Returns:
+        List of Markdown chunks, in document order
+    """
+    sections, references = split_sections(md_content)
+    chunks = []
+    current = []
+    size = 0
+    for section in sections:
+        if current and size + len(section) > chunk_chars:
+            chunks.append("".join(current))
+            current = []
+            size = 0
+        current.append(section)
+        size += len(section)
+    if current:
+        chunks.append("".join(current))
+
+    if references:
+        chunks = [
+            chunk if references in chunk else f"{chunk}\n\n{references}"
+            for chunk in chunks
+        ]
+    return chunks or [""]
+
+
+def _resolve_backend(md_content, markdown_backend, theme, pdf_backend):
+    """Pick one PDF backend for the whole document so the merged PDF is uniform.
+
+    The document is converted to HTML once here; the chunks are only laid
+    out in the workers.
+    """
+    renderer = get_markdown_renderer(markdown_backend, embed_style=False)
+    return select_pdf_backend(renderer.convert(md_content), pdf_backend, theme)
+
+
+def _render_chunk(task):
+    """Worker entry point: render one chunk to its temporary PDF."""
+    md_content, pdf_path, title, base_url, options = task
+    render_markdown_pdf(md_content, pdf_path, title, base_url, **options)
+    return pdf_path
+
+
+def merge_pdfs(pdf_paths, output_path, title=None):
+    """Merge PDFs into one, keeping outlines and numbering pages continuously.
+
+    Args:
+        pdf_paths: PDFs to merge, in order
+        output_path: Path of the merged PDF
+        title: Optional document title for the merged metadata
+
+    Returns:
+        Path to the merged PDF
+
+    Raises:
+        ImportError: If pypdf is not installed
+    """
+    if PdfWriter is None:
+        raise ImportError(
+            "Merging chunked PDFs requires pypdf: pip install pypdf"
+        )
+    writer = PdfWriter()
+    for pdf_path in pdf_paths:
+        writer.append(str(pdf_path), import_outline=True)
+    if len(writer.pages):
+        writer.set_page_label(0, len(writer.pages) - 1, style='/D', start=1)
+    if title:
+        writer.add_metadata({'/Title': title})
+    with open(output_path, 'wb') as f:
+        writer.write(f)
+    return output_path
+
+
+def render_chunked_pdf(md_file, pdf_path, workers=None, chunk_chars=DEFAULT_CHUNK_CHARS,
+                       markdown_backend=None, theme=None, pdf_backend=None, limits=None):
+    """Render a large Markdown file to PDF in parallel chunks.
+
+    Args:
+        md_file: Path or string to the input markdown file
+        pdf_path: Path of the PDF to write
+        workers: Most worker processes to run (default: the CPU budget);
+            the free part of the budget may be fewer
+        chunk_chars: Target chunk size in Markdown characters
+        markdown_backend: Optional Markdown backend name
+        theme: Optional custom CSS file (or list of files)
+        pdf_backend: 'auto', 'weasyprint' or 'reportlab'
+        limits: ``WorkerLimits`` for the chunk layouts (timeout per chunk,
+            memory cap, recycling); the chunks then always render in
+            worker processes
+
+    Returns:
+        Path to the generated PDF file
+    """
+    md_path = Path(md_file)
+    pdf_path = Path(pdf_path)
+    with open(md_path, 'r', encoding='utf-8') as f:
+        md_content = f.read()
+    chunks = split_markdown(md_content, chunk_chars)
+
+    title = md_path.stem
+    base_url = str(md_path.parent.absolute())
+    options = {
+        'markdown_backend': markdown_backend,
+        'theme': theme,
+        'pdf_backend': _resolve_backend(md_content, markdown_backend, theme, pdf_backend),
+    }
+
+    if len(chunks) == 1 and limits is None:
+        return render_markdown_pdf(chunks[0], pdf_path, title, base_url, **options)
+
+    # Temporary chunk PDFs live next to the output so merging never crosses
+    # filesystems
+    with tempfile.TemporaryDirectory(prefix=f".{title}-chunks-", dir=pdf_path.parent) as tmp:
+        tasks = [
+            (chunk, Path(tmp) / f"chunk_{index:04d}.pdf", title, base_url, options)
+            for index, chunk in enumerate(chunks)
+        ]
+        governor = get_governor()
+        wanted = min(workers or governor.cpus, len(tasks))
+        with governor.share('layout', wanted) as workers:
+            if limits is not None:
+                with WorkerPool(workers, limits, stage='layout') as pool:
+                    chunk_paths = pool.map(_render_chunk, tasks)
+            elif workers == 1:
+                chunk_paths = [_render_chunk(task) for task in tasks]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    chunk_paths = list(pool.map(_render_chunk, tasks))
+        return merge_pdfs(chunk_paths, pdf_path, title)
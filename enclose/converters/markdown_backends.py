@@ -0,0 +1,180 @@
+"""
+Markdown parsing backends.
+
+Python-Markdown is the default backend. Faster optional backends
+(markdown-it-py, mistune) are available when installed and share the same
+code highlighting through Python-Markdown's CodeHilite, so fenced code renders
+identically whichever backend is used.
+
+The backend is selected by name, or by the ``ENCLOSE_MARKDOWN_BACKEND``
+environment variable when no name is given.
+"""
+
+import os
+
+import markdown
+from markdown.extensions.codehilite import CodeHilite, CodeHiliteExtension
+
+try:
+    from markdown_it import MarkdownIt
+except ImportError:  # optional dependency
+    MarkdownIt = None
+
+try:
+    import mistune
+except ImportError:  # optional dependency
+    mistune = None
+
+# Python-Markdown extensions used by the default backend
+MARKDOWN_EXTENSIONS = ['tables', 'fenced_code', 'codehilite']
+
+DEFAULT_BACKEND = 'python-markdown'
+BACKEND_ENV_VAR = 'ENCLOSE_MARKDOWN_BACKEND'
+
+
+# Default codehilite settings, as used by Python-Markdown's fenced_code
+_CODEHILITE_CONFIG = CodeHiliteExtension().getConfigs()
+
+
+def _highlight(code, lang=None):
+    """Highlight a code block exactly like Python-Markdown's fenced_code + codehilite."""
+    config = dict(_CODEHILITE_CONFIG)
+    style = config.pop('pygments_style', 'default')
+    return CodeHilite(code, lang=lang or None, style=style, **config).hilite(shebang=False)
+
+
+class MarkdownBackend:
+    """Interface for Markdown to HTML fragment converters."""
+
+    #: Name used to select the backend
+    name = None
+
+    def convert(self, md_content):
+        """Convert Markdown text to an HTML fragment."""
+        raise NotImplementedError
+
+    def reset(self):
+        """Reset per-document state; called between documents."""
+
+
+class PythonMarkdownBackend(MarkdownBackend):
+    """Default backend built on Python-Markdown."""
+
+    name = 'python-markdown'
+
+    def __init__(self, extensions=None):
+        self.extensions = list(extensions or MARKDOWN_EXTENSIONS)
+        self._md = markdown.Markdown(extensions=self.extensions)
+
+    def convert(self, md_content):
+        try:
+            return self._md.convert(md_content)
+        finally:
+            self.reset()
+
+    def reset(self):
+        self._md.reset()
+
+
+class MarkdownItBackend(MarkdownBackend):
+    """Backend built on markdown-it-py (CommonMark with tables)."""
+
+    name = 'markdown-it'
+
+    def __init__(self):
+        if MarkdownIt is None:
+            raise ImportError(
+                "The 'markdown-it' backend requires markdown-it-py: "
+                "pip install markdown-it-py"
+            )
+        self._md = MarkdownIt('commonmark').enable('table')
+        self._md.add_render_rule('fence', self._render_fence)
+        self._md.add_render_rule('code_block', self._render_code_block)
+
+    @staticmethod
+    def _render_fence(renderer, tokens, idx, options, env):
+        token = tokens[idx]
+        lang = token.info.strip().split()[0] if token.info.strip() else None
+        return _highlight(token.content, lang) + "\n"
+
+    @staticmethod
+    def _render_code_block(renderer, tokens, idx, options, env):
+        return _highlight(tokens[idx].content) + "\n"
+
+    def convert(self, md_content):
+        return self._md.render(md_content)
+
+
+if mistune is not None:
+    class _MistuneRenderer(mistune.HTMLRenderer):
+        """mistune renderer that highlights code blocks through CodeHilite."""
+
+        def block_code(self, code, info=None):
+            lang = info.strip().split()[0] if info and info.strip() else None
+            return _highlight(code, lang) + "\n"
+
+
+class MistuneBackend(MarkdownBackend):
+    """Backend built on mistune 3 with the table plugin."""
+
+    name = 'mistune'
+
+    def __init__(self):
+        if mistune is None:
+            raise ImportError(
+                "The 'mistune' backend requires mistune: pip install mistune"
+            )
+        self._md = mistune.create_markdown(
+            renderer=_MistuneRenderer(escape=False), plugins=['table']
+        )
+
+    def convert(self, md_content):
+        return self._md(md_content)
+
+
+MARKDOWN_BACKENDS = {
+    backend.name: backend
+    for backend in (PythonMarkdownBackend, MarkdownItBackend, MistuneBackend)
+}
+
+
+def available_backends():
+    """Return the names of backends whose dependencies are installed."""
+    available = [PythonMarkdownBackend.name]
+    if MarkdownIt is not None:
+        available.append(MarkdownItBackend.name)
+    if mistune is not None:
+        available.append(MistuneBackend.name)
+    return available
+
+
+def resolve_backend_name(name=None):
+    """Resolve a backend name, falling back to the environment and the default.
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    name = (name or os.environ.get(BACKEND_ENV_VAR) or DEFAULT_BACKEND).lower()
+    if name not in MARKDOWN_BACKENDS:
+        raise ValueError(
+            f"Unknown markdown backend: {name} "
+            f"(choose from {', '.join(MARKDOWN_BACKENDS)})"
+        )
+    return name
+
+
+def get_markdown_backend(name=None):
+    """Create a Markdown backend.
+
+    Args:
+        name: Backend name; defaults to ``$ENCLOSE_MARKDOWN_BACKEND`` or
+            'python-markdown'
+
+    Returns:
+        A new MarkdownBackend instance
+
+    Raises:
+        ValueError: If the backend name is unknown
+        ImportError: If the backend's optional dependency is not installed
+    """
+    return MARKDOWN_BACKENDS[resolve_backend_name(name)]()
@@ -2,10 +2,29 @@
 Markdown conversion utilities.
 """
 
+import os
+import threading
 from pathlib import Path
-import markdown
+from urllib.parse import urljoin
+
+import lxml.html
 from weasyprint import HTML
 
+from ..utils.reproducible import build_datetime, content_id, is_reproducible
+from .asset_cache import as_base_url, find_asset_urls, get_asset_cache
+from .markdown_backends import (
+    MarkdownBackend,
+    PythonMarkdownBackend,
+    get_markdown_backend,
+    resolve_backend_name,
+)
+from .render_context import get_render_context
+from .reportlab_backend import is_simple_document, render_pdf
+
+# PDF backends; 'auto' uses ReportLab for simple documents, WeasyPrint otherwise
+PDF_BACKENDS = ('auto', 'weasyprint', 'reportlab')
+PDF_BACKEND_ENV_VAR = 'ENCLOSE_PDF_BACKEND'
+
 
 def create_example_markdown(output_dir):
     """Create an example markdown file."""
@@ -49,206 +68,508 @@ Thank you for your business!
     return file_path
 
 
-def markdown_to_html(md_file, output_dir, output_file=None):
-    """Convert markdown to HTML.
-
-    Args:
-        md_file: Path or string to the input markdown file
-        output_dir: Directory to save the output HTML
-        output_file: Optional output filename (without extension)
-
-    Returns:
-        Path to the generated HTML file
-    """
-    # Handle both string paths and Path objects
-    md_path = Path(md_file) if not isinstance(md_file, Path) else md_file
-    output_dir = Path(output_dir)
-
-    # Read markdown content
-    with open(md_path, 'r', encoding='utf-8') as f:
-        md_content = f.read()
-
-    # Convert markdown to HTML
-    extensions = ['tables', 'fenced_code', 'codehilite']
-    html_content = markdown.markdown(md_content, extensions=extensions)
-    
-    # Add CSS styling for better HTML output
-    styled_html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{md_path.stem}</title>
-    <style>
-        body {{
+# Default stylesheet embedded in every generated page
+PAGE_STYLE = """        body {
             font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Helvetica, Arial, sans-serif;
             line-height: 1.6;
             max-width: 800px;
             margin: 0 auto;
             padding: 20px;
             color: #24292e;
-        }}
-        h1, h2, h3, h4, h5, h6 {{
+        }
+        h1, h2, h3, h4, h5, h6 {
             color: #2c3e50;
             margin-top: 24px;
             margin-bottom: 16px;
             font-weight: 600;
             line-height: 1.25;
-        }}
-        h1 {{
+        }
+        h1 {
             font-size: 2em;
             border-bottom: 1px solid #eaecef;
             padding-bottom: 0.3em;
-        }}
-        h2 {{
+        }
+        h2 {
             font-size: 1.5em;
             border-bottom: 1px solid #eaecef;
             padding-bottom: 0.3em;
-        }}
-        p, ul, ol, dl, table, pre, blockquote {{
+        }
+        p, ul, ol, dl, table, pre, blockquote {
             margin-top: 0;
             margin-bottom: 16px;
-        }}
-        a {{
+        }
+        a {
             color: #0366d6;
             text-decoration: none;
-        }}
-        a:hover {{
+        }
+        a:hover {
             text-decoration: underline;
-        }}
-        table {{
+        }
+        table {
             border-collapse: collapse;
             width: 100%;
             margin: 16px 0;
             display: block;
             overflow-x: auto;
-        }}
-        th, td {{
+        }
+        th, td {
             border: 1px solid #dfe2e5;
             padding: 8px 12px;
             text-align: left;
-        }}
-        th {{
+        }
+        th {
             background-color: #f6f8fa;
             font-weight: 600;
-        }}
-        tr:nth-child(even) {{
+        }
+        tr:nth-child(even) {
             background-color: #f6f8fa;
-        }}
-        code {{
+        }
+        code {
             background-color: rgba(27, 31, 35, 0.05);
             border-radius: 3px;
             font-family: "SFMono-Regular", Consolas, "Liberation Mono", Menlo, monospace;
             padding: 0.2em 0.4em;
             font-size: 85%;
-        }}
-        pre {{
+        }
+        pre {
             background-color: #f6f8fa;
             border-radius: 6px;
             padding: 16px;
             overflow: auto;
             line-height: 1.45;
-        }}
-        pre code {{
+        }
+        pre code {
             background-color: transparent;
             padding: 0;
             font-size: 85%;
             line-height: 1.45;
-        }}
-        blockquote {{
+        }
+        blockquote {
             border-left: 4px solid #dfe2e5;
             color: #6a737d;
             margin: 0 0 16px 0;
             padding: 0 1em;
-        }}
-        img {{
+        }
+        img {
             max-width: 100%;
             box-sizing: border-box;
             display: block;
             margin: 0 auto;
-        }}
-        hr {{
+        }
+        hr {
             height: 0.25em;
             padding: 0;
             margin: 24px 0;
             background-color: #e1e4e8;
             border: 0;
-        }}
-        @media (prefers-color-scheme: dark) {{
-            body {{
+        }
+        @media (prefers-color-scheme: dark) {
+            body {
                 background-color: #0d1117;
                 color: #c9d1d9;
-            }}
-            h1, h2, h3, h4, h5, h6 {{
+            }
+            h1, h2, h3, h4, h5, h6 {
                 color: #e6edf3;
                 border-color: #30363d;
-            }}
-            a {{
+            }
+            a {
                 color: #58a6ff;
-            }}
-            code, pre {{
+            }
+            code, pre {
                 background-color: rgba(110, 118, 129, 0.4);
-            }}
-            th, tr:nth-child(even) {{
+            }
+            th, tr:nth-child(even) {
                 background-color: #161b22;
-            }}
-            td, th {{
+            }
+            td, th {
                 border-color: #30363d;
-            }}
-            blockquote {{
+            }
+            blockquote {
                 color: #8b949e;
                 border-color: #30363d;
-            }}
-        }}
-    </style>
+            }
+        }
+"""
+
+# Page template; ``{title}``, ``{style}`` and ``{content}`` are filled per document
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <style>
+{style}    </style>
 </head>
 <body>
     <article class="markdown-body">
-        {html_content}
+        {content}
     </article>
 </body>
-</html>
+</html>"""
+
+
+# Stylesheet for bundles: every document starts on a new page and gets an
+# outline entry of its own, with its headings nested one level below it
+BUNDLE_STYLE = """        .bundle-document {
+            break-before: page;
+            bookmark-level: 1;
+            bookmark-label: attr(data-title);
+        }
+        .bundle-document:first-child {
+            break-before: auto;
+        }
+        .bundle-document h1 { bookmark-level: 2; }
+        .bundle-document h2 { bookmark-level: 3; }
+        .bundle-document h3 { bookmark-level: 4; }
+        .bundle-document h4 { bookmark-level: 5; }
+        .bundle-document h5 { bookmark-level: 6; }
+        .bundle-document h6 { bookmark-level: 7; }
 """
 
-    # Generate output path
-    if output_file is None:
-        output_file = md_path.stem
-    html_path = output_dir / f"{output_file}.html"
 
-    # Write HTML to file
-    with open(html_path, 'w', encoding='utf-8') as f:
-        f.write(styled_html.strip())
+class MarkdownRenderer:
+    """Reusable Markdown to HTML renderer.
 
+    The Markdown backend (with its extensions) and the page template are
+    built once and reused for every document, so rendering many short
+    documents is limited by parse cost rather than setup cost. A renderer is
+    not thread-safe; use one instance per thread.
+    """
+
+    def __init__(self, extensions=None, template=PAGE_TEMPLATE, style=PAGE_STYLE,
+                 backend=None):
+        """Build the Markdown backend and precompile the page template.
+
+        Args:
+            extensions: Python-Markdown extensions (default: MARKDOWN_EXTENSIONS);
+                only used by the 'python-markdown' backend
+            template: Page template with ``{title}``, ``{style}`` and ``{content}``
+            style: CSS embedded through the ``{style}`` placeholder
+            backend: MarkdownBackend instance or backend name (default:
+                ``$ENCLOSE_MARKDOWN_BACKEND`` or 'python-markdown')
+        """
+        if backend is None and extensions is not None:
+            backend = PythonMarkdownBackend(extensions)
+        if not isinstance(backend, MarkdownBackend):
+            backend = get_markdown_backend(backend)
+        self.backend = backend
+
+        # Split the template around its placeholders once; rendering is then
+        # a single join instead of a full str.format of the stylesheet
+        head, rest = template.replace('{style}', style).split('{title}', 1)
+        middle, tail = rest.split('{content}', 1)
+        self._template_parts = (head, middle, tail)
+
+    def reset(self):
+        """Reset per-document parser state (references, footnotes, ...)."""
+        self.backend.reset()
+        return self
+
+    def convert(self, md_content):
+        """Convert Markdown text to an HTML fragment."""
+        try:
+            return self.backend.convert(md_content)
+        finally:
+            self.reset()
+
+    def render(self, md_content, title=""):
+        """Convert Markdown text to a complete, styled HTML page."""
+        return self.wrap(self.convert(md_content), title)
+
+    def wrap(self, fragment, title=""):
+        """Wrap an already converted HTML fragment in the page template."""
+        head, middle, tail = self._template_parts
+        return "".join((head, title, middle, fragment, tail))
+
+    def render_file(self, md_file, output_dir, output_file=None):
+        """Render a Markdown file to an HTML file.
+
+        Args:
+            md_file: Path or string to the input markdown file
+            output_dir: Directory to save the output HTML
+            output_file: Optional output filename (without extension)
+
+        Returns:
+            Path to the generated HTML file
+        """
+        md_path = Path(md_file)
+        with open(md_path, 'r', encoding='utf-8') as f:
+            md_content = f.read()
+
+        if output_file is None:
+            output_file = md_path.stem
+        html_path = Path(output_dir) / f"{output_file}.html"
+
+        with open(html_path, 'w', encoding='utf-8') as f:
+            f.write(self.render(md_content, md_path.stem))
+        return html_path
+
+    def render_many(self, md_files, output_dir):
+        """Render Markdown files one by one, yielding each HTML path as it is written.
+
+        Args:
+            md_files: Iterable of markdown file paths
+            output_dir: Directory to save the output HTML files
+
+        Yields:
+            Path to each generated HTML file, in input order
+        """
+        for md_file in md_files:
+            yield self.render_file(md_file, output_dir)
+
+
+_local = threading.local()
+
+
+def get_markdown_renderer(markdown_backend=None, embed_style=True):
+    """Return the renderer shared by module-level calls on this thread.
+
+    Args:
+        markdown_backend: Optional backend name (default:
+            ``$ENCLOSE_MARKDOWN_BACKEND`` or 'python-markdown')
+        embed_style: Whether pages embed PAGE_STYLE in a ``<style>`` element
+    """
+    key = (resolve_backend_name(markdown_backend), embed_style)
+    renderers = getattr(_local, 'renderers', None)
+    if renderers is None:
+        renderers = _local.renderers = {}
+    if key not in renderers:
+        style = PAGE_STYLE if embed_style else ""
+        renderers[key] = MarkdownRenderer(backend=key[0], style=style)
+    return renderers[key]
+
+
+def markdown_to_html(md_file, output_dir, output_file=None, markdown_backend=None):
+    """Convert markdown to HTML.
+
+    Args:
+        md_file: Path or string to the input markdown file
+        output_dir: Directory to save the output HTML
+        output_file: Optional output filename (without extension)
+        markdown_backend: Optional Markdown backend name
+
+    Returns:
+        Path to the generated HTML file
+    """
+    renderer = get_markdown_renderer(markdown_backend)
+    html_path = renderer.render_file(md_file, output_dir, output_file)
     print(f"Created: {html_path}")
     return html_path
 
 
-def markdown_to_pdf(md_file, output_dir, output_file=None):
+def select_pdf_backend(fragment, pdf_backend=None, theme=None):
+    """Choose the PDF backend for a converted document.
+
+    Args:
+        fragment: HTML fragment of the document
+        pdf_backend: 'auto', 'weasyprint' or 'reportlab' (default:
+            ``$ENCLOSE_PDF_BACKEND`` or 'auto')
+        theme: Custom CSS theme; themes are only honoured by WeasyPrint, so
+            'auto' never picks ReportLab when one is given
+
+    Returns:
+        'weasyprint' or 'reportlab'
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    name = (pdf_backend or os.environ.get(PDF_BACKEND_ENV_VAR) or 'auto').lower()
+    if name not in PDF_BACKENDS:
+        raise ValueError(
+            f"Unknown PDF backend: {name} (choose from {', '.join(PDF_BACKENDS)})"
+        )
+    if name == 'auto':
+        if theme is None and is_simple_document(fragment):
+            return 'reportlab'
+        return 'weasyprint'
+    return name
+
+
+def _write_weasyprint_pdf(html, pdf_path, theme, source):
+    """Lay out a page with the shared render context and asset cache.
+
+    In reproducible mode the PDF gets the fixed build date and an identifier
+    derived from the page source instead of WeasyPrint's defaults.
+    """
+    context = get_render_context(PAGE_STYLE, theme)
+    image_cache = get_asset_cache().images
+    if not is_reproducible():
+        return context.write_pdf(html, str(pdf_path), image_cache=image_cache)
+
+    document = context.render(html, image_cache=image_cache)
+    created = build_datetime().strftime('%Y-%m-%dT%H:%M:%SZ')
+    document.metadata.created = document.metadata.modified = created
+    return document.write_pdf(str(pdf_path), identifier=content_id(source).encode('ascii'))
+
+
+def render_markdown_pdf(md_content, pdf_path, title="", base_url=None,
+                        markdown_backend=None, theme=None, pdf_backend=None):
+    """Render Markdown text to a PDF file.
+
+    Args:
+        md_content: Markdown text
+        pdf_path: Path of the PDF to write
+        title: Document title
+        base_url: Base URL (or directory) for relative links and images
+        markdown_backend: Optional Markdown backend name
+        theme: Optional custom CSS file (or list of files)
+        pdf_backend: 'auto', 'weasyprint' or 'reportlab'
+
+    Returns:
+        Path to the generated PDF file
+    """
+    # The stylesheet is compiled once in the render context, so the page is
+    # rendered without an inline copy of it
+    renderer = get_markdown_renderer(markdown_backend, embed_style=False)
+    fragment = renderer.convert(md_content)
+
+    if select_pdf_backend(fragment, pdf_backend, theme) == 'reportlab':
+        render_pdf(fragment, pdf_path, title=title)
+    else:
+        # Fetch every referenced asset in parallel before layout; WeasyPrint
+        # then reads them, and already decoded images, from the asset cache
+        assets = get_asset_cache()
+        base_url = as_base_url(base_url)
+        assets.prefetch(find_asset_urls(fragment, base_url))
+        page = renderer.wrap(fragment, title)
+        html = HTML(string=page, base_url=base_url, url_fetcher=assets)
+        _write_weasyprint_pdf(html, pdf_path, theme, page)
+    return pdf_path
+
+
+def markdown_to_pdf(md_file, output_dir, output_file=None, markdown_backend=None,
+                    theme=None, pdf_backend=None, chunked=False, workers=None,
+                    limits=None):
     """Convert markdown to PDF.
 
+    Simple documents (headings, paragraphs, lists, tables) are rendered with
+    ReportLab; everything else goes through WeasyPrint, whose font
+    configuration and stylesheets come from the per-process render context and
+    whose images and stylesheets are fetched through the asset cache.
+
     Args:
         md_file: Path or string to the input markdown file
         output_dir: Directory to save the output PDF
         output_file: Optional output filename (without extension)
+        markdown_backend: Optional Markdown backend name
+        theme: Optional custom CSS file (or list of files) applied after the
+            default stylesheet
+        pdf_backend: 'auto', 'weasyprint' or 'reportlab' (default:
+            ``$ENCLOSE_PDF_BACKEND`` or 'auto')
+        chunked: Split the document at top-level headings and render the
+            chunks in parallel worker processes (see ``chunked_pdf``)
+        workers: Number of worker processes for chunked rendering
+        limits: ``WorkerLimits`` for the chunk layouts of chunked rendering
 
     Returns:
         Path to the generated PDF file
     """
-    # First convert to HTML
-    html_path = markdown_to_html(md_file, output_dir, output_file)
+    md_path = Path(md_file)
 
     # Generate PDF path
     if output_file is None:
-        output_file = Path(md_file).stem
+        output_file = md_path.stem
     pdf_path = Path(output_dir) / f"{output_file}.pdf"
 
-    # Convert HTML to PDF
-    HTML(filename=str(html_path)).write_pdf(str(pdf_path))
+    if chunked:
+        from .chunked_pdf import render_chunked_pdf
+
+        render_chunked_pdf(
+            md_path, pdf_path, workers=workers, markdown_backend=markdown_backend,
+            theme=theme, pdf_backend=pdf_backend, limits=limits,
+        )
+    else:
+        with open(md_path, 'r', encoding='utf-8') as f:
+            md_content = f.read()
+        render_markdown_pdf(
+            md_content, pdf_path, md_path.stem, str(md_path.parent.absolute()),
+            markdown_backend, theme, pdf_backend,
+        )
+
+    print(f"Created: {pdf_path}")
+    return pdf_path
+
+
+def bundle_section(fragment, title, base_url=None):
+    """Wrap a document's HTML fragment in a bundle section.
+
+    Relative links and image sources are resolved against the document's own
+    base URL, since a bundle page has no single base URL.
+
+    Args:
+        fragment: HTML fragment of the document
+        title: Outline label of the document
+        base_url: Base URL (or directory) of the document
+
+    Returns:
+        HTML of a ``<section class="bundle-document">`` element
+    """
+    section = lxml.html.fragment_fromstring(fragment or "", create_parent='section')
+    section.set('class', 'bundle-document')
+    section.set('data-title', title)
+    base_url = as_base_url(base_url)
+    if base_url:
+        section.rewrite_links(
+            lambda link: link if link.startswith('#') else urljoin(base_url, link)
+        )
+    return lxml.html.tostring(section, encoding='unicode')
+
+
+def markdown_to_pdf_bundle(md_files, output_dir, output_file="bundle",
+                           markdown_backend=None, theme=None, pdf_backend=None):
+    """Render several markdown files into one PDF in a single layout pass.
+
+    All documents share one WeasyPrint layout, so fonts are embedded and
+    subset once for the whole bundle. Each document starts on a new page and
+    gets a top-level outline entry with its own headings nested below it.
+
+    Args:
+        md_files: Markdown files, in bundle order
+        output_dir: Directory to save the output PDF
+        output_file: Output filename (without extension)
+        markdown_backend: Optional Markdown backend name
+        theme: Optional custom CSS file (or list of files) applied after the
+            default stylesheet
+        pdf_backend: 'auto' or 'weasyprint'; the single layout pass needs
+            WeasyPrint, so 'reportlab' is refused
+
+    Returns:
+        Path to the generated PDF file
+
+    Raises:
+        ValueError: If there are no files or the PDF backend cannot bundle
+    """
+    md_files = list(md_files)
+    if not md_files:
+        raise ValueError("A bundle needs at least one Markdown file")
+    name = (pdf_backend or 'auto').lower()
+    if name not in PDF_BACKENDS:
+        raise ValueError(
+            f"Unknown PDF backend: {name} (choose from {', '.join(PDF_BACKENDS)})"
+        )
+    if name == 'reportlab':
+        raise ValueError("Bundles are laid out by WeasyPrint; use pdf_backend='weasyprint'")
 
-    # Clean up the temporary HTML file if it's different from the output file
-    if html_path != pdf_path.with_suffix('.html'):
-        html_path.unlink()
+    renderer = get_markdown_renderer(markdown_backend, embed_style=False)
+    bundle_renderer = MarkdownRenderer(backend=renderer.backend, style=BUNDLE_STYLE)
+
+    sections = []
+    for md_file in md_files:
+        md_path = Path(md_file)
+        with open(md_path, 'r', encoding='utf-8') as f:
+            fragment = renderer.convert(f.read())
+        sections.append(
+            bundle_section(fragment, md_path.stem, str(md_path.parent.absolute()))
+        )
+    body = "\n".join(sections)
+
+    pdf_path = Path(output_dir) / f"{output_file}.pdf"
+    assets = get_asset_cache()
+    assets.prefetch(find_asset_urls(body))
+    page = bundle_renderer.wrap(body, output_file)
+    html = HTML(string=page, url_fetcher=assets)
+    _write_weasyprint_pdf(html, pdf_path, theme, page)
 
     print(f"Created: {pdf_path}")
     return pdf_path
@@ -2,9 +2,10 @@
 
 import base64
 import io
-from datetime import datetime
-from pathlib import Path
-from typing import Any, Dict, List, Tuple, Union
+import os
+import re
+from pathlib import Path, PurePosixPath, PureWindowsPath
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 from PIL import Image
 from typing_extensions import TypedDict
@@ -12,44 +13,34 @@ from typing_extensions import TypedDict
 # cairosvg doesn't have type stubs
 import cairosvg  # type: ignore[import-untyped]
 
+from ..utils.blob_store import BLOB_DIR_NAME, BlobStore
+from ..utils.file_utils import SVGZ_COMPRESSLEVEL, is_svgz, open_svg
+from ..utils.reproducible import build_timestamp
+from .raster import (
+    DEFAULT_PROFILE,
+    DEFAULT_TILE_OVERLAP,
+    PROFILE_PRESETS,
+    OutputProfile,
+    parse_profiles,
+    render_tiles,
+    render_variants,
+    with_encoding,
+)
 
-def pdf_to_svg(
-    pdf_file: Union[str, Path],
-    output_dir: Union[str, Path],
-) -> Tuple[Path, Dict[str, Any]]:
-    """Convert PDF to SVG with embedded data and metadata.
 
-    Args:
-        pdf_file: Path or string to the input PDF file
-        output_dir: Directory to save the output SVG
+# Container modes: 'embedded' carries the PDF as a base64 data URI,
+# 'referenced' points to the PDF in a content-addressed blob store
+CONTAINER_MODES = ('embedded', 'referenced')
+CONTAINER_ENV_VAR = 'ENCLOSE_SVG_CONTAINER'
 
-    Returns:
-        Tuple of (output_svg_path, metadata_dict)
-    """
-    # Convert to Path objects if they are strings
-    pdf_path = Path(pdf_file) if isinstance(pdf_file, str) else pdf_file
-    output_dir = Path(output_dir) if isinstance(output_dir, str) else output_dir
-    
-    # Ensure output directory exists
-    output_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Create output path
-    output_path = output_dir / f"{pdf_path.stem}.svg"
-    
-    # Read PDF as base64
-    with open(pdf_file, 'rb') as f:
-        pdf_data = base64.b64encode(f.read()).decode('utf-8')
+PDF_DATA_URI_PREFIX = "data:application/pdf;base64,"
 
-    # Create metadata
-    metadata = {
-        "file": str(output_path),
-        "pdf_embedded": True,
-        "pages": [],
-        "total_pages": 1  # Default to 1 page, can be updated if we have page count
-    }
-    
-    # Create SVG with embedded PDF data
-    svg_content = f"""<?xml version="1.0" encoding="UTF-8"?>
+# Bytes of PDF encoded per step; a multiple of 3 so no chunk is padded
+BASE64_CHUNK_SIZE = 3 * 256 * 1024
+
+# SVG container; ``{date}`` is the creation date, ``{src}`` the PDF source
+# and ``{attributes}`` extra attributes of the <embed> element
+SVG_CONTAINER_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
 <svg xmlns="http://www.w3.org/2000/svg"
      xmlns:xlink="http://www.w3.org/1999/xlink"
      width="800" height="1000" viewBox="0 0 800 1000">
@@ -61,7 +52,7 @@ def pdf_to_svg(
             <rdf:Description rdf:about="">
                 <dc:title>PDF Document</dc:title>
                 <dc:creator>Enclose Document Processor</dc:creator>
-                <dc:date>{datetime.now().isoformat()}</dc:date>
+                <dc:date>{date}</dc:date>
                 <dc:description>PDF embedded in SVG container</dc:description>
             </rdf:Description>
         </rdf:RDF>
@@ -73,7 +64,7 @@ def pdf_to_svg(
     <!-- PDF Data (base64 encoded) -->
     <foreignObject width="100%" height="100%">
         <div xmlns="http://www.w3.org/1999/xhtml">
-            <embed src="data:application/pdf;base64,{pdf_data}"
+            <embed src="{src}"{attributes}
                    width="100%" height="100%" type="application/pdf"/>
         </div>
     </foreignObject>
@@ -88,30 +79,267 @@ def pdf_to_svg(
     </text>
 </svg>"""
 
-    # Write SVG to file
-    output_path.write_text(svg_content, encoding='utf-8')
+# The container's <embed> element: its source and checksum attributes
+_EMBED_RE = re.compile(
+    r'<embed src="(?P<src>[^"]*)"(?P<attributes>(?: data-[a-z0-9-]+="[^"]*")*)'
+)
+_ATTRIBUTE_RE = re.compile(r' data-(?P<name>[a-z0-9-]+)="(?P<value>[^"]*)"')
+_DIGEST_RE = re.compile(r'[0-9a-f]{64}')
+
+
+def _container_parts(attributes=""):
+    """Return the container text before and after the PDF source."""
+    head, tail = SVG_CONTAINER_TEMPLATE.split('{src}')
+    return head.replace('{date}', build_timestamp()), tail.replace('{attributes}', attributes)
+
+
+def resolve_container_mode(container=None):
+    """Resolve a container mode, falling back to the environment and 'embedded'.
+
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    container = (container or os.environ.get(CONTAINER_ENV_VAR) or 'embedded').lower()
+    if container not in CONTAINER_MODES:
+        raise ValueError(
+            f"Unknown SVG container mode: {container} "
+            f"(choose from {', '.join(CONTAINER_MODES)})"
+        )
+    return container
+
+
+def pdf_to_svg(
+    pdf_file: Union[str, Path],
+    output_dir: Union[str, Path],
+    container: Optional[str] = None,
+    blob_store: Optional[BlobStore] = None,
+    compress: bool = False,
+    compresslevel: int = SVGZ_COMPRESSLEVEL,
+    output_file: Optional[str] = None,
+) -> Tuple[Path, Dict[str, Any]]:
+    """Convert PDF to SVG with embedded data and metadata.
+
+    Args:
+        pdf_file: Path or string to the input PDF file
+        output_dir: Directory to save the output SVG
+        container: 'embedded' (base64 data URI, the default) or 'referenced'
+            (the PDF goes into a blob store and the SVG holds its path and
+            SHA-256); defaults to ``$ENCLOSE_SVG_CONTAINER``
+        blob_store: Blob store for referenced containers (default:
+            ``<output_dir>/blobs``)
+        compress: Write a gzip-compressed ``.svgz`` container
+        compresslevel: gzip level (1-9) for ``.svgz`` output
+        output_file: Optional output filename (without extension)
+
+    Returns:
+        Tuple of (output_svg_path, metadata_dict)
+    """
+    # Convert to Path objects if they are strings
+    pdf_path = Path(pdf_file) if isinstance(pdf_file, str) else pdf_file
+    output_dir = Path(output_dir) if isinstance(output_dir, str) else output_dir
+    container = resolve_container_mode(container)
+    
+    # Ensure output directory exists
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Create output path
+    if output_file is None:
+        output_file = pdf_path.stem
+    output_path = output_dir / f"{output_file}.{'svgz' if compress else 'svg'}"
+
+    # Create metadata
+    metadata = {
+        "file": str(output_path),
+        "pdf_embedded": container == 'embedded',
+        "pages": [],
+        "total_pages": 1  # Default to 1 page, can be updated if we have page count
+    }
+
+    if container == 'referenced':
+        blob_store = blob_store or BlobStore(output_dir / BLOB_DIR_NAME)
+        digest = blob_store.put_file(pdf_path)
+        src = Path(os.path.relpath(blob_store.path(digest), output_dir)).as_posix()
+        size = blob_store.path(digest).stat().st_size
+        attributes = f' data-sha256="{digest}" data-size="{size}"'
+        metadata.update({"pdf_ref": src, "pdf_sha256": digest})
+    else:
+        src = None
+        attributes = ""
+
+    # Write the SVG with the embedded or referenced PDF. Embedded PDFs are
+    # base64 encoded in chunks straight into the (optionally gzip) stream, so
+    # neither the PDF nor its encoding is held in memory
+    head, tail = _container_parts(attributes)
+    with open_svg(output_path, 'w', compresslevel) as out:
+        out.write(head)
+        if src is None:
+            out.write(PDF_DATA_URI_PREFIX)
+            with open(pdf_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(BASE64_CHUNK_SIZE), b''):
+                    out.write(base64.b64encode(chunk).decode('ascii'))
+        else:
+            out.write(src)
+        out.write(tail)
     print(f"Created: {output_path}")
     return output_path, metadata
 
 
-class PageInfo(TypedDict):
+def read_container_pdf(
+    svg_file: Union[str, Path],
+    blob_store: Optional[BlobStore] = None,
+) -> bytes:
+    """Return the PDF carried by an SVG container, embedded or referenced.
+
+    Referenced PDFs are read by their ``data-sha256`` checksum from
+    ``blob_store``, by default the ``blobs`` store next to the container,
+    and verified against it. Containers come from anywhere, so the path
+    stored in one is only followed when it is relative and stays inside
+    that default store.
+
+    Raises:
+        ValueError: If the SVG holds no PDF, a reference has no checksum or
+            leaves the blob store, or the checksum does not match
+        FileNotFoundError: If a referenced PDF is missing
+    """
+    svg_file = Path(svg_file)
+    with open_svg(svg_file) as f:
+        match = _EMBED_RE.search(f.read())
+    if match is None:
+        raise ValueError(f"No PDF found in SVG container: {svg_file}")
+
+    src = match.group('src')
+    if src.startswith(PDF_DATA_URI_PREFIX):
+        return base64.b64decode(src[len(PDF_DATA_URI_PREFIX):])
+
+    attributes = dict(_ATTRIBUTE_RE.findall(match.group('attributes')))
+    digest = attributes.get('sha256', '')
+    if not _DIGEST_RE.fullmatch(digest):
+        raise ValueError(f"Referenced PDF without a SHA-256 checksum in {svg_file}")
+    if blob_store is None:
+        blob_store = BlobStore(svg_file.parent / BLOB_DIR_NAME)
+        _check_reference(src, svg_file, blob_store)
+    return blob_store.get(digest)
+
+
+def _check_reference(src, svg_file, blob_store):
+    # A container's PDF path must stay inside the blob store next to it
+    windows_path = PureWindowsPath(src)
+    unsafe = (
+        PurePosixPath(src).is_absolute() or windows_path.drive or windows_path.root
+        or '..' in windows_path.parts
+    )
+    if not unsafe:
+        try:
+            (svg_file.parent / src).resolve().relative_to(blob_store.root.resolve())
+        except ValueError:
+            unsafe = True
+    if unsafe:
+        raise ValueError(f"PDF reference {src!r} in {svg_file} is outside the blob store")
+
+
+def inline_svg_container(
+    svg_file: Union[str, Path],
+    output_path: Union[str, Path],
+    blob_store: Optional[BlobStore] = None,
+) -> Path:
+    """Export an SVG container with its PDF inlined as a base64 data URI.
+
+    Referenced containers become self-contained, identical to an 'embedded'
+    container; embedded containers are copied unchanged. Either side may be
+    an ``.svgz`` file.
+
+    Args:
+        svg_file: Path to the SVG container
+        output_path: Path of the self-contained SVG to write
+        blob_store: Optional blob store holding referenced PDFs
+
+    Returns:
+        Path to the exported SVG
+    """
+    svg_file = Path(svg_file)
+    output_path = Path(output_path)
+    with open_svg(svg_file) as f:
+        content = f.read()
+    match = _EMBED_RE.search(content)
+    if match is not None and not match.group('src').startswith(PDF_DATA_URI_PREFIX):
+        pdf_data = base64.b64encode(read_container_pdf(svg_file, blob_store)).decode('utf-8')
+        content = "".join((
+            content[:match.start()],
+            f'<embed src="{PDF_DATA_URI_PREFIX}{pdf_data}"',
+            content[match.end():],
+        ))
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open_svg(output_path, 'w') as f:
+        f.write(content)
+    print(f"Created: {output_path}")
+    return output_path
+
+
+class VariantInfo(TypedDict):
+    profile: str
+    file: str
+    width: int
+    height: int
+    dpi: float
+    format: str
+
+
+class TileInfo(TypedDict):
+    row: int
+    col: int
+    x: int
+    y: int
+    width: int
+    height: int
+    file: str
+
+
+class _PageInfoBase(TypedDict):
     page: int
     file: str
     width: int
     height: int
 
 
+class PageInfo(_PageInfoBase, total=False):
+    variants: List[VariantInfo]
+    dpi: float
+    format: str
+    overlap: int
+    tiles: List[TileInfo]
+
+
 def svg_to_png(
     svg_file: Union[str, Path],
     metadata: Dict[str, Any],
     output_dir: Union[str, Path],
+    profiles: Optional[Sequence[Union[str, OutputProfile]]] = None,
+    encoding: Optional[Union[str, Dict[str, Any]]] = None,
+    tile_size: Optional[int] = None,
+    tile_overlap: int = DEFAULT_TILE_OVERLAP,
 ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     """Convert SVG to PNG images.
 
     Args:
-        svg_file: Path or string to the input SVG file
+        svg_file: Path or string to the input SVG (or SVGZ) file
         metadata: Metadata from the PDF to SVG conversion
         output_dir: Directory to save the output PNG files
+        profiles: Output profiles (or preset names, see
+            ``raster.PROFILE_PRESETS``). The page is rendered once and every
+            profile's variant is derived from that render; the page info
+            lists them under ``variants`` and describes the first one.
+            Without profiles a single ``<stem>.png`` is written.
+        encoding: Encoding preset name (see ``raster.ENCODING_PRESETS``) or
+            dict of encoding fields (``format``, ``quality``,
+            ``compress_level``, ``optimize``, ``colors``, optionally on top
+            of a ``preset``) applied to every profile. Without profiles it
+            re-encodes the single page image.
+        tile_size: Render the page as tiles of this many pixels instead of
+            one bitmap, bounding memory by the tile size. Uses the single
+            given profile (default: 'ocr'); the page info's ``file`` is the
+            source SVG and ``tiles`` lists the tile images.
+        tile_overlap: Pixels shared by neighbouring tiles
 
     Returns:
         Tuple of (list of page info dicts, updated metadata)
@@ -125,13 +353,68 @@ def svg_to_png(
     # Ensure output directory exists
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    if profiles or encoding or tile_size:
+        suffix = bool(profiles)
+        default = PROFILE_PRESETS['ocr'] if tile_size else DEFAULT_PROFILE
+        profiles = [
+            parse_profiles([p])[0] if isinstance(p, str) else p
+            for p in profiles or [default]
+        ]
+        if isinstance(encoding, str):
+            encoding = {'preset': encoding}
+        if encoding:
+            encoding = dict(encoding)
+            profiles = with_encoding(profiles, encoding.pop('preset', None), **encoding)
+        if tile_size and len(profiles) > 1:
+            raise ValueError("Tiled rendering takes a single output profile")
+        try:
+            if tile_size:
+                tiled = render_tiles(
+                    svg_file, output_dir, profiles[0], tile_size, tile_overlap
+                )
+                page = {"page": 1, "file": str(svg_file.absolute())}
+                page.update(tiled)
+                page_info = [page]
+                created = [tile["file"] for tile in tiled["tiles"]]
+            else:
+                variants = render_variants(svg_file, output_dir, profiles, suffix=suffix)
+                primary = variants[0]
+                page_info = [
+                    {
+                        "page": 1,
+                        "file": primary["file"],
+                        "width": primary["width"],
+                        "height": primary["height"],
+                        "variants": variants,
+                    },
+                ]
+                created = [variant["file"] for variant in variants]
+        except Exception as e:
+            raise RuntimeError(f"Failed to convert SVG to PNG: {str(e)}")
+
+        metadata.update(
+            {
+                "pages": page_info,
+                "converted_at": build_timestamp(),
+            }
+        )
+        for file in created:
+            print(f"Created: {file}")
+        return page_info, metadata
+
     try:
         # Create output filename
         output_path = output_dir / f"{svg_file.stem}.png"
         svg_path = str(svg_file.absolute())
 
-        # Convert SVG to PNG using cairosvg
-        png_data = cairosvg.svg2png(url=svg_path)
+        # Convert SVG to PNG using cairosvg; SVGZ is decompressed first
+        if is_svgz(svg_file):
+            with open_svg(svg_file) as f:
+                png_data = cairosvg.svg2png(
+                    bytestring=f.read().encode('utf-8'), url=svg_path
+                )
+        else:
+            png_data = cairosvg.svg2png(url=svg_path)
 
         # Save the PNG data to a file and get dimensions
         with open(output_path, 'wb') as f:
@@ -151,7 +434,7 @@ def svg_to_png(
         metadata.update(
             {
                 "pages": page_info,
-                "converted_at": datetime.now().isoformat(),
+                "converted_at": build_timestamp(),
             }
         )
 
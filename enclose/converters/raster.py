@@ -0,0 +1,473 @@
+"""
+Multi-resolution rasterization of SVG pages.
+
+A pipeline that needs both high-DPI images for OCR and small previews would
+otherwise rasterize every page once per resolution. ``render_variants``
+renders each page once, at the highest resolution any output profile needs,
+and derives every variant from that bitmap by downscaling in memory.
+
+Each profile also says how its variant is encoded: the format, the lossy
+quality, the zlib level and ``optimize`` pass for PNG, and an optional
+palette size to quantize to. ``ENCODING_PRESETS`` names common trade-offs
+between encode time and file size.
+
+Large-format pages (A0 posters, engineering drawings) are too big to hold as
+one bitmap at OCR resolution. ``iter_tiles`` renders such a page as a grid of
+overlapping tiles, one at a time, by pointing the SVG's ``viewBox`` at each
+tile's region; peak memory is bounded by the tile size, not the page size.
+"""
+
+import gzip
+import io
+import re
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from lxml import etree
+from PIL import Image
+
+# cairosvg doesn't have type stubs
+import cairosvg  # type: ignore[import-untyped]
+
+from ..utils.file_utils import is_svgz, open_svg
+
+# cairosvg renders one CSS pixel per pixel at scale 1, i.e. 96 DPI
+CSS_DPI = 96
+
+# Tile edge and overlap in pixels for tiled rendering
+DEFAULT_TILE_SIZE = 2048
+DEFAULT_TILE_OVERLAP = 128
+
+# CSS pixels per SVG length unit
+_UNITS = {
+    '': 1.0, 'px': 1.0, 'pt': 4 / 3, 'pc': 16.0,
+    'mm': CSS_DPI / 25.4, 'cm': CSS_DPI / 2.54, 'in': float(CSS_DPI),
+}
+_LENGTH_RE = re.compile(r'^\s*([0-9.eE+-]+)\s*([a-z]*)\s*$')
+
+# File extensions per output format
+FORMAT_EXTENSIONS = {'png': 'png', 'webp': 'webp', 'jpeg': 'jpg'}
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    """One raster variant of a page.
+
+    Attributes:
+        name: Variant name, used in file names and metadata
+        dpi: Target resolution; ignored when ``width`` is set
+        width: Target width in pixels (height keeps the aspect ratio)
+        mode: Optional Pillow mode, e.g. 'L' for grayscale
+        format: Output format: 'png', 'webp' or 'jpeg'
+        quality: WebP/JPEG quality (1-100, default: Pillow's)
+        compress_level: PNG zlib level (0-9, default: Pillow's 6)
+        optimize: Extra encoder pass for smaller PNG/JPEG files
+        colors: Quantize to a palette of this many colors (PNG/WebP)
+    """
+
+    name: str
+    dpi: Optional[float] = None
+    width: Optional[int] = None
+    mode: Optional[str] = None
+    format: str = 'png'
+    quality: Optional[int] = None
+    compress_level: Optional[int] = None
+    optimize: bool = False
+    colors: Optional[int] = None
+
+    def __post_init__(self):
+        if self.format not in FORMAT_EXTENSIONS:
+            raise ValueError(
+                f"Unsupported raster format: {self.format} "
+                f"(choose from {', '.join(FORMAT_EXTENSIONS)})"
+            )
+        if self.quality is not None and not 1 <= self.quality <= 100:
+            raise ValueError(f"Quality must be between 1 and 100: {self.quality}")
+        if self.compress_level is not None and not 0 <= self.compress_level <= 9:
+            raise ValueError(f"PNG compress level must be between 0 and 9: {self.compress_level}")
+        if self.colors is not None and not 2 <= self.colors <= 256:
+            raise ValueError(f"Palette size must be between 2 and 256: {self.colors}")
+        if self.colors and self.format == 'jpeg':
+            raise ValueError("JPEG output cannot use a palette")
+
+    def target_size(self, size, render_dpi):
+        """Pixel size of this variant for a page rendered at ``render_dpi``."""
+        width, height = size
+        if self.width:
+            return self.width, max(1, round(height * self.width / width))
+        if self.dpi:
+            factor = self.dpi / render_dpi
+            return max(1, round(width * factor)), max(1, round(height * factor))
+        return size
+
+
+# Named profiles usable from the CLI
+PROFILE_PRESETS = {
+    'ocr': OutputProfile('ocr', dpi=300, mode='L'),
+    'preview': OutputProfile('preview', dpi=96),
+    'thumbnail': OutputProfile('thumbnail', width=200, format='webp'),
+}
+
+# Profile of the single image written when only an encoding is chosen
+DEFAULT_PROFILE = OutputProfile('page', dpi=CSS_DPI)
+
+# Named encodings, from fastest to smallest
+ENCODING_PRESETS = {
+    'fast': {'format': 'png', 'compress_level': 1},
+    'archival': {'format': 'png', 'compress_level': 9, 'optimize': True},
+    'palette': {'format': 'png', 'colors': 256, 'optimize': True},
+    'webp': {'format': 'webp', 'quality': 80},
+    'jpeg': {'format': 'jpeg', 'quality': 85, 'optimize': True},
+}
+
+# OutputProfile fields that only affect encoding
+ENCODING_FIELDS = ('format', 'quality', 'compress_level', 'optimize', 'colors')
+
+
+def parse_profiles(names: Union[str, Iterable[str]]) -> List[OutputProfile]:
+    """Look up preset profiles by name ('ocr,preview' or a list of names).
+
+    Raises:
+        ValueError: If a name is not a preset
+    """
+    if isinstance(names, str):
+        names = [name.strip() for name in names.split(',') if name.strip()]
+    profiles = []
+    for name in names:
+        if name not in PROFILE_PRESETS:
+            raise ValueError(
+                f"Unknown raster profile: {name} "
+                f"(choose from {', '.join(PROFILE_PRESETS)})"
+            )
+        profiles.append(PROFILE_PRESETS[name])
+    return profiles
+
+
+def with_encoding(
+    profiles: Sequence[OutputProfile],
+    preset: Optional[str] = None,
+    **encoding: Any,
+) -> List[OutputProfile]:
+    """Apply an encoding preset and/or explicit encoding fields to profiles.
+
+    Args:
+        profiles: Output profiles to re-encode
+        preset: Name in ``ENCODING_PRESETS``
+        **encoding: ``ENCODING_FIELDS`` overriding the preset; ``None``
+            values are ignored
+
+    Raises:
+        ValueError: If the preset or a field is unknown, or a value is invalid
+    """
+    fields: Dict[str, Any] = {}
+    if preset is not None:
+        if preset not in ENCODING_PRESETS:
+            raise ValueError(
+                f"Unknown encoding preset: {preset} "
+                f"(choose from {', '.join(ENCODING_PRESETS)})"
+            )
+        fields.update(ENCODING_PRESETS[preset])
+    for name, value in encoding.items():
+        if name not in ENCODING_FIELDS:
+            raise ValueError(f"Unknown encoding option: {name}")
+        if value is not None:
+            fields[name] = value
+    return [replace(p, **fields) for p in profiles]
+
+
+def render_dpi(profiles: Sequence[OutputProfile]) -> float:
+    """The single resolution a page is rendered at for a set of profiles."""
+    return max([p.dpi for p in profiles if p.dpi and not p.width] or [CSS_DPI])
+
+
+def rasterize_svg(svg_file: Union[str, Path], dpi: float = CSS_DPI) -> Image.Image:
+    """Render an SVG (or SVGZ) file to a Pillow image at the given resolution."""
+    svg_file = Path(svg_file)
+    options = {'url': str(svg_file.absolute()), 'scale': dpi / CSS_DPI}
+    if is_svgz(svg_file):
+        with open_svg(svg_file) as f:
+            options['bytestring'] = f.read().encode('utf-8')
+    image = Image.open(io.BytesIO(cairosvg.svg2png(**options)))
+    image.load()
+    return image
+
+
+def flatten(image: Image.Image) -> Image.Image:
+    """Composite an image with transparency onto white, as a page is printed."""
+    if image.mode in ('L', 'RGB'):
+        return image
+    if image.mode in ('RGBA', 'LA') or 'transparency' in image.info:
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def encode_image(
+    image: Image.Image,
+    profile: OutputProfile,
+    output: Any,
+    dpi: Optional[float] = None,
+) -> None:
+    """Encode an image as a profile says.
+
+    Args:
+        image: Image to encode
+        profile: Profile with the encoding settings
+        output: File path or binary file object
+        dpi: Resolution recorded in PNG/JPEG files, so later stages (e.g.
+            OCR preprocessing) know the scale
+    """
+    params: Dict[str, Any] = {}
+    if dpi and profile.format != 'webp':
+        params['dpi'] = (dpi, dpi)
+    if profile.format == 'jpeg':
+        image = flatten(image)
+        params['optimize'] = profile.optimize
+    elif profile.format == 'png':
+        params['optimize'] = profile.optimize
+        if profile.compress_level is not None:
+            params['compress_level'] = profile.compress_level
+    elif profile.optimize:
+        # WebP's slowest, smallest method
+        params['method'] = 6
+    if profile.quality is not None and profile.format != 'png':
+        params['quality'] = profile.quality
+
+    if profile.colors:
+        image = flatten(image).quantize(colors=profile.colors)
+    image.save(output, format=profile.format.upper(), **params)
+
+
+def render_variants(
+    svg_file: Union[str, Path],
+    output_dir: Union[str, Path],
+    profiles: Sequence[OutputProfile],
+    stem: Optional[str] = None,
+    suffix: bool = True,
+) -> List[Dict[str, Any]]:
+    """Render a page once and write every profile's variant.
+
+    Args:
+        svg_file: Path to the SVG (or SVGZ) page
+        output_dir: Directory for the variant files
+        profiles: Output profiles; the page is rendered at their highest DPI
+        stem: File name stem (default: the SVG's stem); variants are written
+            as ``<stem>_<profile>.<ext>``
+        suffix: Append the profile name; with ``False`` and a single
+            profile the variant is written as ``<stem>.<ext>``
+
+    Returns:
+        One dict per variant with its profile name, file, size, DPI and format
+    """
+    if not profiles:
+        raise ValueError("At least one output profile is required")
+    svg_file = Path(svg_file)
+    output_dir = Path(output_dir)
+    stem = stem or svg_file.stem
+
+    dpi = render_dpi(profiles)
+    page = rasterize_svg(svg_file, dpi)
+
+    variants = []
+    for profile in profiles:
+        size = profile.target_size(page.size, dpi)
+        image = page if size == page.size else page.resize(size, Image.LANCZOS)
+        if profile.mode and image.mode != profile.mode:
+            image = image.convert(profile.mode)
+
+        name = f"{stem}_{profile.name}" if suffix or len(profiles) > 1 else stem
+        output_path = output_dir / f"{name}.{FORMAT_EXTENSIONS[profile.format]}"
+        variant_dpi = round(dpi * size[0] / page.size[0], 2)
+        encode_image(image, profile, output_path, variant_dpi)
+        variants.append({
+            "profile": profile.name,
+            "file": str(output_path.absolute()),
+            "width": size[0],
+            "height": size[1],
+            "dpi": variant_dpi,
+            "format": profile.format,
+        })
+    return variants
+
+
+@dataclass(frozen=True)
+class Tile:
+    """Pixel region of a page rendered as one tile."""
+
+    row: int
+    col: int
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+def tile_grid(
+    width: int,
+    height: int,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    overlap: int = DEFAULT_TILE_OVERLAP,
+) -> List[Tile]:
+    """Split a page of ``width`` x ``height`` pixels into overlapping tiles.
+
+    Neighbouring tiles share ``overlap`` pixels, so a word cut by one tile's
+    edge is whole in the next one.
+
+    Raises:
+        ValueError: If the overlap is not smaller than the tile size
+    """
+    if tile_size <= 0 or not 0 <= overlap < tile_size:
+        raise ValueError(
+            f"Tile overlap must be smaller than the tile size: {overlap} >= {tile_size}"
+        )
+
+    def starts(length):
+        positions = [0]
+        while positions[-1] + tile_size < length:
+            positions.append(positions[-1] + tile_size - overlap)
+        return positions
+
+    return [
+        Tile(row, col, x, y, min(tile_size, width - x), min(tile_size, height - y))
+        for row, y in enumerate(starts(height))
+        for col, x in enumerate(starts(width))
+    ]
+
+
+def _length(value):
+    match = _LENGTH_RE.match(value or '')
+    if not match or match.group(2) not in _UNITS:
+        return None
+    return float(match.group(1)) * _UNITS[match.group(2)]
+
+
+def _parse_svg(svg_file):
+    # huge_tree: drawings and containers can exceed lxml's default limits
+    parser = etree.XMLParser(huge_tree=True, remove_blank_text=False)
+    if is_svgz(svg_file):
+        with gzip.open(svg_file, 'rb') as f:
+            return etree.parse(f, parser).getroot()
+    return etree.parse(str(svg_file), parser).getroot()
+
+
+def _page_geometry(root):
+    """Size in CSS pixels and viewBox of an SVG root element."""
+    view_box = root.get('viewBox')
+    box = [float(v) for v in re.split(r'[\s,]+', view_box.strip())] if view_box else None
+    width = _length(root.get('width')) or (box[2] if box else None)
+    height = _length(root.get('height')) or (box[3] if box else None)
+    if not width or not height:
+        raise ValueError("SVG has no usable width/height or viewBox")
+    return (width, height), box or [0.0, 0.0, width, height]
+
+
+def svg_page_size(svg_file: Union[str, Path], dpi: float = CSS_DPI) -> Tuple[int, int]:
+    """Pixel size of an SVG page rendered at ``dpi``, without rendering it."""
+    (width, height), _ = _page_geometry(_parse_svg(Path(svg_file)))
+    scale = dpi / CSS_DPI
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def iter_tiles(
+    svg_file: Union[str, Path],
+    dpi: float = CSS_DPI,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    overlap: int = DEFAULT_TILE_OVERLAP,
+    mode: Optional[str] = None,
+) -> Iterator[Tuple[Tile, Image.Image]]:
+    """Render an SVG page tile by tile.
+
+    Each tile is rendered on its own by setting the document's ``viewBox``
+    to the tile's region, so only one tile bitmap exists at a time. The page
+    is assumed to fill its viewport (as PDF-derived pages do); with a
+    ``preserveAspectRatio`` that letterboxes the content, tiles are
+    stretched to the page size instead.
+
+    Args:
+        svg_file: Path to the SVG (or SVGZ) page
+        dpi: Render resolution
+        tile_size: Tile edge in pixels
+        overlap: Pixels shared by neighbouring tiles
+        mode: Optional Pillow mode for the tiles, e.g. 'L'
+
+    Yields:
+        (tile, image) pairs, row by row
+    """
+    svg_file = Path(svg_file)
+    root = _parse_svg(svg_file)
+    (width, height), (vx, vy, vw, vh) = _page_geometry(root)
+    scale = dpi / CSS_DPI
+    page_width, page_height = max(1, round(width * scale)), max(1, round(height * scale))
+    # User units per rendered pixel
+    ux, uy = vw / page_width, vh / page_height
+
+    root.set('preserveAspectRatio', 'none')
+    url = str(svg_file.absolute())
+    for tile in tile_grid(page_width, page_height, tile_size, overlap):
+        root.set('width', f"{tile.width}px")
+        root.set('height', f"{tile.height}px")
+        root.set('viewBox', f"{vx + tile.x * ux} {vy + tile.y * uy} "
+                            f"{tile.width * ux} {tile.height * uy}")
+        png_data = cairosvg.svg2png(
+            bytestring=etree.tostring(root), url=url,
+            output_width=tile.width, output_height=tile.height,
+        )
+        image = Image.open(io.BytesIO(png_data))
+        image.load()
+        if mode and image.mode != mode:
+            image = image.convert(mode)
+        yield tile, image
+
+
+def render_tiles(
+    svg_file: Union[str, Path],
+    output_dir: Union[str, Path],
+    profile: OutputProfile = DEFAULT_PROFILE,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    overlap: int = DEFAULT_TILE_OVERLAP,
+    stem: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Render a page as tiles and write them to disk.
+
+    Args:
+        svg_file: Path to the SVG (or SVGZ) page
+        output_dir: Directory for the tile files
+        profile: Resolution, mode and encoding of the tiles (``width``
+            is not supported for tiles)
+        tile_size: Tile edge in pixels
+        overlap: Pixels shared by neighbouring tiles
+        stem: File name stem (default: the SVG's stem); tiles are written
+            as ``<stem>_<row>_<col>.<ext>``
+
+    Returns:
+        Dict with the page's pixel size, DPI, tile overlap and the tiles
+        (position, size and file of each)
+    """
+    if profile.width:
+        raise ValueError("Tiled rendering needs a DPI-based profile")
+    svg_file = Path(svg_file)
+    output_dir = Path(output_dir)
+    stem = stem or svg_file.stem
+    dpi = profile.dpi or CSS_DPI
+
+    tiles = []
+    for tile, image in iter_tiles(svg_file, dpi, tile_size, overlap, profile.mode):
+        output_path = output_dir / (
+            f"{stem}_{tile.row}_{tile.col}.{FORMAT_EXTENSIONS[profile.format]}"
+        )
+        encode_image(image, profile, output_path, dpi)
+        image.close()
+        tiles.append(dict(asdict(tile), file=str(output_path.absolute())))
+
+    last = tiles[-1]
+    return {
+        "width": last["x"] + last["width"],
+        "height": last["y"] + last["height"],
+        "dpi": dpi,
+        "format": profile.format,
+        "overlap": overlap,
+        "tiles": tiles,
+    }
@@ -0,0 +1,287 @@
+"""
+Lightweight ReportLab PDF backend for simple documents.
+
+WeasyPrint's CSS layout engine is overkill for high-volume simple documents
+such as invoices. This backend renders the HTML fragment produced by the
+Markdown backend directly into ReportLab platypus flowables. It supports
+headings, paragraphs, (nested) lists, tables, horizontal rules and inline
+bold/italic/code/links; ``is_simple_document`` tells whether a document only
+uses those constructs. Headings are added to the PDF outline (bookmarks).
+
+The built-in PDF fonts (Helvetica, Courier) only cover the Windows-1252
+character set, so text outside it (Polish, Cyrillic, CJK, symbols such as
+✓) would render as boxes; such documents are not simple.
+"""
+
+import copy
+from xml.sax.saxutils import escape
+
+import lxml.html
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.platypus import (
+    HRFlowable,
+    ListFlowable,
+    ListItem,
+    Paragraph,
+    SimpleDocTemplate,
+    Spacer,
+    Table,
+    TableStyle,
+)
+
+from ..utils.reproducible import is_reproducible
+
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+BLOCK_TAGS = HEADING_TAGS | {'p', 'ul', 'ol', 'li', 'table', 'thead', 'tbody', 'tr',
+                             'th', 'td', 'hr'}
+INLINE_TAGS = {'strong', 'b', 'em', 'i', 'code', 'a', 'br'}
+SUPPORTED_TAGS = BLOCK_TAGS | INLINE_TAGS
+
+# Inline HTML tags mapped to ReportLab paragraph markup
+_INLINE_MARKUP = {
+    'strong': ('<b>', '</b>'),
+    'b': ('<b>', '</b>'),
+    'em': ('<i>', '</i>'),
+    'i': ('<i>', '</i>'),
+    'code': ('<font face="Courier">', '</font>'),
+}
+
+# Encoding of ReportLab's standard fonts
+FONT_ENCODING = 'cp1252'
+
+_ALIGNMENTS = {'left': TA_LEFT, 'center': TA_CENTER, 'right': TA_RIGHT}
+
+# Colours matching the WeasyPrint stylesheet
+TEXT_COLOR = colors.HexColor('#24292e')
+HEADING_COLOR = colors.HexColor('#2c3e50')
+BORDER_COLOR = colors.HexColor('#dfe2e5')
+STRIPE_COLOR = colors.HexColor('#f6f8fa')
+LINK_COLOR = '#0366d6'
+
+
+def _parse_fragment(fragment):
+    return lxml.html.fragment_fromstring(fragment or "<p></p>", create_parent='div')
+
+
+def is_simple_document(fragment):
+    """Check whether an HTML fragment only uses constructs this backend renders.
+
+    Args:
+        fragment: HTML fragment produced by a Markdown backend
+
+    Returns:
+        True if every element is a supported heading, paragraph, list, table,
+        rule or inline formatting element and the text fits the standard
+        fonts' character set
+    """
+    root = _parse_fragment(fragment)
+    for element in root.iterdescendants():
+        if not isinstance(element.tag, str) or element.tag not in SUPPORTED_TAGS:
+            return False
+    try:
+        root.text_content().encode(FONT_ENCODING)
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _build_styles():
+    sample = getSampleStyleSheet()
+    styles = {
+        'p': ParagraphStyle('Body', parent=sample['BodyText'], fontSize=10,
+                            leading=15, textColor=TEXT_COLOR, spaceAfter=8),
+        'cell': ParagraphStyle('Cell', parent=sample['BodyText'], fontSize=9,
+                               leading=12, textColor=TEXT_COLOR),
+    }
+    for level, size in zip(range(1, 7), (20, 16, 13, 11, 10, 10)):
+        styles[f'h{level}'] = ParagraphStyle(
+            f'Heading{level}', parent=sample[f'Heading{min(level, 6)}'],
+            fontSize=size, leading=size * 1.25, textColor=HEADING_COLOR,
+            spaceBefore=12, spaceAfter=8,
+        )
+    styles['th'] = ParagraphStyle('HeaderCell', parent=styles['cell'],
+                                  fontName='Helvetica-Bold')
+    return styles
+
+
+def _inline_markup(element):
+    """Convert an element's content to ReportLab paragraph markup."""
+    parts = [escape(element.text or "")]
+    for child in element:
+        tag = child.tag
+        if tag == 'br':
+            parts.append('<br/>')
+        elif tag == 'a':
+            href = escape(child.get('href', ''), {'"': '&quot;'})
+            parts.append(f'<a href="{href}" color="{LINK_COLOR}">')
+            parts.append(_inline_markup(child))
+            parts.append('</a>')
+        elif tag in _INLINE_MARKUP:
+            start, end = _INLINE_MARKUP[tag]
+            parts.append(start + _inline_markup(child) + end)
+        else:
+            parts.append(_inline_markup(child))
+        parts.append(escape(child.tail or ""))
+    return "".join(parts)
+
+
+def _cell_alignment(cell):
+    style = cell.get('style', '').replace(' ', '')
+    for name, alignment in _ALIGNMENTS.items():
+        if f'text-align:{name}' in style:
+            return alignment
+    return TA_LEFT
+
+
+class _FlowableBuilder:
+    """Turns a parsed HTML fragment into a list of platypus flowables."""
+
+    def __init__(self, styles, width):
+        self.styles = styles
+        self.width = width
+        self._cell_styles = {}
+
+    def build(self, root):
+        flowables = []
+        if root.text and root.text.strip():
+            flowables.append(Paragraph(escape(root.text.strip()), self.styles['p']))
+        for element in root:
+            flowables.extend(self.block(element))
+        return flowables
+
+    def block(self, element):
+        tag = element.tag
+        if tag in HEADING_TAGS or tag == 'p':
+            return [Paragraph(_inline_markup(element), self.styles[tag])]
+        if tag in ('ul', 'ol'):
+            return [self.list(element), Spacer(1, 4)]
+        if tag == 'table':
+            return [self.table(element), Spacer(1, 8)]
+        if tag == 'hr':
+            return [HRFlowable(width='100%', thickness=2, color=colors.HexColor('#e1e4e8'),
+                               spaceBefore=8, spaceAfter=8)]
+        # Unknown blocks are rejected by is_simple_document; render their text
+        return [Paragraph(_inline_markup(element), self.styles['p'])]
+
+    def list(self, element):
+        items = [ListItem(self.list_item(li)) for li in element.findall('li')]
+        if element.tag == 'ol':
+            return ListFlowable(items, bulletType='1', start=element.get('start', '1'),
+                                leftIndent=14, bulletFontSize=10)
+        return ListFlowable(items, bulletType='bullet', start='•', leftIndent=14,
+                            bulletFontSize=8)
+
+    def list_item(self, li):
+        """Flowables for one <li>: inline runs, loose paragraphs and nested lists."""
+        content = []
+        inline = lxml.html.Element('span')
+        inline.text = li.text
+
+        def flush(run):
+            if (run.text and run.text.strip()) or len(run):
+                content.append(Paragraph(_inline_markup(run), self.styles['p']))
+
+        for child in li:
+            if child.tag in ('p', 'ul', 'ol'):
+                flush(inline)
+                content.extend(self.block(child))
+                inline = lxml.html.Element('span')
+                inline.text = child.tail
+            else:
+                inline.append(copy.deepcopy(child))
+        flush(inline)
+        return content
+
+    def cell_style(self, cell):
+        """Paragraph style for a table cell, cached per tag and alignment."""
+        alignment = _cell_alignment(cell)
+        key = (cell.tag, alignment)
+        if key not in self._cell_styles:
+            parent = self.styles['th' if cell.tag == 'th' else 'cell']
+            self._cell_styles[key] = ParagraphStyle(
+                f'{cell.tag}-{alignment}', parent=parent, alignment=alignment
+            )
+        return self._cell_styles[key]
+
+    def table(self, element):
+        rows = []
+        header_rows = 0
+        for tr in element.iter('tr'):
+            row = []
+            for cell in tr:
+                if cell.tag not in ('th', 'td'):
+                    continue
+                row.append(Paragraph(_inline_markup(cell), self.cell_style(cell)))
+            if row and all(cell.tag == 'th' for cell in tr if cell.tag in ('th', 'td')):
+                header_rows += 1
+            rows.append(row)
+
+        if not rows:
+            return Spacer(1, 0)
+        width = max(len(row) for row in rows)
+        rows = [row + [''] * (width - len(row)) for row in rows]
+
+        commands = [
+            ('GRID', (0, 0), (-1, -1), 0.75, BORDER_COLOR),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('TOPPADDING', (0, 0), (-1, -1), 4),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ]
+        if header_rows:
+            commands.append(('BACKGROUND', (0, 0), (-1, header_rows - 1), STRIPE_COLOR))
+        for index in range(header_rows + 1, len(rows), 2):
+            commands.append(('BACKGROUND', (0, index), (-1, index), STRIPE_COLOR))
+
+        table = Table(rows, repeatRows=header_rows, hAlign='LEFT',
+                      colWidths=[self.width / width] * width)
+        table.setStyle(TableStyle(commands))
+        return table
+
+
+class _OutlineDocTemplate(SimpleDocTemplate):
+    """Document template that bookmarks every heading in the PDF outline."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._outline_level = -1
+        self._bookmarks = 0
+
+    def afterFlowable(self, flowable):
+        if not isinstance(flowable, Paragraph) or not flowable.style.name.startswith('Heading'):
+            return
+        # Outline levels may only deepen one step at a time
+        level = min(int(flowable.style.name[len('Heading'):]) - 1, self._outline_level + 1)
+        self._outline_level = level
+        self._bookmarks += 1
+        key = f'heading-{self._bookmarks}'
+        self.canv.bookmarkPage(key)
+        self.canv.addOutlineEntry(flowable.getPlainText(), key, level=level)
+
+
+def render_pdf(fragment, pdf_path, title=""):
+    """Render an HTML fragment to PDF with ReportLab.
+
+    Args:
+        fragment: HTML fragment produced by a Markdown backend; should satisfy
+            ``is_simple_document``
+        pdf_path: Path of the PDF to write
+        title: Document title stored in the PDF metadata
+
+    Returns:
+        Path to the generated PDF file
+    """
+    # Invariant mode fixes the creation date (honouring SOURCE_DATE_EPOCH)
+    # and derives the document ID from the content
+    doc = _OutlineDocTemplate(
+        str(pdf_path), pagesize=A4, title=title,
+        invariant=1 if is_reproducible() else None,
+        leftMargin=20 * mm, rightMargin=20 * mm, topMargin=20 * mm, bottomMargin=20 * mm,
+    )
+    builder = _FlowableBuilder(_build_styles(), doc.width)
+    flowables = builder.build(_parse_fragment(fragment))
+    doc.build(flowables or [Spacer(1, 0)])
+    return pdf_path
@@ -2,6 +2,17 @@
 Core functionality for document processing pipeline.
 """
 
+from .batch import BatchRunner, RetryPolicy
 from .document_processor import DocumentProcessor
+from .pipeline import OCRPipeline, process_pdf_ocr
+from .scheduler import DeadlineExceeded, Scheduler
 
-__all__ = ['DocumentProcessor']
+__all__ = [
+    'BatchRunner',
+    'DeadlineExceeded',
+    'DocumentProcessor',
+    'OCRPipeline',
+    'RetryPolicy',
+    'Scheduler',
+    'process_pdf_ocr',
+]
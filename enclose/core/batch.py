@@ -0,0 +1,308 @@
+"""
+Resumable batch conversion.
+
+A large batch that dies part-way (out of memory, node preemption) would
+otherwise start again from the first document. ``BatchRunner`` appends a
+record to a JSON Lines manifest after every attempt: the input's SHA-256,
+the stage (output format), the output with its size and SHA-256, and the
+status. Each record is flushed and synced before the next document starts,
+so the manifest survives a crash.
+
+Outputs mirror the inputs' directory layout below their common directory,
+and records belong to an input path and its hash, so inputs of the same
+name or the same content each get their own output.
+
+A run with ``resume=True`` reads the manifest and skips inputs whose output
+is still intact (same size and, unless ``verify='size'``, same hash), and
+converts the rest again: failed, missing or changed outputs and inputs that
+were never reached. Inputs are only rehashed when their size or modification
+time differ from the manifest. Failed conversions are retried with backoff;
+inputs that keep failing across runs are quarantined and skipped.
+
+With ``limits`` every conversion runs in a supervised worker process (see
+``utils.worker_pool``): a document that hangs or exceeds the memory cap is
+recorded as a failure with its ``failure`` kind ('timeout', 'memory',
+'crashed') instead of stalling the batch, and the worker is recycled after a
+number of documents or once its memory grows too large.
+"""
+
+import functools
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from ..utils.blob_store import file_digest
+from ..utils.metadata_utils import JSONLWriter, read_jsonl
+from ..utils.reproducible import build_timestamp
+from ..utils.worker_pool import StageTimeout, WorkerFailure, WorkerLimits, WorkerPool
+from .document_processor import DocumentProcessor
+
+MANIFEST_NAME = 'manifest.jsonl'
+
+# Record statuses
+DONE = 'done'
+FAILED = 'failed'
+QUARANTINED = 'quarantined'
+
+VERIFY_MODES = ('size', 'hash')
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how soon failed conversions are tried again.
+
+    Attributes:
+        attempts: Tries per input and run (1 disables retries)
+        backoff: Seconds to wait before the first retry
+        multiplier: Factor applied to the wait after every retry
+        max_failures: Failed attempts across all runs after which an input
+            is quarantined and skipped; None never quarantines
+        retry_timeouts: Also retry conversions that timed out, which
+            usually time out again
+    """
+
+    attempts: int = 2
+    backoff: float = 1.0
+    multiplier: float = 2.0
+    max_failures: Optional[int] = 3
+    retry_timeouts: bool = False
+
+    def __post_init__(self):
+        if self.attempts < 1:
+            raise ValueError(f"A retry policy needs at least one attempt: {self.attempts}")
+        if self.max_failures is not None and self.max_failures < 1:
+            raise ValueError(f"max_failures must be at least 1: {self.max_failures}")
+
+    def delay(self, retry):
+        """Seconds to wait before retry number ``retry`` (from 1)."""
+        return self.backoff * self.multiplier ** (retry - 1)
+
+
+def expand_inputs(inputs: Iterable[Union[str, Path]],
+                  suffixes: Iterable[str]) -> List[Path]:
+    """Files of a batch: given files, and files with a supported suffix
+    found recursively (in sorted order) in given directories."""
+    suffixes = {f".{s.lower()}" for s in suffixes}
+    files = []
+    for item in inputs:
+        item = Path(item)
+        if item.is_dir():
+            files.extend(sorted(
+                p for p in item.rglob('*') if p.is_file() and p.suffix.lower() in suffixes
+            ))
+        else:
+            files.append(item)
+    return files
+
+
+class BatchRunner:
+    """Converts many files, checkpointing each result to a manifest."""
+
+    def __init__(self, output_dir: Union[str, Path] = "output",
+                 manifest: Optional[Union[str, Path]] = None,
+                 retry: Optional[RetryPolicy] = None,
+                 quarantine_dir: Optional[Union[str, Path]] = None,
+                 verify: str = 'hash',
+                 processor: Optional[DocumentProcessor] = None,
+                 limits: Optional[WorkerLimits] = None):
+        """Create a batch runner.
+
+        Args:
+            output_dir: Directory of the outputs, ``<stem>.<format>`` in the
+                inputs' directory layout below their common directory
+            manifest: Manifest path (default: ``<output_dir>/manifest.jsonl``)
+            retry: Retry and quarantine policy (default: ``RetryPolicy()``)
+            quarantine_dir: Copy quarantined inputs here for inspection
+            verify: How finished outputs are checked on resume: 'size', or
+                'hash' (size first, then SHA-256)
+            processor: ``DocumentProcessor`` doing the conversions
+            limits: Run every conversion in a supervised worker process
+                with these ``WorkerLimits`` (timeout per document, memory
+                cap, recycling)
+        """
+        if verify not in VERIFY_MODES:
+            raise ValueError(
+                f"Unknown verify mode: {verify} (choose from {', '.join(VERIFY_MODES)})"
+            )
+        self.output_dir = Path(output_dir)
+        self.manifest = Path(manifest) if manifest else self.output_dir / MANIFEST_NAME
+        self.retry = retry or RetryPolicy()
+        self.quarantine_dir = Path(quarantine_dir) if quarantine_dir else None
+        self.verify = verify
+        self.processor = processor or DocumentProcessor(str(self.output_dir))
+        self.limits = limits
+
+    def run(self, inputs: Iterable[Union[str, Path]], output_format: str,
+            resume: bool = False, **options: Any) -> Dict[str, Any]:
+        """Convert every input, skipping finished work when resuming.
+
+        Args:
+            inputs: Input files
+            output_format: Output format of every conversion (the stage)
+            resume: Keep the manifest and skip inputs it records as done
+                with intact outputs; otherwise start a new manifest
+            **options: Conversion options for ``DocumentProcessor.process``
+
+        Returns:
+            Summary counting inputs per outcome ('done', 'skipped',
+            'failed', 'quarantined') and the manifest path
+        """
+        state = self._load() if resume else _ManifestState()
+        if not resume and self.manifest.exists():
+            self.manifest.unlink()
+        summary: Dict[str, Any] = {DONE: 0, 'skipped': 0, FAILED: 0, QUARANTINED: 0}
+        inputs = [Path(input_path) for input_path in inputs]
+        root = _common_root(inputs)
+        convert = self.processor.process
+        pool = None
+        if self.limits is not None:
+            pool = WorkerPool(1, self.limits, stage=output_format)
+            convert = functools.partial(pool.call, self.processor.process)
+        try:
+            with JSONLWriter(self.manifest, fsync=True) as writer:
+                for input_path in inputs:
+                    output_path = self._output_path(input_path, root, output_format)
+                    outcome = self._convert(
+                        input_path, output_path, output_format, options, state, writer,
+                        convert,
+                    )
+                    summary[outcome] += 1
+        finally:
+            if pool is not None:
+                summary['worker_pool'] = dict(pool.stats)
+                pool.close()
+        summary['manifest'] = str(self.manifest)
+        return summary
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """Records of the manifest, oldest first."""
+        if self.manifest.exists():
+            yield from read_jsonl(self.manifest)
+
+    def _load(self):
+        state = _ManifestState()
+        for record in self.records():
+            state.add(record)
+        return state
+
+    def _output_path(self, input_path, root, stage):
+        # Mirror the inputs' layout below their common directory, so inputs
+        # of the same name in different directories keep separate outputs
+        try:
+            relative = input_path.resolve().parent.relative_to(root)
+        except ValueError:
+            relative = Path()
+        return self.output_dir / relative / f"{input_path.stem}.{stage}"
+
+    def _convert(self, input_path, output_path, stage, options, state, writer, convert):
+        try:
+            stat = input_path.stat()
+            digest = state.known_digest(input_path, stat) or file_digest(input_path)
+        except OSError as e:
+            writer.write({"input": str(input_path), "stage": stage, "status": FAILED,
+                          "error": str(e), "finished_at": build_timestamp()})
+            print(f"Failed: {input_path}: {e}")
+            return FAILED
+        key = (str(input_path), digest, stage)
+        last = state.last.get(key)
+        if last is not None:
+            if last['status'] == QUARANTINED:
+                print(f"Skipped (quarantined): {input_path}")
+                return QUARANTINED
+            if last['status'] == DONE and self._intact(last):
+                print(f"Skipped (done): {input_path}")
+                return 'skipped'
+
+        record = {
+            "input": str(input_path),
+            "input_sha256": digest,
+            "input_size": stat.st_size,
+            "input_mtime_ns": stat.st_mtime_ns,
+            "stage": stage,
+        }
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        for attempt in range(1, self.retry.attempts + 1):
+            if attempt > 1:
+                time.sleep(self.retry.delay(attempt - 1))
+            try:
+                output = Path(convert(input_path, stage, output_path, **options))
+                done = dict(
+                    record, status=DONE, attempt=attempt, output=str(output),
+                    output_size=output.stat().st_size, output_sha256=file_digest(output),
+                    finished_at=build_timestamp(),
+                )
+                writer.write(done)
+                state.add(done)
+                return DONE
+            except Exception as e:
+                failed = dict(record, status=FAILED, attempt=attempt, error=str(e),
+                              finished_at=build_timestamp())
+                if isinstance(e, WorkerFailure):
+                    failed["failure"] = e.as_dict()
+                writer.write(failed)
+                failures = state.fail(key)
+                print(f"Failed ({attempt}/{self.retry.attempts}): {input_path}: {e}")
+                if self.retry.max_failures is not None and failures >= self.retry.max_failures:
+                    self._quarantine(input_path, record, failures, writer)
+                    return QUARANTINED
+                if isinstance(e, StageTimeout) and not self.retry.retry_timeouts:
+                    break
+        return FAILED
+
+    def _intact(self, record):
+        output = Path(record['output'])
+        try:
+            if output.stat().st_size != record['output_size']:
+                return False
+        except OSError:
+            return False
+        return self.verify == 'size' or file_digest(output) == record['output_sha256']
+
+    def _quarantine(self, input_path, record, failures, writer):
+        record = dict(record, status=QUARANTINED, failures=failures,
+                      finished_at=build_timestamp())
+        if self.quarantine_dir:
+            self.quarantine_dir.mkdir(parents=True, exist_ok=True)
+            target = self.quarantine_dir / f"{record['input_sha256'][:12]}-{input_path.name}"
+            shutil.copy2(input_path, target)
+            record["quarantined_to"] = str(target)
+        writer.write(record)
+        print(f"Quarantined after {failures} failures: {input_path}")
+
+
+class _ManifestState:
+    # The latest record per (input path, input hash, stage), failure counts,
+    # and the input hashes by path, size and modification time
+
+    def __init__(self):
+        self.last: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self.failures: Dict[Tuple[str, str, str], int] = {}
+        self.digests: Dict[Tuple[str, int, int], str] = {}
+
+    def add(self, record):
+        if 'input_sha256' not in record:
+            # An input that could not be read
+            return
+        key = (record['input'], record['input_sha256'], record['stage'])
+        self.last[key] = record
+        if record.get('status') == FAILED:
+            self.failures[key] = self.failures.get(key, 0) + 1
+        self.digests[(record['input'], record['input_size'], record['input_mtime_ns'])] = (
+            record['input_sha256']
+        )
+
+    def fail(self, key):
+        self.failures[key] = self.failures.get(key, 0) + 1
+        return self.failures[key]
+
+    def known_digest(self, input_path, stat):
+        return self.digests.get((str(input_path), stat.st_size, stat.st_mtime_ns))
+
+
+def _common_root(inputs):
+    # Deepest directory containing every input
+    parents = [str(path.resolve().parent) for path in inputs]
+    return Path(os.path.commonpath(parents)) if parents else Path()
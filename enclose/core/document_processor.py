@@ -11,12 +11,39 @@ import webbrowser
 from pathlib import Path
 from datetime import datetime
 
-from ..converters.markdown_converter import create_example_markdown, markdown_to_pdf, markdown_to_html
-from ..converters.pdf_converter import pdf_to_svg, svg_to_png
+from ..converters.markdown_converter import (
+    create_example_markdown,
+    markdown_to_html,
+    markdown_to_pdf,
+    markdown_to_pdf_bundle,
+)
+from ..converters.pdf_converter import inline_svg_container, pdf_to_svg, svg_to_png
+from ..converters.raster import DEFAULT_TILE_OVERLAP
 from ..utils.ocr_processor import process_ocr
+from .pipeline import DEFAULT_DPI, parse_stages, process_pdf_ocr, rasterize_pdf
 from ..utils.file_utils import search_svg_files as utils_search_svg_files
 from ..utils.html_utils import enclose_to_html_table
 from ..utils.metadata_utils import save_metadata
+from ..utils.page_ranges import format_pages, resolve_pages
+from ..utils.reproducible import build_timestamp
+
+_PDF_TO_SVG_OPTIONS = ('container', 'blob_store', 'compresslevel')
+_SVG_TO_PNG_OPTIONS = ('profiles', 'encoding', 'tile_size', 'tile_overlap')
+
+# Keyword options each conversion takes, by (input format, output format).
+# ``process`` hands a conversion only its own options, so one set of options
+# can drive a batch of mixed inputs.
+CONVERSION_OPTIONS = {
+    ('md', 'pdf'): ('markdown_backend', 'theme', 'pdf_backend', 'chunked', 'workers',
+                    'limits'),
+    ('pdf', 'svg'): _PDF_TO_SVG_OPTIONS,
+    ('pdf', 'svgz'): _PDF_TO_SVG_OPTIONS,
+    ('pdf', 'png'): ('pages', 'stages', 'dpi', 'grayscale', 'on_page', 'workers',
+                     'queue_size', 'backend', 'preprocess', 'triage', 'profile',
+                     'processes', 'mp_context', 'limits', 'governor'),
+    ('svg', 'png'): _SVG_TO_PNG_OPTIONS,
+    ('svgz', 'png'): _SVG_TO_PNG_OPTIONS,
+}
 
 
 class DocumentProcessor:
@@ -38,12 +65,13 @@ class DocumentProcessor:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         self.metadata: Dict[str, Any] = {}
-        self.supported_formats = ['md', 'html', 'pdf', 'svg', 'png']
+        self.supported_formats = ['md', 'html', 'pdf', 'svg', 'svgz', 'png']
         self.default_output_dir = str(self.output_dir)
     
     def process(self, input_path: Union[str, Path], 
                output_format: str, 
-               output_path: Optional[Union[str, Path]] = None) -> str:
+               output_path: Optional[Union[str, Path]] = None,
+               **options: Any) -> str:
         """
         Process the input document and convert it to the specified output format.
         
@@ -51,6 +79,14 @@ class DocumentProcessor:
             input_path: Path to the input file
             output_format: Desired output format (e.g., 'pdf', 'png', 'svg')
             output_path: Optional output path (defaults to input filename with new extension)
+            **options: Extra options for the Markdown to PDF conversion
+                (e.g. ``chunked=True, workers=4``) or the PDF to SVG
+                conversion (e.g. ``container='referenced', compresslevel=9``)
+                or the SVG to PNG conversion (e.g. ``profiles=['ocr', 'preview'],
+                encoding='webp'``, ``tile_size=2048``) or the PDF to PNG
+                conversion (e.g. ``pages='1-3,10', stages=['ocr']``);
+                options the conversion does not take (see
+                ``CONVERSION_OPTIONS``) are left out
             
         Returns:
             Path to the generated output file
@@ -83,18 +119,38 @@ class DocumentProcessor:
         
         # Ensure output directory exists
         output_dir.mkdir(parents=True, exist_ok=True)
-        
+
+        accepted = self.conversion_options(input_format, output_format)
+        options = {name: value for name, value in options.items() if name in accepted}
+
         # Handle different conversion paths
         try:
             if input_format == 'md':
                 if output_format == 'pdf':
-                    return self.markdown_to_pdf(input_path, output_path)
+                    return self.markdown_to_pdf(input_path, output_path, **options)
                 elif output_format == 'html':
                     return self.markdown_to_html(input_path, output_path)
-            elif input_format == 'pdf' and output_format == 'svg':
-                return self.pdf_to_svg(input_path, output_path)
-            elif input_format == 'svg' and output_format == 'png':
-                return self.svg_to_png(input_path, output_path)
+            elif input_format == 'pdf' and output_format in ('svg', 'svgz'):
+                svg_path, metadata = pdf_to_svg(
+                    input_path, output_path.parent, output_file=output_path.stem,
+                    compress=output_format == 'svgz', **options
+                )
+                self.metadata.update(metadata)
+                return str(svg_path)
+            elif input_format == 'pdf' and output_format == 'png':
+                return self.pdf_to_png(input_path, output_path, **options)
+            elif input_format in ('svg', 'svgz') and output_format == 'png':
+                page_info, metadata = svg_to_png(
+                    input_path, {}, output_path.parent,
+                    options.get('profiles'), options.get('encoding'),
+                    options.get('tile_size'),
+                    options.get('tile_overlap', DEFAULT_TILE_OVERLAP),
+                )
+                self.metadata.update(metadata)
+                page = page_info[0]
+                return page['tiles'][0]['file'] if page.get('tiles') else page['file']
+            elif input_format in ('svg', 'svgz') and output_format in ('svg', 'svgz'):
+                return self.export_svg(input_path, output_path)
             else:
                 # For unsupported conversions, use a generic approach
                 return self._generic_conversion(input_path, output_path, output_format)
@@ -106,17 +162,52 @@ class DocumentProcessor:
         """Create an example markdown file."""
         return Path(create_example_markdown(self.output_dir))
 
-    def markdown_to_pdf(self, input_path: Union[str, Path], output_path: Union[str, Path]) -> str:
+    def markdown_to_pdf(self, input_path: Union[str, Path], output_path: Union[str, Path],
+                        **options: Any) -> str:
         """Convert a markdown file to PDF.
         
         Args:
             input_path: Path to the input markdown file
             output_path: Path where the output PDF will be saved
+            **options: Extra keyword arguments for ``markdown_to_pdf``
+                (e.g. ``chunked``, ``workers``)
+            
+        Returns:
+            Path to the generated PDF file
+        """
+        return markdown_to_pdf(input_path, output_path.parent, output_path.stem, **options)
+        
+    def markdown_to_pdf_bundle(self, input_paths: List[Union[str, Path]],
+                               output_path: Optional[Union[str, Path]] = None,
+                               **options: Any) -> str:
+        """Render several markdown files into one PDF in a single layout pass.
+        
+        Args:
+            input_paths: Paths to the input markdown files, in bundle order
+            output_path: Path where the output PDF will be saved
+                (default: <first input>_bundle.pdf in the output directory)
+            **options: Extra keyword arguments for ``markdown_to_pdf_bundle``
+                (``markdown_backend``, ``theme``, ``pdf_backend``)
             
         Returns:
             Path to the generated PDF file
+
+        Raises:
+            ValueError: If no input is given
         """
-        return markdown_to_pdf(input_path, output_path.parent, output_path.stem)
+        input_paths = [Path(p) for p in input_paths]
+        if not input_paths:
+            raise ValueError("A bundle needs at least one input file")
+        for input_path in input_paths:
+            if not input_path.exists():
+                raise FileNotFoundError(f"Input file not found: {input_path}")
+        if output_path is None:
+            output_path = self.output_dir / f"{input_paths[0].stem}_bundle.pdf"
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        return str(markdown_to_pdf_bundle(
+            input_paths, output_path.parent, output_path.stem, **options
+        ))
         
     def markdown_to_html(self, input_path: Union[str, Path], output_path: Union[str, Path]) -> str:
         """Convert a markdown file to HTML.
@@ -130,29 +221,134 @@ class DocumentProcessor:
         """
         return markdown_to_html(input_path, output_path.parent, output_path.stem)
 
-    def pdf_to_svg(self, pdf_file: Union[str, Path]) -> tuple[str, Dict[str, Any]]:
-        """Convert PDF to SVG with embedded data and metadata."""
-        svg_path, metadata = pdf_to_svg(str(pdf_file), self.output_dir)
+    def pdf_to_svg(self, pdf_file: Union[str, Path],
+                   container: Optional[str] = None) -> tuple[str, Dict[str, Any]]:
+        """Convert PDF to SVG with embedded data and metadata.
+
+        Args:
+            pdf_file: Path to the input PDF file
+            container: 'embedded' or 'referenced' (PDF kept in a blob store)
+        """
+        svg_path, metadata = pdf_to_svg(str(pdf_file), self.output_dir, container)
         self.metadata.update(metadata)
         return svg_path, self.metadata
 
+    def pdf_to_png(self, pdf_file: Union[str, Path], output_path: Union[str, Path],
+                   pages: Any = None, stages: Any = None, dpi: int = DEFAULT_DPI,
+                   **options: Any) -> str:
+        """Render the selected pages of a PDF and/or OCR them.
+
+        Pages outside ``pages`` (e.g. ``'1-3,10'``) are never rendered.
+        ``stages`` picks 'raster' (write ``<pdf stem>_<page>.png`` next to
+        ``output_path``) and 'ocr' (append each page's result to
+        ``<output stem>.jsonl``); both by default. ``options`` go to the OCR
+        pipeline (workers, backend, preprocess, triage, on_page); without
+        OCR only ``on_page`` is used, called with each written page's info.
+
+        Returns:
+            Path to the first page image, or to the OCR results without
+            the 'raster' stage
+
+        Raises:
+            ValueError: If the selection holds no page of the PDF
+        """
+        output_path = Path(output_path)
+        stages = parse_stages(stages)
+        ranges = resolve_pages(pages)
+        if 'ocr' in stages:
+            sink = output_path.with_suffix('.jsonl')
+            sink.unlink(missing_ok=True)
+            output_dir = output_path.parent if 'raster' in stages else None
+            metadata = process_pdf_ocr(
+                str(pdf_file), {}, dpi, output_dir, sink=sink, pages=ranges, **options
+            )
+            results = metadata.pop('ocr_results')
+            metadata['ocr_data'] = results
+            if output_dir:
+                outputs = [r['image'] for r in results if 'image' in r]
+            else:
+                outputs = [str(sink)] if results else []
+        else:
+            page_info = rasterize_pdf(pdf_file, output_path.parent, dpi, pages=ranges,
+                                      on_page=options.get('on_page'))
+            metadata = {"pages": page_info, "converted_at": build_timestamp()}
+            if ranges is not None:
+                metadata["page_selection"] = format_pages(ranges)
+            outputs = [page['file'] for page in page_info]
+        metadata["stages"] = list(stages)
+        self.metadata.update(metadata)
+        if not outputs:
+            raise ValueError(f"No pages selected in {pdf_file}: {format_pages(ranges)}")
+        return outputs[0]
+
+    def export_svg(self, svg_file: Union[str, Path], output_path: Union[str, Path]) -> str:
+        """Export a self-contained SVG container with its PDF inlined.
+        
+        Args:
+            svg_file: Path to the SVG container (embedded or referenced)
+            output_path: Path where the exported SVG will be saved; a
+                ``.svgz`` path writes a compressed container
+            
+        Returns:
+            Path to the exported SVG file
+        """
+        return str(inline_svg_container(svg_file, output_path))
+
     def svg_to_png(self, svg_file: Union[str, Path], 
-                  metadata: Dict[str, Any]) -> tuple[List[str], Dict[str, Any]]:
-        """Convert embedded PDF to PNG and update metadata."""
-        png_files, metadata = svg_to_png(str(svg_file), metadata, self.output_dir)
+                  metadata: Dict[str, Any],
+                  profiles: Optional[List[Any]] = None) -> tuple[List[str], Dict[str, Any]]:
+        """Convert embedded PDF to PNG and update metadata.
+
+        ``profiles`` (output profiles or preset names such as 'ocr',
+        'preview', 'thumbnail') produce several variants from one render.
+        """
+        png_files, metadata = svg_to_png(str(svg_file), metadata, self.output_dir, profiles)
         self.metadata.update(metadata)
         return png_files, self.metadata
 
     def process_ocr(self, png_files: List[Union[str, Path]], 
-                   metadata: Dict[str, Any]) -> Dict[str, Any]:
-        """Process PNG files with OCR and update metadata."""
-        updated_metadata = process_ocr([str(f) for f in png_files], metadata)
+                   metadata: Dict[str, Any],
+                   preprocess: Any = None, triage: Any = None,
+                   backend: Optional[str] = None,
+                   sink: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+        """Process PNG files with OCR and update metadata.
+
+        ``preprocess`` (``True``, a dict or ``PreprocessOptions``) normalizes
+        the images before OCR; ``triage`` (``True`` or a shared
+        ``PageTriage``) skips blank and duplicate pages; ``backend`` selects
+        the OCR engine ('auto', 'tesserocr' or 'pytesseract'); ``sink``
+        appends each page's result to a JSONL file as soon as it is done.
+        """
+        updated_metadata = process_ocr(
+            [str(f) for f in png_files], metadata, preprocess, triage, backend, sink
+        )
         # Rename 'ocr_results' to 'ocr_data' to match test expectations
         if 'ocr_results' in updated_metadata:
             updated_metadata['ocr_data'] = updated_metadata.pop('ocr_results')
         self.metadata.update(updated_metadata)
         return self.metadata
     
+    def ocr_pdf(self, pdf_file: Union[str, Path],
+                metadata: Optional[Dict[str, Any]] = None,
+                dpi: int = 300, save_pages: bool = False,
+                pages: Any = None, **options: Any) -> Dict[str, Any]:
+        """OCR a PDF through the streaming render-to-OCR pipeline.
+
+        Pages go from the renderer to OCR workers in memory as soon as they
+        are rendered; ``save_pages`` also writes them as PNGs to the output
+        directory. Only the pages in ``pages`` (e.g. ``'1-3,10'``) are
+        rendered. ``options`` are passed to ``OCRPipeline`` (workers,
+        queue_size, backend, preprocess, triage).
+        """
+        output_dir = self.output_dir if save_pages else None
+        updated_metadata = process_pdf_ocr(
+            str(pdf_file), dict(metadata or {}), dpi, output_dir, pages=pages, **options
+        )
+        if 'ocr_results' in updated_metadata:
+            updated_metadata['ocr_data'] = updated_metadata.pop('ocr_results')
+        self.metadata.update(updated_metadata)
+        return self.metadata
+
     def get_supported_formats(self) -> Dict[str, Any]:
         """
         Get information about supported formats and conversions.
@@ -166,11 +362,17 @@ class DocumentProcessor:
             'conversions': {
                 'md': ['html', 'pdf', 'svg', 'png'],
                 'html': ['pdf', 'svg', 'png'],
-                'pdf': ['svg', 'png'],
-                'svg': ['png']
+                'pdf': ['svg', 'svgz', 'png'],
+                'svg': ['png', 'svgz'],
+                'svgz': ['png', 'svg']
             }
         }
     
+    @staticmethod
+    def conversion_options(input_format: str, output_format: str) -> tuple:
+        """Names of the keyword options a conversion takes (may be empty)."""
+        return CONVERSION_OPTIONS.get((input_format.lower(), output_format.lower()), ())
+
     def save_metadata(self, output_file: Optional[Union[str, Path]] = None) -> str:
         """
         Save the current metadata to a JSON file.
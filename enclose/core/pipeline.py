@@ -0,0 +1,531 @@
+"""
+Streaming raster to OCR pipeline.
+
+The staged flow rasterizes every page to a PNG file before OCR reopens them,
+so one stage is always idle and every page pays a PNG encode and decode.
+``OCRPipeline`` overlaps the stages instead: a producer thread renders pages
+one at a time into a bounded queue and OCR worker threads take them from it
+as soon as they exist. Page images stay in memory unless PNG output is
+requested, and the queue depth caps how many rendered pages exist at once.
+A page selection (see ``utils.page_ranges``) limits rendering to the pages
+asked for, and ``STAGES`` lets callers skip writing rasters or skip OCR.
+
+Tesseract runs outside the GIL (as a subprocess, or in libtesseract with
+tesserocr), so worker threads recognize pages in parallel. With
+``processes=True`` recognition and preprocessing run in worker processes
+instead; pages reach them through shared-memory buffers (see
+``utils.page_buffers``) rather than by pickling. The processes are
+supervised (see ``utils.worker_pool``): ``limits`` sets a per-page timeout,
+a memory cap and worker recycling, and a page that hangs or kills its worker
+fails alone with a structured ``failure``.
+
+Rendering and recognition take their CPU tokens from the process-wide
+``ResourceGovernor`` (see ``utils.resource_governor``), so pipelines,
+chunked layouts and batch jobs running side by side share the machine's
+cores instead of oversubscribing them.
+"""
+
+import io
+import queue
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from PIL import Image
+from pdf2image import pdfinfo_from_path
+
+from ..converters.raster import OutputProfile, encode_image, rasterize_svg
+from ..utils import image_preprocessing
+from ..utils.metadata_utils import JSONLWriter
+from ..utils.ocr_backends import get_ocr_backend
+from ..utils.ocr_processor import (
+    copy_duplicate,
+    preprocessing_summary,
+    recognize_page,
+    triage_page,
+    triage_summary,
+)
+from ..utils.page_buffers import PageBufferPool, open_page
+from ..utils.page_ranges import format_pages, iter_pages, resolve_pages
+from ..utils.page_triage import PageTriage
+from ..utils.reproducible import build_timestamp
+from ..utils.resource_governor import get_governor
+from ..utils.worker_pool import WorkerFailure, WorkerPool
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # optional dependency
+    PdfReader = None
+
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 4
+DEFAULT_DPI = 300
+
+# Stages of PDF page processing: writing page images and recognizing them
+STAGES = ('raster', 'ocr')
+
+# Marks the end of the page stream in the queues
+_DONE = object()
+
+
+def parse_stages(stages: Union[None, str, Iterable[str]]) -> Tuple[str, ...]:
+    """Resolve stage names (a comma-separated string or names); None is all.
+
+    Raises:
+        ValueError: If a stage is unknown or none is given
+    """
+    if stages is None:
+        return STAGES
+    if isinstance(stages, str):
+        stages = stages.split(',')
+    names = {name.strip().lower() for name in stages if name.strip()}
+    unknown = names.difference(STAGES)
+    if unknown:
+        raise ValueError(
+            f"Unknown stage: {', '.join(sorted(unknown))} "
+            f"(choose from {', '.join(STAGES)})"
+        )
+    if not names:
+        raise ValueError("At least one stage is needed")
+    return tuple(stage for stage in STAGES if stage in names)
+
+
+def pdf_page_count(pdf_file: Union[str, Path]) -> int:
+    """Number of pages of a PDF, read from its info without rendering.
+
+    With pypdf the count is the page tree root's ``/Count``. pypdf reads
+    from the open file, so only the cross-reference table and two objects
+    are read rather than the document; otherwise poppler's pdfinfo
+    reports it.
+    """
+    if PdfReader is not None:
+        try:
+            with open(pdf_file, 'rb') as f:
+                return int(PdfReader(f).trailer['/Root']['/Pages']['/Count'])
+        except Exception:
+            # Damaged or encrypted files: let poppler decide
+            pass
+    return int(pdfinfo_from_path(str(pdf_file))['Pages'])
+
+
+def render_pdf_page(pdf_file: Union[str, Path], number: int, dpi: int = DEFAULT_DPI,
+                    grayscale: bool = False) -> Image.Image:
+    """Render one page of a PDF with a single pdftoppm run.
+
+    pdf2image's ``convert_from_path`` would also run pdfinfo and
+    ``pdftoppm -v`` for every call.
+
+    Raises:
+        RuntimeError: If poppler is missing or fails on the page
+    """
+    command = ['pdftoppm', '-r', str(dpi), '-f', str(number), '-l', str(number)]
+    if grayscale:
+        command.append('-gray')
+    command.append(str(pdf_file))
+    try:
+        process = subprocess.run(command, capture_output=True)
+    except FileNotFoundError:
+        raise RuntimeError("Rendering PDF pages requires poppler's pdftoppm") from None
+    if process.returncode or not process.stdout:
+        error = process.stderr.decode(errors='replace').strip()
+        raise RuntimeError(f"pdftoppm failed on page {number} of {pdf_file}: {error}")
+    image = Image.open(io.BytesIO(process.stdout))
+    image.load()
+    return image
+
+
+def render_pdf_pages(
+    pdf_file: Union[str, Path],
+    dpi: int = DEFAULT_DPI,
+    grayscale: bool = False,
+    pages: Any = None,
+) -> Iterator[Tuple[str, Image.Image]]:
+    """Render a PDF page by page.
+
+    The page count is read once, then each page is rendered by its own
+    pdftoppm run, so only one page bitmap exists at a time, and pages
+    outside ``pages`` are never rendered.
+
+    Args:
+        pdf_file: Path to the PDF
+        dpi: Render resolution
+        grayscale: Render 8-bit grayscale pages
+        pages: Page selection (e.g. ``"1-3,10"``, see
+            ``utils.page_ranges.resolve_pages``); None renders every page.
+            Selected pages past the end of the document are ignored.
+
+    Yields:
+        (key, image) pairs, the key being ``<pdf>#page=<n>``; the page
+        number is also in ``image.info['page']``
+    """
+    ranges = resolve_pages(pages)
+    for number in iter_pages(ranges, pdf_page_count(pdf_file)):
+        image = render_pdf_page(pdf_file, number, dpi, grayscale)
+        image.info['dpi'] = (dpi, dpi)
+        image.info['page'] = number
+        yield f"{pdf_file}#page={number}", image
+
+
+def rasterize_pdf(
+    pdf_file: Union[str, Path],
+    output_dir: Union[str, Path],
+    dpi: int = DEFAULT_DPI,
+    grayscale: bool = False,
+    pages: Any = None,
+    profile: Optional[OutputProfile] = None,
+    on_page: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> List[Dict[str, Any]]:
+    """Write the selected pages of a PDF as images, one page at a time.
+
+    ``on_page`` is called with each page's info once it is written.
+
+    Returns:
+        Page info dicts (page, file, width, height), as ``svg_to_png``
+        produces them; files are ``<pdf stem>_<page>.<format>``
+    """
+    profile = profile or OutputProfile('page')
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    page_info = []
+    renders = render_pdf_pages(pdf_file, dpi, grayscale, pages)
+    for _, image in governed_pages(renders, get_governor()):
+        number = image.info['page']
+        output_path = output_dir / f"{Path(pdf_file).stem}_{number}.{profile.format}"
+        with image:
+            encode_image(image, profile, output_path, dpi)
+            page_info.append({
+                "page": number,
+                "file": str(output_path.absolute()),
+                "width": image.width,
+                "height": image.height,
+            })
+        print(f"Created: {output_path}")
+        if on_page:
+            on_page(page_info[-1])
+    return page_info
+
+
+def governed_pages(pages: Iterable[Tuple[str, Image.Image]],
+                   governor) -> Iterator[Tuple[str, Image.Image]]:
+    """Yield lazily rendered pages, holding a 'raster' CPU token while each
+    one renders but not while the caller works on it.
+    """
+    pages = iter(pages)
+    while True:
+        with governor.slot('raster'):
+            item = next(pages, None)
+        if item is None:
+            return
+        yield item
+
+
+def page_memory_mb(image: Image.Image) -> float:
+    """Memory of a decoded page image in MB."""
+    return image.width * image.height * len(image.getbands()) / 2 ** 20
+
+
+def render_svg_pages(
+    svg_files: Iterable[Union[str, Path]],
+    dpi: int = DEFAULT_DPI,
+) -> Iterator[Tuple[str, Image.Image]]:
+    """Render SVG (or SVGZ) pages one at a time.
+
+    Yields:
+        (key, image) pairs, the key being the SVG file
+    """
+    for svg_file in svg_files:
+        image = rasterize_svg(svg_file, dpi)
+        image.info['dpi'] = (dpi, dpi)
+        yield str(svg_file), image
+
+
+def _recognize_shared(ref, result, backend, lang, options):
+    # Runs in a worker process, on the page mapped from shared memory
+    image = open_page(ref)
+    if image.mode == 'RGBX':
+        image = image.convert('RGB')
+    recognize_page(image, result, get_ocr_backend(backend, lang), options)
+    return result
+
+
+class OCRPipeline:
+    """Renders and recognizes pages concurrently through a bounded queue."""
+
+    def __init__(self, workers=DEFAULT_WORKERS, queue_size=DEFAULT_QUEUE_SIZE,
+                 backend=None, preprocess=None, triage=None,
+                 output_dir=None, profile=None, processes=False, mp_context=None,
+                 limits=None, governor=None):
+        """Create a pipeline.
+
+        Args:
+            workers: OCR worker threads (or processes)
+            queue_size: Rendered pages waiting for OCR at most; with the
+                page each worker holds, this bounds the page images in memory
+            backend: OCR backend name or ``OCRBackend`` (default: auto)
+            preprocess: Preprocessing, as for ``process_ocr``
+            triage: ``True`` or a shared ``PageTriage`` to skip blank and
+                duplicate pages, as for ``process_ocr``
+            output_dir: Also write each page image here (by the OCR worker,
+                after recognition); None keeps pages in memory only
+            profile: ``OutputProfile`` for the written pages (default: PNG)
+            processes: Recognize in ``workers`` processes fed through
+                shared-memory page buffers instead of in threads
+            mp_context: ``multiprocessing`` context for the worker processes
+            limits: ``WorkerLimits`` for the worker processes (per-page
+                timeout, memory cap, recycling); implies ``processes``
+            governor: ``ResourceGovernor`` the page renders and recognitions
+                take CPU tokens from (default: the process-wide one)
+        """
+        if workers < 1 or queue_size < 1:
+            raise ValueError("The pipeline needs at least one worker and a queue of one")
+        self.workers = workers
+        self.queue_size = queue_size
+        self.engine = get_ocr_backend(backend)
+        self.options = image_preprocessing.resolve_options(preprocess)
+        self.triage = PageTriage() if triage is True else triage
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.profile = profile or OutputProfile('page')
+        self.processes = processes or limits is not None
+        self.mp_context = mp_context
+        self.limits = limits
+        self.governor = governor or get_governor()
+        self.stats: Dict[str, Any] = {}
+        self._pool = None
+        self._workers = None
+
+    def run(
+        self,
+        pages: Iterable[Tuple[str, Image.Image]],
+        on_page: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Render and recognize pages; yield their results in page order.
+
+        Args:
+            pages: Iterable of (key, image) pairs, rendered lazily, e.g.
+                ``render_pdf_pages(...)``
+            on_page: Called with each result as it is yielded
+
+        Yields:
+            One result dict per page, as ``process_ocr`` produces them
+
+        Raises:
+            Exception: Whatever rendering raised, once the pages rendered
+                before it have been yielded
+        """
+        pending = queue.Queue(maxsize=self.queue_size)
+        done = queue.Queue()
+        stop = threading.Event()
+        start = time.perf_counter()
+        self.stats = {"workers": self.workers, "queue_size": self.queue_size, "pages": 0}
+
+        def put(q, item):
+            # Give up when the consumer has stopped iterating
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            number = 0
+            try:
+                renders = governed_pages(pages, self.governor)
+                for number, (key, image) in enumerate(renders, 1):
+                    result = {"page": image.info.get('page', number), "file": key,
+                              "ocr_text": "", "ocr_confidence": 0, "word_count": 0}
+                    if self.triage and triage_page(image, key, self.triage, result):
+                        image = None
+                    elif self._pool:
+                        image = self._share(image, stop)
+                        if image is None:
+                            return
+                    if not put(pending, (number, result, image)):
+                        return
+            except Exception as e:
+                done.put((number + 1, e))
+            finally:
+                for _ in range(self.workers):
+                    put(pending, _DONE)
+
+        def work():
+            while True:
+                try:
+                    item = pending.get(timeout=0.1)
+                except queue.Empty:
+                    if stop.is_set():
+                        return
+                    continue
+                if item is _DONE:
+                    done.put(_DONE)
+                    return
+                number, result, page = item
+                if page is not None:
+                    # Shared pages are already accounted for by the buffer pool
+                    memory_mb = 0 if self._pool else page_memory_mb(page)
+                    try:
+                        with self.governor.slot('ocr', memory_mb=memory_mb):
+                            if self._pool:
+                                result = self._recognize_in_process(page, result)
+                                image = self._pool.image(page) if self.output_dir else None
+                            else:
+                                recognize_page(page, result, self.engine, self.options)
+                                image = page
+                            if self.output_dir:
+                                self._save(image, result)
+                    except Exception as e:
+                        result["error"] = str(e)
+                        if isinstance(e, WorkerFailure):
+                            result["failure"] = e.as_dict()
+                    finally:
+                        if self._pool:
+                            self._pool.release(page)
+                        else:
+                            page.close()
+                done.put((number, result))
+
+        if self.processes:
+            # Pages queued or being recognized live in the pool
+            self._pool = PageBufferPool(self.queue_size + self.workers)
+            # Start the worker processes up front, not on the first page
+            self._workers = WorkerPool(
+                self.workers, self.limits, self.mp_context, stage='ocr'
+            ).start()
+        threads = [threading.Thread(target=produce, daemon=True)]
+        threads += [threading.Thread(target=work, daemon=True) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+
+        # Results arrive out of order; yield them by page number
+        finished = {}
+        next_page = 1
+        workers_left = self.workers
+        try:
+            while workers_left or next_page in finished:
+                if next_page not in finished:
+                    item = done.get()
+                    if item is _DONE:
+                        workers_left -= 1
+                    else:
+                        finished[item[0]] = item[1]
+                    continue
+                result = finished.pop(next_page)
+                if isinstance(result, Exception):
+                    raise result
+                if self.triage:
+                    if "skipped" in result:
+                        copy_duplicate(result, self.triage)
+                    elif "error" not in result:
+                        self.triage.record(result["file"], result)
+                if next_page == 1:
+                    self.stats["first_page_time"] = time.perf_counter() - start
+                self.stats["pages"] = next_page
+                next_page += 1
+                if on_page:
+                    on_page(result)
+                yield result
+            # A render error after the last yielded page
+            for item in finished.values():
+                if isinstance(item, Exception):
+                    raise item
+        finally:
+            stop.set()
+            if self._pool:
+                self._workers.close()
+                for thread in threads[1:]:
+                    thread.join()
+                self._pool.close()
+                self.stats["worker_pool"] = dict(self._workers.stats)
+                self._pool = self._workers = None
+            self.stats["governor"] = self.governor.metrics()
+            self.stats["total_time"] = time.perf_counter() - start
+
+    def _share(self, image, stop):
+        # Copy a rendered page into a free shared segment
+        try:
+            while True:
+                ref = self._pool.put(image, timeout=0.1)
+                if ref is not None or stop.is_set():
+                    return ref
+        finally:
+            image.close()
+
+    def _recognize_in_process(self, ref, result):
+        return self._workers.call(
+            _recognize_shared, ref, result, self.engine.name, self.engine.lang, self.options
+        )
+
+    def _save(self, image, result):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        key = Path(result["file"].split('#', 1)[0]).stem
+        output_path = self.output_dir / f"{key}_{result['page']}.{self.profile.format}"
+        encode_image(image, self.profile, output_path, image.info.get('dpi', (None,))[0])
+        result["image"] = str(output_path.absolute())
+
+    def process(self, pages, metadata, on_page=None, sink=None):
+        """Run the pipeline to completion and record the results in metadata.
+
+        Args:
+            pages: Iterable of (key, image) pairs
+            metadata: Metadata to update
+            on_page: Called with each result as it is yielded
+            sink: JSONL file path or ``JSONLWriter`` each result is appended
+                to as it is yielded
+
+        Returns:
+            The metadata with ``ocr_results`` and the pipeline's ``stats``
+        """
+        writer = sink if sink is None or isinstance(sink, JSONLWriter) else JSONLWriter(sink)
+        results = []
+        try:
+            for result in self.run(pages, on_page):
+                if writer:
+                    writer.write(result)
+                results.append(result)
+        finally:
+            if writer is not sink:
+                writer.close()
+        metadata["ocr_results"] = results
+        if writer and writer.path:
+            metadata["ocr_results_file"] = str(writer.path)
+        metadata["pipeline"] = dict(self.stats)
+        metadata["converted_at"] = build_timestamp()
+        if self.options:
+            metadata["preprocessing"] = preprocessing_summary(self.options, results)
+        if self.triage:
+            metadata["triage"] = triage_summary(results)
+        return metadata
+
+
+def process_pdf_ocr(pdf_file, metadata=None, dpi=DEFAULT_DPI, output_dir=None,
+                    grayscale=False, sink=None, on_page=None, pages=None, **options):
+    """OCR a PDF through the streaming pipeline.
+
+    Args:
+        pdf_file: Path to the PDF
+        metadata: Metadata to update (default: a new dict)
+        dpi: Render resolution
+        output_dir: Also write the page images here
+        grayscale: Render 8-bit grayscale pages
+        sink: JSONL file path or ``JSONLWriter`` each page's result is
+            appended to as soon as it is done
+        on_page: Called with each page's result as soon as it is done
+        pages: Page selection, e.g. ``"1-3,10"``; other pages are never
+            rendered (``metadata["page_selection"]`` records it)
+        **options: ``OCRPipeline`` options (workers, queue_size, backend,
+            preprocess, triage, profile, processes, limits)
+
+    Returns:
+        Metadata with ``ocr_results`` and ``pipeline`` timings
+    """
+    ranges = resolve_pages(pages)
+    metadata = metadata if metadata is not None else {}
+    if ranges is not None:
+        metadata["page_selection"] = format_pages(ranges)
+    pipeline = OCRPipeline(output_dir=output_dir, **options)
+    return pipeline.process(
+        render_pdf_pages(pdf_file, dpi, grayscale, ranges), metadata, on_page, sink,
+    )
@@ -0,0 +1,374 @@
+"""
+Priority- and deadline-aware scheduling of conversions.
+
+Interactive conversions and bulk backfills share the same workers. In
+submission order a backfill can hold every worker for many minutes while a
+single-page request waits behind it. ``Scheduler`` queues jobs in front of
+``DocumentProcessor`` and always starts the most urgent one:
+
+- its priority class (``PRIORITIES``: 'interactive', then 'normal', then
+  'batch');
+- within a class, the earliest deadline first, then the shortest job first
+  by page count and input size.
+
+A job whose deadline is closer than its estimated run time is promoted to
+the interactive class. A job still queued when its deadline passes fails
+with ``DeadlineExceeded`` instead of taking a worker.
+
+Running jobs are preempted at page boundaries. When a more urgent job is
+waiting and no worker is idle, a PDF conversion between two pages runs the
+urgent job in its own worker first and then carries on with its next page.
+Pages already queued in its OCR pipeline still finish. ``metrics()``
+reports latency percentiles per class, preemptions and missed deadlines.
+"""
+
+import math
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from ..utils.page_ranges import iter_pages, needs_page_count, resolve_pages
+from .document_processor import DocumentProcessor
+from .pipeline import pdf_page_count
+
+# Priority classes, most urgent first
+PRIORITIES = ('interactive', 'normal', 'batch')
+
+DEFAULT_WORKERS = 2
+
+# Markdown source per rendered page, to estimate the pages of a document
+MARKDOWN_BYTES_PER_PAGE = 3000
+
+# Estimated seconds per page until conversions have been timed
+INITIAL_PAGE_SECONDS = 1.0
+
+# Weight of the latest job in the seconds-per-page estimate
+_ESTIMATE_WEIGHT = 0.2
+
+# Latencies kept per class for the percentiles
+_LATENCY_WINDOW = 1000
+
+
+class DeadlineExceeded(TimeoutError):
+    """A job could not start before its deadline."""
+
+
+def estimate_pages(input_path: Union[str, Path], pages: Any = None) -> int:
+    """Pages a conversion of ``input_path`` will process, without rendering.
+
+    PDFs report their page count (narrowed to the ``pages`` selection),
+    Markdown is estimated from its size, and images are one page.
+    """
+    path = Path(input_path)
+    suffix = path.suffix.lower()
+    if suffix == '.pdf':
+        ranges = resolve_pages(pages)
+        count: Optional[int] = None
+        if needs_page_count(ranges):
+            try:
+                count = pdf_page_count(path)
+            except Exception:
+                return 1
+            if ranges is None:
+                return max(count, 1)
+        return max(sum(1 for _ in iter_pages(ranges, count)), 1)
+    if suffix == '.md':
+        try:
+            return max(path.stat().st_size // MARKDOWN_BYTES_PER_PAGE, 1)
+        except OSError:
+            return 1
+    return 1
+
+
+class Job:
+    """A conversion submitted to a ``Scheduler``."""
+
+    def __init__(self, input_path, output_format, output_path, priority, deadline,
+                 options):
+        self.sequence = 0
+        self.input_path = Path(input_path)
+        self.output_format = output_format
+        self.output_path = output_path
+        self.priority = priority
+        self.deadline = deadline
+        self.options = options
+        self.pages = estimate_pages(self.input_path, options.get('pages'))
+        try:
+            self.size = self.input_path.stat().st_size
+        except OSError:
+            self.size = 0
+        self.submitted = time.monotonic()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.preemptions = 0
+        self.future: Future = Future()
+        # Seconds spent running preempting jobs in this job's worker
+        self._lent_seconds = 0.0
+
+    def result(self, timeout: Optional[float] = None) -> str:
+        """Wait for the conversion and return its output path.
+
+        Raises:
+            DeadlineExceeded: If the job could not start before its deadline
+            Exception: Whatever the conversion raised
+        """
+        return self.future.result(timeout)
+
+    def done(self) -> bool:
+        """Whether the job has finished, failed or expired."""
+        return self.future.done()
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Seconds from submission to completion."""
+        if self.finished is None:
+            return None
+        return self.finished - self.submitted
+
+    def __repr__(self):
+        return (f"Job({self.input_path.name!r}, {self.output_format!r}, "
+                f"priority={self.priority!r}, pages={self.pages})")
+
+
+class Scheduler:
+    """Runs conversions on a fixed set of worker threads, most urgent first."""
+
+    def __init__(self, output_dir: Union[str, Path] = "output",
+                 workers: int = DEFAULT_WORKERS,
+                 processor_factory: Optional[Callable[[], DocumentProcessor]] = None):
+        """Create a scheduler; its workers start with the first job.
+
+        Args:
+            output_dir: Directory of outputs without an explicit path
+            workers: Jobs running at once, not counting preempting jobs
+            processor_factory: Creates the ``DocumentProcessor`` of each job
+                (default: one writing to ``output_dir``), so jobs do not
+                share metadata
+        """
+        if workers < 1:
+            raise ValueError("A scheduler needs at least one worker")
+        self.output_dir = str(output_dir)
+        self.workers = workers
+        self.processor_factory = processor_factory or (
+            lambda: DocumentProcessor(self.output_dir)
+        )
+        self._condition = threading.Condition()
+        self._queue: List[Job] = []
+        self._threads: List[threading.Thread] = []
+        self._idle = 0
+        self._sequence = 0
+        self._closed = False
+        self._page_seconds = INITIAL_PAGE_SECONDS
+        self._latencies: Dict[str, List[float]] = {name: [] for name in PRIORITIES}
+        self._stats = {
+            name: {"jobs": 0, "failed": 0, "deadline_missed": 0} for name in PRIORITIES
+        }
+        self._preemptions = 0
+
+    def submit(self, input_path: Union[str, Path], output_format: str,
+               output_path: Optional[Union[str, Path]] = None,
+               priority: str = 'normal', deadline: Optional[float] = None,
+               **options: Any) -> Job:
+        """Queue a conversion.
+
+        Args:
+            input_path: Path to the input file
+            output_format: Desired output format
+            output_path: Optional output path, as for ``process``
+            priority: One of ``PRIORITIES``
+            deadline: Seconds from now by which the job must have started
+                (and should have finished); None has no deadline
+            **options: Conversion options for ``DocumentProcessor.process``
+
+        Returns:
+            The queued ``Job``
+
+        Raises:
+            ValueError: If the priority is unknown or the deadline not positive
+            RuntimeError: If the scheduler is closed
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(
+                f"Unknown priority: {priority} (choose from {', '.join(PRIORITIES)})"
+            )
+        if deadline is not None and deadline <= 0:
+            raise ValueError(f"Deadlines must be positive: {deadline}")
+        # Estimating the pages may read the input: outside the lock
+        job = Job(input_path, output_format, output_path, priority,
+                  None if deadline is None else time.monotonic() + deadline, options)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The scheduler is closed")
+            self._sequence += 1
+            job.sequence = self._sequence
+            self._queue.append(job)
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._condition.notify()
+        return job
+
+    def convert(self, input_path: Union[str, Path], output_format: str,
+                output_path: Optional[Union[str, Path]] = None,
+                priority: str = 'interactive', deadline: Optional[float] = None,
+                **options: Any) -> str:
+        """Submit a conversion and wait for its output path."""
+        return self.submit(
+            input_path, output_format, output_path, priority, deadline, **options
+        ).result()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queued jobs, preemptions and per-class latency percentiles.
+
+        Latencies are seconds from submission to completion over the last
+        jobs of each class.
+        """
+        with self._condition:
+            classes = {}
+            for name in PRIORITIES:
+                latencies = sorted(self._latencies[name])
+                classes[name] = dict(
+                    self._stats[name],
+                    queued=sum(1 for job in self._queue if job.priority == name),
+                    p50=_percentile(latencies, 50),
+                    p99=_percentile(latencies, 99),
+                    max=latencies[-1] if latencies else None,
+                )
+            return {
+                "workers": self.workers,
+                "queued": len(self._queue),
+                "preemptions": self._preemptions,
+                "page_seconds": round(self._page_seconds, 6),
+                "classes": classes,
+            }
+
+    def close(self, wait: bool = True) -> None:
+        """Stop accepting jobs; the queued ones still run.
+
+        Args:
+            wait: Wait for the queued and running jobs to finish
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            threads = list(self._threads)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _work(self):
+        while True:
+            with self._condition:
+                self._idle += 1
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                self._idle -= 1
+                if not self._queue:
+                    return
+                job = self._pop()
+            self._run(job)
+
+    def _pop(self, below=None):
+        # The most urgent queued job, or None; with ``below``, only a job of
+        # a more urgent class than that rank. Keys change as deadlines
+        # approach, so they are computed at every pick.
+        now = time.monotonic()
+        best = None
+        best_key = None
+        for job in self._queue:
+            key = self._key(job, now)
+            if best_key is None or key < best_key:
+                best, best_key = job, key
+        if best is None or (below is not None and best_key[0] >= below):
+            return None
+        self._queue.remove(best)
+        return best
+
+    def _key(self, job, now):
+        rank = PRIORITIES.index(job.priority)
+        deadline = math.inf if job.deadline is None else job.deadline
+        if deadline - now <= job.pages * self._page_seconds:
+            rank = 0
+        return (rank, deadline, job.pages, job.size, job.sequence)
+
+    def _rank(self, job):
+        return self._key(job, time.monotonic())[0]
+
+    def _run(self, job):
+        if not job.future.set_running_or_notify_cancel():
+            return
+        job.started = time.monotonic()
+        if job.deadline is not None and job.started > job.deadline:
+            self._finish(job, error=DeadlineExceeded(
+                f"{job.input_path} could not start within its deadline"
+            ))
+            return
+        options = dict(job.options)
+        if job.input_path.suffix.lower() == '.pdf' and job.output_format == 'png':
+            on_page = options.get('on_page')
+
+            def checkpoint(page):
+                if on_page:
+                    on_page(page)
+                self._yield(job)
+
+            options['on_page'] = checkpoint
+        try:
+            output = self.processor_factory().process(
+                job.input_path, job.output_format, job.output_path, **options
+            )
+        except Exception as e:
+            self._finish(job, error=e)
+        else:
+            self._finish(job, output)
+
+    def _yield(self, job):
+        # A page boundary of ``job``: run more urgent waiting jobs first
+        while True:
+            with self._condition:
+                if self._idle:
+                    return
+                urgent = self._pop(below=self._rank(job))
+                if urgent is None:
+                    return
+                job.preemptions += 1
+                self._preemptions += 1
+            start = time.monotonic()
+            self._run(urgent)
+            job._lent_seconds += time.monotonic() - start
+
+    def _finish(self, job, output=None, error=None):
+        job.finished = time.monotonic()
+        with self._condition:
+            stats = self._stats[job.priority]
+            stats["jobs"] += 1
+            if error is not None:
+                stats["failed"] += 1
+            if job.deadline is not None and job.finished > job.deadline:
+                stats["deadline_missed"] += 1
+            latencies = self._latencies[job.priority]
+            latencies.append(job.latency)
+            del latencies[:-_LATENCY_WINDOW]
+            if error is None:
+                seconds = (job.finished - job.started - job._lent_seconds) / job.pages
+                self._page_seconds += _ESTIMATE_WEIGHT * (seconds - self._page_seconds)
+        if error is None:
+            job.future.set_result(output)
+        else:
+            job.future.set_exception(error)
+
+
+def _percentile(values, percent):
+    # Nearest-rank percentile of sorted values
+    if not values:
+        return None
+    return values[max(math.ceil(percent / 100 * len(values)) - 1, 0)]
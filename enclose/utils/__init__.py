@@ -2,10 +2,10 @@
 Utility functions for the document processing pipeline.
 """
 
-from .ocr_processor import process_ocr
+from .ocr_processor import iter_ocr, process_ocr
 from .file_utils import search_svg_files
 from .html_utils import enclose_to_html_table
-from .metadata_utils import save_metadata
+from .metadata_utils import JSONLWriter, read_jsonl, save_metadata
 from .file_validation import (
     get_file_mime_type,
     validate_file_signature,
@@ -14,9 +14,12 @@ from .file_validation import (
 
 __all__ = [
     'process_ocr',
+    'iter_ocr',
     'search_svg_files',
     'enclose_to_html_table',
     'save_metadata',
+    'JSONLWriter',
+    'read_jsonl',
     'get_file_mime_type',
     'validate_file_signature',
     'validate_converted_file',
@@ -0,0 +1,101 @@
+"""
+Content-addressed blob store.
+
+Blobs are stored once under their SHA-256 digest, sharded by the first two
+hex digits (``<root>/ab/abcdef...``), so identical content referenced from
+many containers is kept on disk a single time.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+# Directory name of the default store inside an output directory
+BLOB_DIR_NAME = 'blobs'
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(file_path):
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BlobStore:
+    """SHA-256 addressed store of immutable blobs."""
+
+    def __init__(self, root):
+        """Create a store rooted at a directory (created on first write).
+
+        Args:
+            root: Directory holding the blobs
+        """
+        self.root = Path(root)
+
+    def path(self, digest):
+        """Path of the blob with the given digest."""
+        return self.root / digest[:2] / digest
+
+    def __contains__(self, digest):
+        return self.path(digest).exists()
+
+    def put(self, data):
+        """Store bytes and return their digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        if digest not in self:
+            self._write(digest, lambda f: f.write(data))
+        return digest
+
+    def put_file(self, file_path):
+        """Store a file's content and return its digest.
+
+        The file is hashed and copied in chunks, so large PDFs are never held
+        in memory.
+        """
+        digest = file_digest(file_path)
+        if digest not in self:
+            with open(file_path, 'rb') as src:
+                self._write(digest, lambda f: shutil.copyfileobj(src, f, _CHUNK_SIZE))
+        return digest
+
+    def get(self, digest, verify=True):
+        """Read a blob.
+
+        Args:
+            digest: SHA-256 hex digest of the blob
+            verify: Check the content against the digest
+
+        Returns:
+            The blob's bytes
+
+        Raises:
+            FileNotFoundError: If the blob is not in the store
+            ValueError: If the content does not match the digest
+        """
+        blob_path = self.path(digest)
+        if not blob_path.exists():
+            raise FileNotFoundError(f"Blob not found: {digest}")
+        data = blob_path.read_bytes()
+        if verify and hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Checksum mismatch for blob {digest}")
+        return data
+
+    def _write(self, digest, write):
+        # Write to a temporary file in the shard, then rename, so readers
+        # never see a partial blob
+        blob_path = self.path(digest)
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=blob_path.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, blob_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -2,19 +2,64 @@
 File system utilities.
 """
 
+import gzip
+import io
+import re
 from datetime import datetime
 from pathlib import Path
 from bs4 import BeautifulSoup
 
+from .reproducible import is_reproducible, source_date_epoch
+
+# SVG file suffixes; '.svgz' files are gzip-compressed SVG
+SVG_SUFFIXES = ('.svg', '.svgz')
+SVGZ_COMPRESSLEVEL = 6
+
+# Checksum of a PDF referenced from an SVG container (see pdf_to_svg)
+_PDF_REFERENCE_RE = re.compile(r'<embed src="([^"]*)" data-sha256="([0-9a-f]{64})"')
+
+
+def is_svgz(file_path):
+    """Whether a path names a gzip-compressed SVG file."""
+    return Path(file_path).suffix.lower() == '.svgz'
+
+
+def open_svg(file_path, mode='r', compresslevel=SVGZ_COMPRESSLEVEL):
+    """Open an SVG or SVGZ file as UTF-8 text.
+
+    ``.svgz`` files are transparently decompressed when reading and written
+    through a streaming gzip encoder; in reproducible mode the gzip header
+    carries the build date instead of the current time.
+
+    Args:
+        file_path: Path to the .svg or .svgz file
+        mode: 'r' to read, 'w' to write
+        compresslevel: gzip level (1-9) for writing .svgz files
+
+    Returns:
+        A text file object
+    """
+    if not is_svgz(file_path):
+        return open(file_path, mode, encoding='utf-8')
+    if 'r' in mode:
+        return gzip.open(file_path, 'rt', encoding='utf-8')
+    mtime = source_date_epoch() if is_reproducible() else None
+    return io.TextIOWrapper(
+        gzip.GzipFile(str(file_path), 'wb', compresslevel=compresslevel, mtime=mtime),
+        encoding='utf-8',
+    )
+
 
 def search_svg_files(search_path="."):
-    """Search filesystem for SVG files and their metadata."""
+    """Search filesystem for SVG (and SVGZ) files and their metadata."""
     svg_files = []
     search_dir = Path(search_path)
 
-    for svg_file in search_dir.rglob("*.svg"):
+    for svg_file in search_dir.rglob("*.svg*"):
+        if svg_file.suffix.lower() not in SVG_SUFFIXES:
+            continue
         try:
-            with open(svg_file, 'r') as f:
+            with open_svg(svg_file) as f:
                 content = f.read()
 
             # Parse SVG for metadata
@@ -29,6 +74,13 @@ def search_svg_files(search_path="."):
                 "has_pdf_data": 'data:application/pdf;base64,' in content
             }
 
+            # Referenced containers point to the PDF in a blob store
+            reference = _PDF_REFERENCE_RE.search(content)
+            if reference:
+                file_info["has_pdf_data"] = True
+                file_info["pdf_ref"] = reference.group(1)
+                file_info["pdf_sha256"] = reference.group(2)
+
             if metadata_elem:
                 title_elem = soup.find('dc:title')
                 if title_elem:
@@ -1,6 +1,7 @@
 """
 File validation utilities.
 """
+import gzip
 import os
 import filetype
 from pathlib import Path
@@ -49,9 +50,11 @@ def validate_file_signature(file_path: Union[str, Path], expected_type: str) ->
     expected_mime_types = {
         'pdf': 'application/pdf',
         'svg': 'image/svg+xml',
+        'svgz': 'image/svg+xml',
         'png': 'image/png',
         'jpeg': 'image/jpeg',
         'jpg': 'image/jpeg',
+        'webp': 'image/webp',
         'html': 'text/html',
         'txt': 'text/plain',
         'md': 'text/markdown'
@@ -83,10 +86,11 @@ def validate_file_signature(file_path: Union[str, Path], expected_type: str) ->
         except Exception as e:
             return False, f"Error reading {expected_ext.upper()} file: {str(e)}"
     
-    # Special handling for SVG files since they're XML
-    if expected_ext == 'svg':
+    # Special handling for SVG files since they're XML; SVGZ is gzipped XML
+    if expected_ext in ['svg', 'svgz']:
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
+            opener = gzip.open if expected_ext == 'svgz' else open
+            with opener(file_path, 'rt', encoding='utf-8') as f:
                 content = f.read(1024).lower()
                 if '<!doctype svg' in content or '<svg' in content:
                     return True, "Valid SVG file: image/svg+xml"
@@ -6,6 +6,8 @@ import os
 import webbrowser
 from pathlib import Path
 
+from .file_utils import open_svg
+
 
 def enclose_to_html_table(svg_files_data, html_path):
     """Create HTML table with SVG thumbnails."""
@@ -49,7 +51,7 @@ def enclose_to_html_table(svg_files_data, html_path):
             
         try:
             if os.path.exists(svg_data["path"]):
-                with open(svg_data["path"], 'r') as f:
+                with open_svg(svg_data["path"]) as f:
                     svg_content = f.read()
                 # Embed SVG directly as thumbnail
                 thumbnail_html = f'<div class="thumbnail">{svg_content}</div>'
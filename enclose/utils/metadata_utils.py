@@ -3,6 +3,7 @@ Metadata handling utilities.
 """
 
 import json
+import os
 from pathlib import Path
 
 
@@ -13,3 +14,92 @@ def save_metadata(metadata, output_dir, filename="metadata.json"):
         json.dump(metadata, f, indent=2)
     print(f"Saved metadata: {json_path}")
     return json_path
+
+
+class JSONLWriter:
+    """Writes records as JSON Lines, one flushed line per record.
+
+    Each record is on disk as soon as ``write`` returns, so readers can
+    consume a file while it is still being written, and a crash loses at
+    most the record being written.
+    """
+
+    def __init__(self, target, fsync=False):
+        """Open a JSONL sink.
+
+        Args:
+            target: Path (appended to, parent directories created) or a
+                writable text file object (left open on ``close``); a line
+                a crash left without its newline is dropped from a path
+                before appending
+            fsync: Also force every line to the disk, not only to the OS
+        """
+        if hasattr(target, 'write'):
+            self.path = getattr(target, 'name', None)
+            self._file = target
+            self._owned = False
+        else:
+            self.path = Path(target)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            _drop_partial_line(self.path)
+            self._file = open(self.path, 'a', encoding='utf-8')
+            self._owned = True
+        self.fsync = fsync
+        self.count = 0
+
+    def write(self, record):
+        """Append one record as a line and flush it."""
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.count += 1
+
+    def close(self):
+        if self._owned:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _drop_partial_line(jsonl_path, block_size=4096):
+    # Cut the file back to its last newline; the next record would otherwise
+    # be appended to a fragment and both would be lost
+    try:
+        f = open(jsonl_path, 'r+b')
+    except FileNotFoundError:
+        return
+    with f:
+        end = f.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(end - block_size, 0)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b'\n')
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            end = start
+        f.truncate(end)
+
+
+def read_jsonl(jsonl_path):
+    """Yield the records of a JSONL file.
+
+    A final line without its newline is the record being written (or cut
+    short by a crash) and is skipped, as are lines that are not valid JSON.
+    """
+    with open(jsonl_path, encoding='utf-8') as f:
+        for line in f:
+            if not line.endswith('\n'):
+                break
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            yield record
@@ -0,0 +1,251 @@
+"""
+OCR engine backends.
+
+pytesseract runs the tesseract executable for every call: it writes the image
+to a temporary file, starts a process and loads the language model again.
+The tesserocr backend calls libtesseract in-process instead, takes images
+from memory and keeps one initialized engine per thread for the life of the
+worker, which matters most for small pages where start-up dominates.
+
+The backend is selected by name, or by the ``ENCLOSE_OCR_BACKEND``
+environment variable when no name is given. The default, 'auto', uses
+tesserocr when it is installed and falls back to pytesseract.
+
+Tesseract's OpenMP threads would compete with the OCR workers for the same
+cores, so both backends run single-threaded unless ``OMP_THREAD_LIMIT`` is
+set (see ``utils.resource_governor``). The limit is applied when the first
+backend is created, not on import, so importing enclose leaves the thread
+settings of the host process alone.
+"""
+
+import importlib
+import importlib.util
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+import pytesseract
+
+from .resource_governor import apply_thread_env
+
+# Imported by the first tesserocr backend: OpenMP reads its thread limit once,
+# when libtesseract loads. None when tesserocr is not installed.
+tesserocr = 'tesserocr' if importlib.util.find_spec('tesserocr') else None
+
+DEFAULT_BACKEND = 'auto'
+BACKEND_ENV_VAR = 'ENCLOSE_OCR_BACKEND'
+DEFAULT_LANGUAGE = 'eng'
+
+
+def _text_from_lines(lines):
+    """Join (block, paragraph, line) -> words into tesseract's text layout."""
+    text = []
+    previous = None
+    for (block, paragraph, _), words in lines.items():
+        if previous is not None and previous != (block, paragraph):
+            text.append("")
+        text.append(" ".join(words))
+        previous = (block, paragraph)
+    return "\n".join(text)
+
+
+def _mean_confidence(words):
+    confidences = [w["conf"] for w in words if w["conf"] > 0]
+    return sum(confidences) / len(confidences) if confidences else 0
+
+
+class OCRBackend(ABC):
+    """Interface for OCR engines; subclasses implement ``recognize_words``."""
+
+    #: Name used to select the backend
+    name: Optional[str] = None
+
+    def __init__(self, lang=DEFAULT_LANGUAGE):
+        self.lang = lang
+        # Tesseract is about to run: one thread per page from here on
+        apply_thread_env()
+
+    def words(self, image):
+        """Recognize an image's words.
+
+        Returns:
+            List of dicts with text, left, top, width, height and conf
+        """
+        return self.recognize_words(image)[1]
+
+    def recognize(self, image):
+        """Recognize an image; return (text, mean word confidence)."""
+        text, words = self.recognize_words(image)
+        return text, _mean_confidence(words)
+
+    @abstractmethod
+    def recognize_words(self, image):
+        """Recognize an image once; return (text, words)."""
+
+    def close(self):
+        """Release the engines held by the backend."""
+
+
+class PytesseractBackend(OCRBackend):
+    """Backend running the tesseract executable through pytesseract."""
+
+    name = 'pytesseract'
+
+    def recognize_words(self, image):
+        # One tesseract run; the text is rebuilt from the word table
+        data = pytesseract.image_to_data(
+            image, lang=self.lang, output_type=pytesseract.Output.DICT
+        )
+        words = []
+        lines = {}
+        for i, text in enumerate(data['text']):
+            confidence = float(data['conf'][i])
+            if not text.strip() or confidence < 0:
+                continue
+            words.append({
+                "text": text.strip(),
+                "left": int(data['left'][i]),
+                "top": int(data['top'][i]),
+                "width": int(data['width'][i]),
+                "height": int(data['height'][i]),
+                "conf": confidence,
+            })
+            line = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            lines.setdefault(line, []).append(text.strip())
+        return _text_from_lines(lines), words
+
+
+class TesserocrBackend(OCRBackend):
+    """Backend calling libtesseract in-process through tesserocr.
+
+    Engines are created on first use in each thread and reused for every
+    later image; a forked worker process creates its own.
+    """
+
+    name = 'tesserocr'
+
+    def __init__(self, lang=DEFAULT_LANGUAGE):
+        if tesserocr is None:
+            raise ImportError(
+                "The 'tesserocr' OCR backend requires tesserocr: pip install tesserocr"
+            )
+        super().__init__(lang)
+        _load_tesserocr()
+        self._local = threading.local()
+        self._engines = []
+        self._lock = threading.Lock()
+
+    def _engine(self):
+        engine = getattr(self._local, 'engine', None)
+        if engine is None or self._local.pid != os.getpid():
+            engine = tesserocr.PyTessBaseAPI(lang=self.lang)
+            self._local.engine = engine
+            self._local.pid = os.getpid()
+            with self._lock:
+                self._engines.append(engine)
+        return engine
+
+    def recognize_words(self, image):
+        engine = self._engine()
+        engine.SetImage(image)
+        engine.Recognize()
+        level = tesserocr.RIL.WORD
+        words = []
+        lines = {}
+        line = 0
+        iterator = engine.GetIterator()
+        for word in tesserocr.iterate_level(iterator, level):
+            text = (word.GetUTF8Text(level) or "").strip()
+            if word.IsAtBeginningOf(tesserocr.RIL.TEXTLINE):
+                line += 1
+            if not text:
+                continue
+            left, top, right, bottom = word.BoundingBox(level)
+            words.append({
+                "text": text,
+                "left": left,
+                "top": top,
+                "width": right - left,
+                "height": bottom - top,
+                "conf": float(word.Confidence(level)),
+            })
+            lines.setdefault((0, 0, line), []).append(text)
+        engine.Clear()
+        return "\n".join(" ".join(w) for w in lines.values()), words
+
+    def close(self):
+        with self._lock:
+            engines, self._engines = self._engines, []
+        for engine in engines:
+            engine.End()
+        self._local = threading.local()
+
+
+def _load_tesserocr():
+    # After ``apply_thread_env``, so libtesseract starts single-threaded
+    global tesserocr
+    if isinstance(tesserocr, str):
+        tesserocr = importlib.import_module(tesserocr)
+    return tesserocr
+
+
+OCR_BACKENDS = {
+    backend.name: backend
+    for backend in (PytesseractBackend, TesserocrBackend)
+}
+
+
+def available_backends():
+    """Return the names of backends whose dependencies are installed."""
+    available = [PytesseractBackend.name]
+    if tesserocr is not None:
+        available.insert(0, TesserocrBackend.name)
+    return available
+
+
+def resolve_backend_name(name=None):
+    """Resolve a backend name, falling back to the environment and the default.
+
+    'auto' resolves to the first available backend.
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    name = (name or os.environ.get(BACKEND_ENV_VAR) or DEFAULT_BACKEND).lower()
+    if name == 'auto':
+        return available_backends()[0]
+    if name not in OCR_BACKENDS:
+        raise ValueError(
+            f"Unknown OCR backend: {name} "
+            f"(choose from auto, {', '.join(OCR_BACKENDS)})"
+        )
+    return name
+
+
+_lock = threading.Lock()
+_backends: Dict[Tuple[str, str], OCRBackend] = {}
+
+
+def get_ocr_backend(name=None, lang=DEFAULT_LANGUAGE):
+    """Return the process-wide OCR backend for a name and language.
+
+    Backends are created once and shared, so their engines stay initialized
+    between documents.
+
+    Args:
+        name: Backend name, 'auto' or an ``OCRBackend`` instance (returned
+            as is); defaults to ``$ENCLOSE_OCR_BACKEND`` or 'auto'
+        lang: Tesseract language code(s), e.g. 'eng' or 'eng+deu'
+
+    Raises:
+        ValueError: If the backend name is unknown
+        ImportError: If the backend's optional dependency is not installed
+    """
+    if isinstance(name, OCRBackend):
+        return name
+    key = (resolve_backend_name(name), lang)
+    with _lock:
+        if key not in _backends:
+            _backends[key] = OCR_BACKENDS[key[0]](lang)
+        return _backends[key]
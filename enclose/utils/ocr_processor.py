@@ -1,28 +1,201 @@
 """
 OCR processing utilities.
+
+Recognition goes through an OCR backend (see ``ocr_backends``): in-process
+tesserocr engines when available, the tesseract executable otherwise.
+
+Pages rendered as tiles (see ``converters.raster.iter_tiles``) are recognized
+tile by tile; ``ocr_tiles`` maps each tile's words to page coordinates, keeps
+every word from the one tile whose core (the tile minus half the overlap on
+each inner edge) contains its centre, and rebuilds the page text from the
+word positions.
 """
 
 import json
-import pytesseract
+import time
+from dataclasses import asdict
 from pathlib import Path
 from PIL import Image
 
+from . import image_preprocessing
+from .metadata_utils import JSONLWriter
+from .ocr_backends import get_ocr_backend
+from .page_triage import PageTriage
+
+
+def preprocessing_summary(options, results):
+    """Sum up the preprocessing stats of page results for the metadata."""
+    pages = [r["preprocessing"] for r in results if "preprocessing" in r]
+    summary = {
+        "options": asdict(options),
+        "pages": len(pages),
+        "time": sum(p["time"] for p in pages),
+        "ocr_time": sum(p["ocr_time"] for p in pages),
+    }
+    baselines = [p for p in pages if "baseline" in p]
+    if baselines:
+        summary["baseline_ocr_time"] = sum(p["baseline"]["ocr_time"] for p in baselines)
+        summary["confidence_gain"] = sum(
+            p["ocr_confidence"] - p["baseline"]["ocr_confidence"] for p in baselines
+        ) / len(baselines)
+    return summary
+
+
+def triage_summary(results):
+    """Count the pages skipped by triage for the metadata."""
+    skipped = [r["skipped"] for r in results if "skipped" in r]
+    return {
+        "pages": len(results),
+        "blank": skipped.count("blank"),
+        "duplicate": skipped.count("duplicate"),
+    }
+
+
+def triage_page(image, key, triage, result):
+    """Run page triage and record its decision in a page result.
+
+    Returns:
+        True if the page should be skipped (``result["skipped"]`` says why)
+    """
+    decision = triage.check(image, key)
+    skipped = decision.pop("skipped", None)
+    duplicate_of = decision.pop("duplicate_of", None)
+    result["triage"] = decision
+    if skipped:
+        result["skipped"] = skipped
+        if duplicate_of:
+            result["duplicate_of"] = duplicate_of
+    return bool(skipped)
+
+
+def copy_duplicate(result, triage):
+    """Fill a duplicate page's result from its original, once that is known."""
+    if result.get("duplicate_of"):
+        result.update(triage.result(result["duplicate_of"]) or {})
+
+
+def recognize_page(image, result, engine, options=None):
+    """OCR one page image into its result dict.
+
+    Args:
+        image: Page image
+        result: Page result to update with ``ocr_text``, ``ocr_confidence``,
+            ``word_count`` (and ``preprocessing``)
+        engine: ``OCRBackend`` to recognize with
+        options: ``PreprocessOptions`` to normalize the image first, or None
+
+    Returns:
+        The updated result
+    """
+    if options:
+        raw_image = image
+        image, stats = image_preprocessing.preprocess(raw_image, options)
+        if options.compare:
+            start = time.perf_counter()
+            _, raw_confidence = engine.recognize(raw_image)
+            stats["baseline"] = {
+                "ocr_time": time.perf_counter() - start,
+                "ocr_confidence": raw_confidence,
+            }
+        result["preprocessing"] = stats
+
+    start = time.perf_counter()
+    ocr_text, confidence = engine.recognize(image)
+    if options:
+        stats["ocr_time"] = time.perf_counter() - start
+        stats["ocr_confidence"] = confidence
 
-def process_ocr(png_files, metadata):
+    # Update results
+    result.update({
+        "ocr_text": ocr_text.strip(),
+        "ocr_confidence": confidence,
+        "word_count": len(ocr_text.split())
+    })
+    return result
+
+
+def process_ocr(png_files, metadata, preprocess=None, triage=None, backend=None,
+                sink=None, on_page=None):
     """Process PNG files with OCR and update metadata.
     
     Args:
         png_files: List of file paths or file objects to process
         metadata: Dictionary containing metadata to update
+        preprocess: Normalize images before OCR (grayscale, DPI, deskew,
+            crop, threshold): ``True`` for the defaults, or a
+            ``PreprocessOptions`` / dict of its fields. Each page's
+            ``preprocessing`` entry and ``metadata["preprocessing"]`` report
+            what was done and the time spent; with ``compare`` they include
+            the raw image's OCR time and confidence. Tiled pages are not
+            preprocessed, since cropping and deskewing would move the words.
+        triage: Skip blank pages and copy the results of near-duplicate
+            pages instead of recognizing them again: ``True`` for a triage
+            of this call's pages, or a ``PageTriage`` shared by several
+            calls to find duplicates across documents. Skipped pages carry
+            ``skipped`` ('blank' or 'duplicate') and ``duplicate_of``;
+            ``metadata["triage"]`` counts them.
+        backend: OCR backend name ('auto', 'tesserocr', 'pytesseract') or
+            ``OCRBackend``; defaults to ``$ENCLOSE_OCR_BACKEND`` or 'auto'
+        sink: JSONL file path or ``JSONLWriter``; each page's result is
+            appended as soon as the page is done, and
+            ``metadata["ocr_results_file"]`` names the file
+        on_page: Called with each page's result as soon as the page is done
         
     Returns:
         Updated metadata with OCR results
     """
+    options = image_preprocessing.resolve_options(preprocess)
+    if triage is True:
+        triage = PageTriage()
+    writer = sink if sink is None or isinstance(sink, JSONLWriter) else JSONLWriter(sink)
+
+    ocr_results = []
+    try:
+        for result in _ocr_pages(png_files, options, triage, get_ocr_backend(backend)):
+            if writer:
+                writer.write(result)
+            if on_page:
+                on_page(result)
+            ocr_results.append(result)
+    finally:
+        if writer is not sink:
+            writer.close()
+
+    # Update metadata with OCR results
+    metadata["ocr_results"] = ocr_results
+    if writer and writer.path:
+        metadata["ocr_results_file"] = str(writer.path)
+    if options:
+        metadata["preprocessing"] = preprocessing_summary(options, ocr_results)
+    if triage:
+        metadata["triage"] = triage_summary(ocr_results)
+    return metadata
+
+    metadata["ocr_data"] = png_files
+    return metadata
+
+
+def iter_ocr(png_files, preprocess=None, triage=None, backend=None):
+    """Recognize pages one at a time, yielding each result as it is done.
+
+    Takes the pages and options of ``process_ocr`` but keeps no results, so
+    downstream consumers can index pages while OCR is still running.
+
+    Yields:
+        One result dict per page, in page order
+    """
+    if triage is True:
+        triage = PageTriage()
+    yield from _ocr_pages(
+        png_files, image_preprocessing.resolve_options(preprocess), triage,
+        get_ocr_backend(backend),
+    )
+
+
+def _ocr_pages(png_files, options, triage, engine):
     if not isinstance(png_files, (list, tuple)):
         png_files = [png_files]
-        
-    ocr_results = []
-    
+
     for i, page_info in enumerate(png_files):
         result = {"page": i + 1, "ocr_text": "", "ocr_confidence": 0, "word_count": 0}
         
@@ -32,6 +205,18 @@ def process_ocr(png_files, metadata):
                 file_path = str(page_info)
                 image = Image.open(file_path)
                 result["file"] = file_path
+            elif isinstance(page_info, dict) and page_info.get("tiles"):
+                file_path = str(page_info["file"])
+                result.update(page_info)
+                result.update(ocr_tiles(
+                    ((tile, tile["file"]) for tile in page_info["tiles"]),
+                    page_info["width"], page_info["height"], page_info.get("overlap", 0),
+                    engine,
+                ))
+                print(f"OCR processed: {file_path} "
+                      f"({len(page_info['tiles'])} tiles, confidence: {result['ocr_confidence']:.2f}%)")
+                yield result
+                continue
             elif isinstance(page_info, dict) and "file" in page_info:
                 file_path = str(page_info["file"])
                 image = Image.open(file_path)
@@ -39,24 +224,16 @@ def process_ocr(png_files, metadata):
             else:
                 raise ValueError(f"Unsupported page info type: {type(page_info)}")
                 
-            # Perform OCR
-            ocr_text = pytesseract.image_to_string(image)
-            
-            # Extract structured data
-            ocr_data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
-            
-            # Calculate confidence (handle division by zero)
-            confidences = [float(x) for x in ocr_data['conf'] if float(x) > 0]
-            confidence = sum(confidences) / len(confidences) if confidences else 0
-            
-            # Update results
-            result.update({
-                "ocr_text": ocr_text.strip(),
-                "ocr_confidence": confidence,
-                "word_count": len(ocr_text.split())
-            })
-            
-            print(f"OCR processed: {file_path} (confidence: {confidence:.2f}%)")
+            if triage and triage_page(image, file_path, triage, result):
+                copy_duplicate(result, triage)
+                print(f"OCR skipped: {file_path} ({result['skipped']})")
+                yield result
+                continue
+
+            recognize_page(image, result, engine, options)
+            if triage:
+                triage.record(file_path, result)
+            print(f"OCR processed: {file_path} (confidence: {result['ocr_confidence']:.2f}%)")
             
         except Exception as e:
             error_msg = str(e)
@@ -65,11 +242,115 @@ def process_ocr(png_files, metadata):
                 result["file"] = f"page_{i+1}.png"
             result["error"] = error_msg
             
-        ocr_results.append(result)
-    
-    # Update metadata with OCR results
-    metadata["ocr_results"] = ocr_results
-    return metadata
+        yield result
 
-    metadata["ocr_data"] = png_files
-    return metadata
+
+def ocr_words(image, backend=None):
+    """Recognize the words of an image with their boxes and confidences."""
+    return get_ocr_backend(backend).words(image)
+
+
+def _tile_core(tile, width, height, overlap):
+    # Inner edges give half the overlap to each neighbour
+    half = overlap / 2
+    left = tile["x"] + (half if tile["x"] > 0 else 0)
+    top = tile["y"] + (half if tile["y"] > 0 else 0)
+    right = tile["x"] + tile["width"] - (half if tile["x"] + tile["width"] < width else 0)
+    bottom = tile["y"] + tile["height"] - (half if tile["y"] + tile["height"] < height else 0)
+    return left, top, right, bottom
+
+
+def stitch_text(words):
+    """Rebuild text from positioned words: one line per text row, left to right."""
+    lines = []
+    for word in sorted(words, key=lambda w: w["top"] + w["height"] / 2):
+        centre = word["top"] + word["height"] / 2
+        if lines and lines[-1]["top"] <= centre <= lines[-1]["bottom"]:
+            line = lines[-1]
+            line["words"].append(word)
+            line["bottom"] = max(line["bottom"], word["top"] + word["height"])
+        else:
+            lines.append({
+                "top": word["top"],
+                "bottom": word["top"] + word["height"],
+                "words": [word],
+            })
+    return "\n".join(
+        " ".join(w["text"] for w in sorted(line["words"], key=lambda w: w["left"]))
+        for line in lines
+    )
+
+
+def ocr_tiles(tiles, width, height, overlap=0, backend=None):
+    """OCR a page from its tiles and stitch the results.
+
+    Tiles are processed one at a time, so memory stays bounded by the tile
+    size; pass ``converters.raster.iter_tiles(...)`` to OCR a page straight
+    from the renderer without writing tiles to disk.
+
+    Args:
+        tiles: Iterable of (tile, image) pairs; a tile is a
+            ``raster.Tile`` or a dict with x, y, width and height, an image
+            is a PIL image or a file path
+        width: Page width in pixels
+        height: Page height in pixels
+        overlap: Pixels shared by neighbouring tiles
+        backend: OCR backend name or ``OCRBackend`` (default: auto)
+
+    Returns:
+        Dict with the page's ``ocr_text``, ``ocr_confidence``,
+        ``word_count`` and ``words`` (boxes in page coordinates)
+    """
+    engine = get_ocr_backend(backend)
+    words = []
+    for tile, image in tiles:
+        if not isinstance(tile, dict):
+            tile = vars(tile)
+        if isinstance(image, (str, Path)):
+            with Image.open(image) as img:
+                tile_words = engine.words(img)
+        else:
+            tile_words = engine.words(image)
+            image.close()
+
+        left, top, right, bottom = _tile_core(tile, width, height, overlap)
+        for word in tile_words:
+            word["left"] += tile["x"]
+            word["top"] += tile["y"]
+            centre_x = word["left"] + word["width"] / 2
+            centre_y = word["top"] + word["height"] / 2
+            if left <= centre_x < right and top <= centre_y < bottom:
+                words.append(word)
+
+    confidences = [w["conf"] for w in words if w["conf"] > 0]
+    return {
+        "ocr_text": stitch_text(words),
+        "ocr_confidence": sum(confidences) / len(confidences) if confidences else 0,
+        "word_count": len(words),
+        "words": words,
+    }
+
+
+def process_ocr_tiled(svg_file, dpi=300, tile_size=None, overlap=None, backend=None):
+    """Render an SVG page as tiles and OCR them without writing images.
+
+    Args:
+        svg_file: Path to the SVG (or SVGZ) page
+        dpi: Render resolution
+        tile_size: Tile edge in pixels (default: ``raster.DEFAULT_TILE_SIZE``)
+        overlap: Pixels shared by neighbouring tiles
+            (default: ``raster.DEFAULT_TILE_OVERLAP``)
+        backend: OCR backend name or ``OCRBackend`` (default: auto)
+
+    Returns:
+        OCR result dict, as returned by ``ocr_tiles``
+    """
+    from ..converters import raster
+
+    tile_size = tile_size or raster.DEFAULT_TILE_SIZE
+    overlap = raster.DEFAULT_TILE_OVERLAP if overlap is None else overlap
+    width, height = raster.svg_page_size(svg_file, dpi)
+    tiles = raster.iter_tiles(svg_file, dpi, tile_size, overlap, mode='L')
+    result = ocr_tiles(tiles, width, height, overlap, backend)
+    result.update({"file": str(svg_file), "width": width, "height": height, "dpi": dpi})
+    return result
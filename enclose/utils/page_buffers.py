@@ -0,0 +1,237 @@
+"""
+Shared-memory page buffers.
+
+A 300 DPI page is tens of megabytes of pixels. Sending it to an OCR worker
+process by pickling, or through a PNG file, costs a serialization and several
+copies per page. ``PageBufferPool`` keeps a fixed number of
+``multiprocessing.shared_memory`` segments instead: the parent copies each
+rendered page into a free segment once and sends the worker a small
+``PageRef``; the worker maps the segment and reads the pixels in place as a
+NumPy array or a PIL image (``open_page``, ``page_array``).
+
+Segments are owned by the pool in the parent process. Workers only attach to
+them, so a crashing worker leaks nothing: its page's segment is released by
+the parent and reused, and every segment is unlinked when the pool is closed
+or garbage collected (and by the multiprocessing resource tracker if the
+parent itself dies).
+
+Pixels are stored as 8-bit grayscale ('L'), 'RGBA' or, for RGB pages, 'RGBX'
+(RGB padded to four bytes, which Pillow maps without copying).
+
+Requires NumPy (``pip install enclose[preprocess]``).
+"""
+
+import queue
+import sys
+import threading
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+from typing import NamedTuple, Optional, Tuple
+
+from PIL import Image
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+# Bytes per pixel of the stored modes
+_MODE_BYTES = {'L': 1, 'RGBA': 4, 'RGBX': 4}
+
+
+class PageRef(NamedTuple):
+    """Picklable reference to a page held in a pool segment."""
+
+    name: str
+    slot: int
+    mode: str
+    size: Tuple[int, int]
+    dpi: Optional[Tuple[float, float]] = None
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(
+            "Shared page buffers require NumPy: pip install numpy "
+            "(or pip install enclose[preprocess])"
+        )
+
+
+def stored_mode(image: Image.Image) -> str:
+    """Mode a page is stored in: 'L', 'RGBA' or 'RGBX'."""
+    if image.mode in ('1', 'L', 'I;16'):
+        return 'L'
+    if image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info:
+        return 'RGBA'
+    return 'RGBX'
+
+
+def page_bytes(size: Tuple[int, int], mode: str) -> int:
+    """Bytes needed to store a page of the given size and stored mode."""
+    width, height = size
+    return width * height * _MODE_BYTES[mode]
+
+
+def _shape(size, mode):
+    width, height = size
+    return (height, width) if mode == 'L' else (height, width, 4)
+
+
+def _unlink(segments):
+    for segment in segments:
+        if segment is None:
+            continue
+        try:
+            segment.close()
+        except BufferError:
+            # A view is still alive; the mapping goes with the process
+            pass
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+    segments[:] = [None] * len(segments)
+
+
+class PageBufferPool:
+    """Fixed number of reusable shared-memory page segments."""
+
+    def __init__(self, slots: int):
+        """Create a pool.
+
+        Segments are allocated on first use and grown when a larger page
+        arrives, so the pool needs no page size up front.
+
+        Args:
+            slots: Pages held at once; ``put`` blocks while all are in use
+        """
+        _require_numpy()
+        if slots < 1:
+            raise ValueError("A page buffer pool needs at least one slot")
+        self.slots = slots
+        self._segments = [None] * slots
+        self._free = queue.Queue()
+        for slot in range(slots):
+            self._free.put(slot)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._finalizer = weakref.finalize(self, _unlink, self._segments)
+
+    def put(self, image: Image.Image, timeout: Optional[float] = None) -> Optional[PageRef]:
+        """Copy a page into a free segment.
+
+        Args:
+            image: Page image
+            timeout: Seconds to wait for a free slot (None: wait forever)
+
+        Returns:
+            Reference to pass to a worker, or None if no slot became free
+            within the timeout
+        """
+        try:
+            slot = self._free.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        try:
+            mode = stored_mode(image)
+            segment = self._segment(slot, page_bytes(image.size, mode))
+            view = np.ndarray(_shape(image.size, mode), np.uint8, buffer=segment.buf)
+            if mode == 'RGBX':
+                view[..., :3] = np.asarray(image.convert('RGB') if image.mode != 'RGB' else image)
+                view[..., 3] = 255
+            else:
+                view[...] = np.asarray(image if image.mode == mode else image.convert(mode))
+            del view
+        except BaseException:
+            self._free.put(slot)
+            raise
+        dpi = image.info.get('dpi')
+        return PageRef(segment.name, slot, mode, image.size, tuple(dpi) if dpi else None)
+
+    def _segment(self, slot, size):
+        with self._lock:
+            if self._closed:
+                raise ValueError("The page buffer pool is closed")
+            segment = self._segments[slot]
+            if segment is None or segment.size < size:
+                if segment is not None:
+                    _unlink([segment])
+                segment = shared_memory.SharedMemory(create=True, size=size)
+                self._segments[slot] = segment
+            return segment
+
+    def release(self, ref: PageRef) -> None:
+        """Return a page's segment to the pool for the next page."""
+        self._free.put(ref.slot)
+
+    def image(self, ref: PageRef) -> Image.Image:
+        """View a page held by the pool as a PIL image (no copy)."""
+        return _image(self._segments[ref.slot], ref)
+
+    @property
+    def in_use(self) -> int:
+        """Slots currently holding a page."""
+        return self.slots - self._free.qsize()
+
+    def close(self) -> None:
+        """Unlink every segment; views and refs become invalid."""
+        with self._lock:
+            self._closed = True
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _image(segment, ref):
+    image = Image.frombuffer(ref.mode, ref.size, segment.buf, 'raw', ref.mode, 0, 1)
+    if ref.dpi:
+        image.info['dpi'] = ref.dpi
+    return image
+
+
+# Segments attached by this (worker) process, by slot
+_attached = {}
+
+
+def _attach(ref):
+    segment = _attached.get(ref.slot)
+    if segment is None or segment.name != ref.name:
+        if segment is not None:
+            try:
+                segment.close()
+            except BufferError:
+                pass
+        # The owning pool unlinks the segment, so workers leave it out of the
+        # resource tracker (whose lock a forked worker may inherit held)
+        if sys.version_info >= (3, 13):
+            segment = shared_memory.SharedMemory(name=ref.name, track=False)
+        else:
+            register = resource_tracker.register
+            resource_tracker.register = lambda name, rtype: None
+            try:
+                segment = shared_memory.SharedMemory(name=ref.name)
+            finally:
+                resource_tracker.register = register
+        _attached[ref.slot] = segment
+    return segment
+
+
+def open_page(ref: PageRef) -> Image.Image:
+    """Map a page in a worker process as a PIL image (no copy).
+
+    The image is only valid until the parent releases the page.
+    """
+    return _image(_attach(ref), ref)
+
+
+def page_array(ref: PageRef) -> "np.ndarray":
+    """Map a page in a worker process as a uint8 array (no copy).
+
+    The shape is (height, width) for 'L' pages, (height, width, 4) otherwise.
+    """
+    _require_numpy()
+    return np.ndarray(_shape(ref.size, ref.mode), np.uint8, buffer=_attach(ref).buf)
@@ -0,0 +1,118 @@
+"""
+Page selections such as ``1-3,10``.
+
+Classifying a long PDF often needs only its first pages. A page selection
+lists the pages to process as ranges; the rasterizer renders only those
+pages, so the others are never rendered or recognized. A range without an
+end (``10-``) runs to the last page, which is the only case that needs the
+document's page count.
+"""
+
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+# (first, last) page numbers, 1-based and inclusive; last None for open ranges
+PageRange = Tuple[int, Optional[int]]
+
+
+def parse_pages(spec: str) -> List[PageRange]:
+    """Parse a page selection such as ``1-3,10,20-``.
+
+    Returns:
+        Sorted, merged (first, last) ranges
+
+    Raises:
+        ValueError: If a part is not a page number or range
+    """
+    ranges = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        start, sep, end = part.partition('-')
+        last: Optional[int]
+        try:
+            first = int(start)
+            last = (int(end) if end.strip() else None) if sep else first
+        except ValueError:
+            raise ValueError(f"Invalid page range: {part!r} (e.g. 1-3,10)") from None
+        if first < 1 or (last is not None and last < first):
+            raise ValueError(f"Invalid page range: {part!r} (pages start at 1)")
+        ranges.append((first, last))
+    if not ranges:
+        raise ValueError(f"Empty page selection: {spec!r}")
+    return _merge(ranges)
+
+
+def resolve_pages(
+    pages: Union[None, str, int, Iterable[Union[int, PageRange]]],
+) -> Optional[List[PageRange]]:
+    """Resolve a page selection to ranges; None selects every page.
+
+    Args:
+        pages: A spec for ``parse_pages``, a page number, or an iterable of
+            page numbers and (first, last) ranges
+    """
+    if pages is None:
+        return None
+    if isinstance(pages, str):
+        return parse_pages(pages)
+    if isinstance(pages, int):
+        pages = [pages]
+    ranges: List[PageRange] = [
+        (p, p) if isinstance(p, int) else (p[0], p[1]) for p in pages
+    ]
+    for first, last in ranges:
+        if first < 1 or (last is not None and last < first):
+            raise ValueError(f"Invalid page range: {first}-{last or ''}")
+    return _merge(ranges) if ranges else None
+
+
+def needs_page_count(ranges: Optional[List[PageRange]]) -> bool:
+    """Whether iterating the selection needs the document's page count."""
+    return ranges is None or any(last is None for _, last in ranges)
+
+
+def iter_pages(ranges: Optional[List[PageRange]], count: Optional[int] = None) -> Iterator[int]:
+    """Yield the selected page numbers in order.
+
+    Args:
+        ranges: Resolved ranges, or None for every page
+        count: Page count of the document; without it closed ranges are
+            yielded in full and the caller stops at the last page
+
+    Raises:
+        ValueError: If an open range (or every page) is selected without
+            ``count``
+    """
+    if ranges is None:
+        ranges = [(1, None)]
+    for first, last in ranges:
+        if count is not None:
+            last = count if last is None else min(last, count)
+        if last is None:
+            raise ValueError(f"The open page range {first}- needs the page count")
+        yield from range(first, last + 1)
+
+
+def format_pages(ranges: Optional[List[PageRange]]) -> Optional[str]:
+    """The spec of resolved ranges, e.g. ``1-3,10``, for metadata."""
+    if ranges is None:
+        return None
+    return ','.join(
+        str(first) if first == last else f"{first}-{last or ''}"
+        for first, last in ranges
+    )
+
+
+def _merge(ranges):
+    merged: List[PageRange] = []
+    for first, last in sorted(ranges, key=lambda r: r[0]):
+        if merged:
+            prev_first, prev_last = merged[-1]
+            if prev_last is None or first <= prev_last + 1:
+                if prev_last is not None:
+                    prev_last = None if last is None else max(prev_last, last)
+                merged[-1] = (prev_first, prev_last)
+                continue
+        merged.append((first, last))
+    return merged
@@ -0,0 +1,215 @@
+"""
+Blank and duplicate page triage before OCR.
+
+Scanned batches contain blank separator pages and repeated cover sheets that
+are not worth recognizing. ``PageTriage`` looks at a small grayscale copy of
+each page: a page whose ink coverage (share of dark pixels, from the
+histogram) is below a threshold is blank. A page whose perceptual
+difference hash is close to an earlier page's is a duplicate candidate.
+
+The hash, like any downscaled view, cannot tell apart two pages of the same
+template that differ in a few words (two invoices). Candidates are therefore
+verified on a block grid of the full page (``GRID_WIDTH`` blocks wide, about
+8 pixels per block at 300 DPI): a page is a duplicate only if no block
+differs by more than ``MAX_BLOCK_DIFFERENCE``, which tolerates scanner noise
+and re-encoding but not a changed digit. Its OCR results are then copied.
+One ``PageTriage`` can be shared by several documents to find duplicates
+across them.
+
+Requires NumPy (``pip install enclose[preprocess]``).
+"""
+
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from PIL import Image
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+# Pages are analysed at most this many pixels wide
+ANALYSIS_WIDTH = 512
+
+# Pixels darker than this count as ink
+INK_LEVEL = 160
+
+# Share of ink below which a page is blank (0.2%: specks and scanner noise)
+BLANK_COVERAGE = 0.002
+
+# Difference hash side (HASH_SIZE ** 2 bits) and the largest Hamming distance
+# between duplicate pages
+HASH_SIZE = 16
+MAX_HASH_DISTANCE = 8
+
+# Width of the verification grid in blocks, and the largest difference
+# (0-255) of any block mean between duplicates
+GRID_WIDTH = 320
+MAX_BLOCK_DIFFERENCE = 12
+
+# Pages remembered for duplicate detection
+MAX_PAGES = 5000
+
+# Result keys copied from the original page to its duplicates
+COPIED_KEYS = ('ocr_text', 'ocr_confidence', 'word_count', 'words')
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(
+            "Page triage requires NumPy: pip install numpy "
+            "(or pip install enclose[preprocess])"
+        )
+
+
+def _grayscale(image):
+    if image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info:
+        return _on_white(image.convert('RGBA'))
+    return image.convert('L')
+
+
+def _analysis_copy(gray):
+    if gray.width > ANALYSIS_WIDTH:
+        gray = gray.resize(
+            (ANALYSIS_WIDTH, max(1, round(gray.height * ANALYSIS_WIDTH / gray.width))),
+            Image.BILINEAR,
+        )
+    return gray
+
+
+def _on_white(image):
+    background = Image.new('RGB', image.size, 'white')
+    background.paste(image, mask=image.getchannel('A'))
+    return background.convert('L')
+
+
+def ink_coverage(gray: Image.Image, ink_level: int = INK_LEVEL) -> float:
+    """Share of pixels darker than ``ink_level`` in a grayscale image."""
+    _require_numpy()
+    histogram = np.bincount(np.asarray(gray, dtype=np.uint8).ravel(), minlength=256)
+    return float(histogram[:ink_level].sum() / max(1, histogram.sum()))
+
+
+def dhash(gray: Image.Image, size: int = HASH_SIZE) -> int:
+    """Difference hash: one bit per horizontally adjacent pixel pair."""
+    _require_numpy()
+    pixels = np.asarray(gray.resize((size + 1, size), Image.BILINEAR), dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+    return int(''.join('1' if bit else '0' for bit in bits), 2)
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return bin(a ^ b).count('1')
+
+
+def block_grid(gray: Image.Image, width: int = GRID_WIDTH) -> Image.Image:
+    """Block means of a full-resolution grayscale page, ``width`` blocks
+    wide; pages narrower than ``width`` pixels are kept at their size."""
+    if gray.width > width:
+        gray = gray.resize(
+            (width, max(1, round(gray.height * width / gray.width))), Image.BOX
+        )
+    return gray
+
+
+def max_block_difference(a: Image.Image, b: Image.Image) -> int:
+    """Largest absolute difference between two block grids (255 if their
+    sizes differ)."""
+    _require_numpy()
+    if a.size != b.size:
+        return 255
+    diff = np.abs(np.asarray(a, dtype=np.int16) - np.asarray(b, dtype=np.int16))
+    return int(diff.max())
+
+
+class PageTriage:
+    """Classifies pages as blank, duplicate or worth OCR."""
+
+    def __init__(self, blank_coverage=BLANK_COVERAGE, max_distance=MAX_HASH_DISTANCE,
+                 max_difference=MAX_BLOCK_DIFFERENCE, max_pages=MAX_PAGES):
+        """Create a triage step.
+
+        Args:
+            blank_coverage: Ink share below which a page is blank
+            max_distance: Largest hash distance between duplicates
+            max_difference: Largest block difference (0-255) between
+                duplicates; 0 accepts only identical grids
+            max_pages: Pages remembered for duplicate detection (oldest are
+                forgotten first); each keeps its compressed block grid
+        """
+        _require_numpy()
+        self.blank_coverage = blank_coverage
+        self.max_distance = max_distance
+        self.max_difference = max_difference
+        self.max_pages = max_pages
+        # key -> (hash, compressed block grid, result)
+        self._pages = OrderedDict()
+
+    def check(self, image: Image.Image, key: str) -> Dict[str, Any]:
+        """Classify a page.
+
+        Args:
+            image: Page image
+            key: Identifier of the page (e.g. its file), reported as
+                ``duplicate_of`` for later copies
+
+        Returns:
+            Dict with ``ink_coverage``, ``dhash`` (hex) and, for pages to
+            skip, ``skipped`` ('blank' or 'duplicate') and ``duplicate_of``
+        """
+        full = _grayscale(image)
+        gray = _analysis_copy(full)
+        coverage = ink_coverage(gray)
+        page_hash = dhash(gray)
+        decision = {
+            "ink_coverage": round(coverage, 6),
+            "dhash": f"{page_hash:0{HASH_SIZE * HASH_SIZE // 4}x}",
+        }
+        if coverage < self.blank_coverage:
+            decision["skipped"] = "blank"
+            return decision
+
+        grid = block_grid(full)
+        original = self._find_duplicate(page_hash, grid)
+        if original is not None:
+            decision["skipped"] = "duplicate"
+            decision["duplicate_of"] = original
+            return decision
+
+        self._pages[key] = (page_hash, _pack(grid), None)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        return decision
+
+    def record(self, key: str, result: Dict[str, Any]) -> None:
+        """Remember a page's OCR result for its duplicates."""
+        if key in self._pages:
+            page_hash, grid, _ = self._pages[key]
+            copied = {name: result[name] for name in COPIED_KEYS if name in result}
+            self._pages[key] = (page_hash, grid, copied)
+
+    def result(self, key: str) -> Optional[Dict[str, Any]]:
+        """The recorded OCR result of a page, if any."""
+        entry = self._pages.get(key)
+        return dict(entry[2]) if entry and entry[2] is not None else None
+
+    def _find_duplicate(self, page_hash, grid):
+        for key, (other_hash, other_grid, _) in self._pages.items():
+            if hamming(page_hash, other_hash) > self.max_distance:
+                continue
+            if max_block_difference(grid, _unpack(other_grid)) <= self.max_difference:
+                return key
+        return None
+
+
+def _pack(grid):
+    # Grids are mostly paper white and compress well
+    return grid.size, zlib.compress(grid.tobytes(), 1)
+
+
+def _unpack(packed):
+    size, data = packed
+    return Image.frombytes('L', size, zlib.decompress(data))
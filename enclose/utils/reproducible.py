@@ -0,0 +1,82 @@
+"""
+Reproducible output settings.
+
+In reproducible mode every converter replaces wall-clock timestamps with a
+fixed build date and derives document identifiers from the content, so
+identical inputs produce byte-identical files. The mode is enabled by the
+``SOURCE_DATE_EPOCH`` environment variable (which also sets the build date,
+see https://reproducible-builds.org/specs/source-date-epoch/), or explicitly
+with ``ENCLOSE_REPRODUCIBLE=1`` / ``set_reproducible()`` / ``--reproducible``.
+"""
+
+import hashlib
+import os
+from datetime import datetime, timezone
+
+SOURCE_DATE_EPOCH_ENV_VAR = 'SOURCE_DATE_EPOCH'
+REPRODUCIBLE_ENV_VAR = 'ENCLOSE_REPRODUCIBLE'
+
+# Build date used without SOURCE_DATE_EPOCH: 2000-01-01T00:00:00Z, the same
+# date ReportLab uses for its invariant mode
+DEFAULT_EPOCH = 946684800
+
+_TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+
+def set_reproducible(enabled=True):
+    """Turn reproducible mode on or off for this process and its workers.
+
+    The setting is stored in ``$ENCLOSE_REPRODUCIBLE`` so worker processes
+    inherit it.
+    """
+    os.environ[REPRODUCIBLE_ENV_VAR] = '1' if enabled else '0'
+
+
+def is_reproducible():
+    """Whether converters must produce byte-identical output."""
+    explicit = os.environ.get(REPRODUCIBLE_ENV_VAR)
+    if explicit:
+        return explicit.strip().lower() in _TRUE_VALUES
+    return bool(os.environ.get(SOURCE_DATE_EPOCH_ENV_VAR, '').strip())
+
+
+def source_date_epoch():
+    """Return the build date as a Unix timestamp.
+
+    Raises:
+        ValueError: If ``SOURCE_DATE_EPOCH`` is not an integer
+    """
+    value = os.environ.get(SOURCE_DATE_EPOCH_ENV_VAR, '').strip()
+    if not value:
+        return DEFAULT_EPOCH
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Invalid {SOURCE_DATE_EPOCH_ENV_VAR}: {value!r}")
+
+
+def build_datetime():
+    """Return the fixed build date in reproducible mode, the current time otherwise."""
+    if is_reproducible():
+        return datetime.fromtimestamp(source_date_epoch(), tz=timezone.utc)
+    return datetime.now()
+
+
+def build_timestamp():
+    """ISO 8601 timestamp for generated metadata (see ``build_datetime``)."""
+    return build_datetime().isoformat()
+
+
+def content_id(*parts):
+    """Derive a stable document identifier from content.
+
+    Args:
+        *parts: Strings or bytes the identifier depends on
+
+    Returns:
+        32 character hexadecimal identifier
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8') if isinstance(part, str) else part)
+    return digest.hexdigest()[:32]
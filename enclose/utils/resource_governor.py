@@ -0,0 +1,242 @@
+"""
+Process-wide CPU and memory budget shared by the pipeline stages.
+
+Every parallel stage used to pick its own concurrency: the chunked layout
+pool, the OCR workers, the rasterizer thread, and tesseract's own OpenMP
+threads on top. Together they ran far more busy threads than the machine
+has cores, and throughput dropped. ``ResourceGovernor`` owns one budget of
+CPU tokens (and optionally memory) for the process. A stage holds a token
+for each unit of work it runs: the layout of a chunk, the render of a page,
+the recognition of a page. Work waits when the budget is spent.
+
+Child tools are pinned to one thread per token through the usual thread
+count variables (``THREAD_ENV_VARS``), so a tesseract run counts as one CPU.
+Explicit settings in the environment are kept.
+
+The budget defaults to the CPUs this process may run on. It can be set
+with ``ENCLOSE_CPUS`` / ``ENCLOSE_MEMORY_MB`` or ``configure_governor``.
+``metrics()`` reports the utilization of the budget and the time each stage
+held or waited for tokens.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+CPUS_ENV_VAR = 'ENCLOSE_CPUS'
+MEMORY_ENV_VAR = 'ENCLOSE_MEMORY_MB'
+
+# Thread pools of child tools and native libraries: OpenMP (tesseract),
+# BLAS backends and numexpr
+THREAD_ENV_VARS = (
+    'OMP_THREAD_LIMIT',
+    'OMP_NUM_THREADS',
+    'OPENBLAS_NUM_THREADS',
+    'MKL_NUM_THREADS',
+    'NUMEXPR_NUM_THREADS',
+)
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def thread_env(threads: int = 1) -> Dict[str, str]:
+    """Thread count variables limiting child tools to ``threads`` threads."""
+    return {name: str(threads) for name in THREAD_ENV_VARS}
+
+
+def apply_thread_env(threads: int = 1) -> None:
+    """Set the thread count variables for this process and its children.
+
+    Variables already set are kept. Native libraries read them when they
+    load, so this runs before tesseract is imported or started.
+    """
+    for name, value in thread_env(threads).items():
+        os.environ.setdefault(name, value)
+
+
+class _StageStats:
+
+    __slots__ = ('tasks', 'in_use', 'peak', 'busy_seconds', 'wait_seconds')
+
+    def __init__(self):
+        self.tasks = 0
+        self.in_use = 0
+        self.peak = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+
+
+class ResourceGovernor:
+    """A budget of CPU tokens and memory handed out to stages."""
+
+    def __init__(self, cpus: Optional[int] = None, memory_mb: Optional[int] = None):
+        """Create a budget.
+
+        Args:
+            cpus: CPU tokens (default: the CPUs this process may use)
+            memory_mb: Memory budget in MB; None does not limit memory
+        """
+        cpus = available_cpus() if cpus is None else cpus
+        if cpus < 1:
+            raise ValueError(f"The CPU budget must be at least 1: {cpus}")
+        if memory_mb is not None and memory_mb <= 0:
+            raise ValueError(f"The memory budget must be positive: {memory_mb}")
+        self.cpus = cpus
+        self.memory_mb = memory_mb
+        self._free_cpus = cpus
+        self._free_memory = memory_mb
+        self._condition = threading.Condition()
+        self._stages: Dict[str, _StageStats] = {}
+        self._busy_seconds = 0.0
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def slot(self, stage: str, cpus: int = 1, memory_mb: float = 0) -> Iterator[int]:
+        """Hold ``cpus`` tokens (and ``memory_mb``) while the block runs.
+
+        Requests larger than the budget are cut to the budget, so they wait
+        for an idle machine instead of forever.
+
+        Yields:
+            The number of CPU tokens held
+        """
+        cpus = max(1, min(cpus, self.cpus))
+        if self.memory_mb is not None:
+            memory_mb = min(memory_mb, self.memory_mb)
+        self._acquire(stage, cpus, memory_mb, cpus)
+        start = time.perf_counter()
+        try:
+            yield cpus
+        finally:
+            self._release(stage, cpus, memory_mb, time.perf_counter() - start)
+
+    @contextmanager
+    def share(self, stage: str, wanted: int) -> Iterator[int]:
+        """Hold between one and ``wanted`` tokens, as many as are free.
+
+        Pools use this to size themselves to the budget left: it waits for
+        one token and takes up to ``wanted``.
+
+        Yields:
+            The number of CPU tokens held, i.e. the workers to run
+        """
+        wanted = max(1, min(wanted, self.cpus))
+        granted = self._acquire(stage, 1, 0, wanted)
+        start = time.perf_counter()
+        try:
+            yield granted
+        finally:
+            self._release(stage, granted, 0, time.perf_counter() - start)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Budget, tokens in use, utilization and per-stage token times.
+
+        ``utilization`` is the share of the CPU budget held by finished work
+        since the governor was created.
+        """
+        with self._condition:
+            elapsed = time.perf_counter() - self._started
+            busy = self._busy_seconds
+            stages = {
+                name: {
+                    "tasks": stats.tasks,
+                    "in_use": stats.in_use,
+                    "peak": stats.peak,
+                    "busy_seconds": round(stats.busy_seconds, 6),
+                    "wait_seconds": round(stats.wait_seconds, 6),
+                }
+                for name, stats in self._stages.items()
+            }
+            return {
+                "cpus": self.cpus,
+                "memory_mb": self.memory_mb,
+                "cpus_in_use": self.cpus - self._free_cpus,
+                "utilization": round(busy / (self.cpus * elapsed), 4) if elapsed else 0.0,
+                "stages": stages,
+            }
+
+    def _acquire(self, stage, cpus, memory_mb, wanted):
+        start = time.perf_counter()
+        with self._condition:
+            while not self._fits(cpus, memory_mb):
+                self._condition.wait()
+            granted = min(wanted, self._free_cpus)
+            self._free_cpus -= granted
+            if self._free_memory is not None:
+                self._free_memory -= memory_mb
+            stats = self._stages.setdefault(stage, _StageStats())
+            stats.tasks += 1
+            stats.in_use += granted
+            stats.peak = max(stats.peak, stats.in_use)
+            stats.wait_seconds += time.perf_counter() - start
+        return granted
+
+    def _release(self, stage, cpus, memory_mb, seconds):
+        with self._condition:
+            self._free_cpus += cpus
+            if self._free_memory is not None:
+                self._free_memory += memory_mb
+            stats = self._stages[stage]
+            stats.in_use -= cpus
+            stats.busy_seconds += cpus * seconds
+            self._busy_seconds += cpus * seconds
+            self._condition.notify_all()
+
+    def _fits(self, cpus, memory_mb):
+        if self._free_cpus < cpus:
+            return False
+        return self._free_memory is None or self._free_memory >= memory_mb
+
+
+_lock = threading.Lock()
+_governor: Optional[ResourceGovernor] = None
+
+
+def configure_governor(cpus: Optional[int] = None,
+                       memory_mb: Optional[int] = None) -> ResourceGovernor:
+    """Replace the process-wide governor with one of this budget.
+
+    The budget is also stored in ``$ENCLOSE_CPUS`` / ``$ENCLOSE_MEMORY_MB``
+    so worker processes inherit it.
+    """
+    global _governor
+    governor = ResourceGovernor(cpus, memory_mb)
+    with _lock:
+        _governor = governor
+    os.environ[CPUS_ENV_VAR] = str(governor.cpus)
+    if memory_mb is not None:
+        os.environ[MEMORY_ENV_VAR] = str(memory_mb)
+    return governor
+
+
+def get_governor() -> ResourceGovernor:
+    """Return the process-wide governor, created from the environment."""
+    global _governor
+    with _lock:
+        if _governor is None:
+            cpus = os.environ.get(CPUS_ENV_VAR)
+            memory_mb = os.environ.get(MEMORY_ENV_VAR)
+            _governor = ResourceGovernor(
+                int(cpus) if cpus else None, int(memory_mb) if memory_mb else None
+            )
+        return _governor
+
+
+def _reset_after_fork():
+    # A forked worker has its own CPUs to account for; the parent's tokens
+    # (and possibly its locked condition) must not leak into it
+    global _governor, _lock
+    _lock = threading.Lock()
+    _governor = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
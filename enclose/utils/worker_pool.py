@@ -0,0 +1,366 @@
+"""
+Supervised worker processes with timeouts, memory caps and recycling.
+
+One pathological input (a table that makes the layout explode, a noisy scan
+that hangs tesseract) can stall a worker forever, and leaks in long runs grow
+a worker's memory without bound. ``WorkerPool`` runs each task in a worker
+process it owns, one task per worker at a time, and enforces
+``WorkerLimits``:
+
+- ``timeout``: a task running longer is abandoned and its worker killed and
+  replaced; the caller gets a ``StageTimeout`` instead of a hang. Each
+  worker leads its own process group, and the whole group is killed, so
+  tools it started (a hanging ``tesseract``) die with it.
+- ``max_memory_mb``: a hard cap on each worker's address space
+  (``RLIMIT_AS``; Linux ignores ``RLIMIT_RSS``). A task that hits it fails
+  with ``WorkerMemoryExceeded`` and the worker is replaced.
+- ``max_tasks`` and ``recycle_mb``: a worker is replaced after that many
+  tasks, or once its resident memory after a task exceeds that many MB.
+
+Failures carry a ``kind`` and the stage, and ``as_dict`` gives the record
+stored in results and manifests.
+"""
+
+import atexit
+import multiprocessing
+import multiprocessing.util
+import os
+import signal
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Seconds a recycled worker gets to exit before it is killed
+_STOP_TIMEOUT = 1.0
+
+# Stages with a timeout of their own: a whole conversion, the layout of one
+# chunk, the OCR of one page
+TIMEOUT_STAGES = ('document', 'layout', 'ocr')
+
+
+@dataclass(frozen=True)
+class WorkerLimits:
+    """Limits applied to every task and worker of a pool.
+
+    Attributes:
+        timeout: Wall-clock seconds per task; None waits forever
+        max_memory_mb: Address space cap per worker process in MB
+        max_tasks: Replace a worker after this many tasks
+        recycle_mb: Replace a worker whose resident memory exceeds this
+            many MB after a task
+    """
+
+    timeout: Optional[float] = None
+    max_memory_mb: Optional[int] = None
+    max_tasks: Optional[int] = None
+    recycle_mb: Optional[int] = None
+
+    def __post_init__(self):
+        for name in ('timeout', 'max_memory_mb', 'max_tasks', 'recycle_mb'):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ValueError(f"Worker limit {name} must be positive: {value}")
+
+
+class WorkerFailure(Exception):
+    """A task that did not finish because of its worker, not its code."""
+
+    kind = 'failure'
+
+    def __init__(self, message, stage=None):
+        super().__init__(message)
+        self.stage = stage
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Structured description for results and manifests."""
+        return {"kind": self.kind, "stage": self.stage, "message": str(self)}
+
+
+class StageTimeout(WorkerFailure, TimeoutError):
+    """A task ran longer than the pool's timeout."""
+
+    kind = 'timeout'
+
+    def __init__(self, message, stage=None, timeout=None):
+        super().__init__(message, stage)
+        self.timeout = timeout
+
+    def as_dict(self):
+        return dict(super().as_dict(), timeout=self.timeout)
+
+
+class WorkerCrashed(WorkerFailure):
+    """The worker process died while running a task."""
+
+    kind = 'crashed'
+
+
+class WorkerMemoryExceeded(WorkerFailure, MemoryError):
+    """A task ran out of the worker's memory cap."""
+
+    kind = 'memory'
+
+
+def parse_timeouts(spec: str) -> Dict[str, float]:
+    """Parse per-stage timeouts: ``600`` (a whole conversion) or
+    ``document=600,layout=120,ocr=30``.
+
+    Raises:
+        ValueError: If a stage is unknown or a timeout is not positive
+    """
+    timeouts = {}
+    for part in spec.split(','):
+        if not part.strip():
+            continue
+        stage, sep, seconds = part.rpartition('=')
+        stage = stage.strip().lower() if sep else 'document'
+        if stage not in TIMEOUT_STAGES:
+            raise ValueError(
+                f"Unknown timeout stage: {stage} (choose from {', '.join(TIMEOUT_STAGES)})"
+            )
+        try:
+            timeouts[stage] = float(seconds)
+        except ValueError:
+            raise ValueError(f"Invalid timeout: {part!r}") from None
+        if timeouts[stage] <= 0:
+            raise ValueError(f"Timeouts must be positive: {part!r}")
+    return timeouts
+
+
+def resident_mb() -> float:
+    """Resident memory of this process in MB (peak where not on Linux)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        if resource is None:
+            return 0.0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak / 2 ** 20 if peak > 2 ** 32 else peak / 2 ** 10
+
+
+def _worker_main(conn, max_memory_mb):
+    if hasattr(os, 'setsid'):
+        # Child tools join this group and are killed with the worker
+        os.setsid()
+    if max_memory_mb and resource is not None:
+        limit = int(max_memory_mb * 2 ** 20)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+        fn, args, kwargs = task
+        try:
+            outcome = (True, fn(*args, **kwargs))
+        except BaseException as e:
+            outcome = (False, e)
+        try:
+            conn.send((outcome, resident_mb()))
+        except Exception as e:
+            # The result or exception does not pickle
+            conn.send(((False, RuntimeError(f"{outcome[1]!r} ({e})")), resident_mb()))
+
+
+class _Worker:
+
+    def __init__(self, context, limits):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child, limits.max_memory_mb)
+        )
+        self.process.start()
+        child.close()
+        self.tasks = 0
+
+    def stop(self, kill=False):
+        if not kill:
+            try:
+                self.conn.send(None)
+            except (OSError, ValueError):
+                pass
+            self.process.join(_STOP_TIMEOUT)
+        if kill:
+            self._kill_group()
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+    def _kill_group(self):
+        # The worker's children (e.g. tesseract) would outlive it
+        if not hasattr(os, 'killpg'):
+            return
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+
+class WorkerPool:
+    """A fixed number of supervised worker processes.
+
+    ``call`` runs one task and blocks its caller until it finishes, so a
+    pool serves as many calling threads as it has workers.
+    """
+
+    def __init__(self, workers: int = 1, limits: Optional[WorkerLimits] = None,
+                 mp_context: Any = None, stage: Optional[str] = None):
+        """Create a pool; workers start on ``start`` or on first use.
+
+        Args:
+            workers: Worker processes, i.e. tasks running at once
+            limits: Timeout, memory cap and recycling (default: none)
+            mp_context: ``multiprocessing`` context for the workers
+            stage: Stage name reported in failures, e.g. 'ocr'
+        """
+        if workers < 1:
+            raise ValueError("A worker pool needs at least one worker")
+        self.workers = workers
+        self.limits = limits or WorkerLimits()
+        self.stage = stage
+        self.stats = {"tasks": 0, "timeouts": 0, "crashes": 0, "recycled": 0}
+        self._context = mp_context or multiprocessing.get_context()
+        self._slots = threading.BoundedSemaphore(workers)
+        self._lock = threading.Lock()
+        self._idle: List[_Worker] = []
+        self._all = set()
+        self._closed = False
+        _pools.add(self)
+
+    def start(self):
+        """Start every worker now, not on the first task."""
+        with self._lock:
+            while len(self._all) < self.workers:
+                worker = _Worker(self._context, self.limits)
+                self._all.add(worker)
+                self._idle.append(worker)
+        return self
+
+    def call(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn(*args, **kwargs)`` in a worker and return its result.
+
+        Raises:
+            StageTimeout: If the task exceeds the timeout
+            WorkerMemoryExceeded: If the task exceeds the memory cap
+            WorkerCrashed: If the worker died
+            Exception: Whatever ``fn`` raised
+        """
+        with self._slots:
+            worker = self._take()
+            try:
+                worker.conn.send((fn, args, kwargs))
+                finished = worker.conn.poll(self.limits.timeout)
+                if finished:
+                    (ok, value), rss = worker.conn.recv()
+            except (EOFError, OSError):
+                self._discard(worker, 'crashes')
+                raise WorkerCrashed(
+                    f"Worker process died running {self._name(fn)} "
+                    f"(exit code {worker.process.exitcode})", self.stage,
+                ) from None
+            except BaseException:
+                # Interrupted, or the task does not pickle
+                self._discard(worker, 'crashes')
+                raise
+            if not finished:
+                self._discard(worker, 'timeouts')
+                raise StageTimeout(
+                    f"{self._name(fn)} timed out after {self.limits.timeout:g}s",
+                    self.stage, self.limits.timeout,
+                )
+            out_of_memory = not ok and isinstance(value, MemoryError)
+            self._release(worker, rss, out_of_memory)
+        if out_of_memory:
+            raise WorkerMemoryExceeded(
+                f"{self._name(fn)} exceeded the {self.limits.max_memory_mb} MB "
+                f"worker memory limit", self.stage,
+            ) from value
+        if not ok:
+            raise value
+        return value
+
+    def map(self, fn: Callable, items: Iterable[Any]) -> List[Any]:
+        """Run ``fn(item)`` for every item on all workers; results in order."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(self.workers) as threads:
+            return list(threads.map(lambda item: self.call(fn, item), items))
+
+    def close(self):
+        """Stop every worker; tasks still running fail with ``WorkerCrashed``."""
+        with self._lock:
+            self._closed = True
+            workers = list(self._all)
+            self._all.clear()
+            self._idle.clear()
+        for worker in workers:
+            worker.stop(kill=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _take(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The worker pool is closed")
+            if self._idle:
+                return self._idle.pop()
+            worker = _Worker(self._context, self.limits)
+            self._all.add(worker)
+            return worker
+
+    def _release(self, worker, rss, recycle=False):
+        # Return a worker to the pool after a task, or replace it
+        worker.tasks += 1
+        limits = self.limits
+        recycle = (
+            recycle
+            or (limits.max_tasks is not None and worker.tasks >= limits.max_tasks)
+            or (limits.recycle_mb is not None and rss >= limits.recycle_mb)
+        )
+        with self._lock:
+            self.stats["tasks"] += 1
+            if self._closed or worker not in self._all:
+                return
+            if not recycle:
+                self._idle.append(worker)
+                return
+            self._all.discard(worker)
+            self.stats["recycled"] += 1
+        worker.stop()
+
+    def _discard(self, worker, stat):
+        with self._lock:
+            self._all.discard(worker)
+            self.stats[stat] += 1
+        worker.stop(kill=True)
+
+    @staticmethod
+    def _name(fn):
+        return getattr(fn, '__qualname__', repr(fn))
+
+
+# Workers are not daemonic, so they may start processes of their own.
+# Open pools are closed at exit, before multiprocessing (whose exit handler
+# was registered first, on import) waits for its children.
+_pools = weakref.WeakSet()
+
+
+@atexit.register
+def _close_pools():
+    for pool in list(_pools):
+        pool.close()
@@ -35,7 +35,7 @@ def validate_conversion_pipeline(output_dir: str) -> Dict[str, Any]:
     }
     
     # Common file extensions to check
-    extensions = {'.pdf', '.svg', '.png', '.jpg', '.jpeg', '.html', '.md'}
+    extensions = {'.pdf', '.svg', '.svgz', '.png', '.jpg', '.jpeg', '.webp', '.html', '.md'}
     
     # Find all relevant files
     for ext in extensions:
@@ -8,6 +8,20 @@ from pathlib import Path
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def restore_thread_env():
+    """Undo the thread count variables OCR backends set for the process."""
+    from enclose.utils.resource_governor import THREAD_ENV_VARS
+
+    saved = {name: os.environ.get(name) for name in THREAD_ENV_VARS}
+    yield
+    for name, value in saved.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+
 @pytest.fixture(scope="session")
 def test_data_dir():
     """Return the path to the test data directory."""
@@ -43,3 +57,38 @@ def example_markdown_file(tmp_path, example_markdown):
     md_file = tmp_path / "test.md"
     md_file.write_text(example_markdown)
     return md_file
+
+
+@pytest.fixture
+def fake_tesseract(monkeypatch):
+    """Replace tesseract with a function of the image returning its words.
+
+    Words are (text, left, top, confidence) tuples, 10x8 pixels each; words
+    with the same top are on one line. Returns an installer that takes that
+    function and returns the list of images recognized.
+    """
+    from enclose.utils import ocr_backends
+
+    monkeypatch.setenv(ocr_backends.BACKEND_ENV_VAR, 'pytesseract')
+    images = []
+
+    def install(words_for):
+        def image_to_data(image, lang=None, output_type=None):
+            images.append(image)
+            words = list(words_for(image))
+            return {
+                'text': [w[0] for w in words],
+                'left': [w[1] for w in words],
+                'top': [w[2] for w in words],
+                'width': [10] * len(words),
+                'height': [8] * len(words),
+                'conf': [w[3] for w in words],
+                'block_num': [1] * len(words),
+                'par_num': [1] * len(words),
+                'line_num': [w[2] for w in words],
+            }
+
+        monkeypatch.setattr(ocr_backends.pytesseract, 'image_to_data', image_to_data)
+        return images
+
+    return install
@@ -0,0 +1,109 @@
+"""
+Tests for asset_cache module.
+"""
+import os
+import threading
+from functools import partial
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+
+import pytest
+
+from enclose.converters.asset_cache import AssetCache, find_asset_urls
+
+PNG_BYTES = (
+    b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x06'
+    b'\x00\x00\x00\x1f\x15\xc4\x89\x00\x00\x00\rIDATx\x9cc\xf8\x0f\x00\x00\x01\x01'
+    b'\x00\x05\x18\xd8N\x00\x00\x00\x00IEND\xaeB`\x82'
+)
+
+
+@pytest.fixture
+def asset_server(tmp_path):
+    """Serve a directory of assets over HTTP and count the requests."""
+    root = tmp_path / "site"
+    root.mkdir()
+    (root / "logo.png").write_bytes(PNG_BYTES)
+    (root / "banner.png").write_bytes(PNG_BYTES)
+    requests = []
+
+    class Handler(SimpleHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(self.path)
+            super().do_GET()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), partial(Handler, directory=str(root)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", requests
+    server.shutdown()
+    server.server_close()
+
+
+def test_find_asset_urls(tmp_path):
+    """Test that images and stylesheets are resolved against the base URL."""
+    fragment = (
+        '<p><img src="images/a.png"><img src="https://cdn.example.com/b.png">'
+        '<img src="data:image/png;base64,AAAA"><img src="images/a.png"></p>'
+        '<link rel="stylesheet" href="print.css"><link rel="icon" href="x.ico">'
+    )
+    urls = find_asset_urls(fragment, tmp_path)
+
+    assert urls == [
+        (tmp_path / "images" / "a.png").as_uri(),
+        "https://cdn.example.com/b.png",
+        (tmp_path / "print.css").as_uri(),
+    ]
+
+
+def test_remote_assets_are_cached_on_disk(asset_server, tmp_path):
+    """Test that a remote asset is fetched once and survives a new cache."""
+    base, requests = asset_server
+    cache = AssetCache(cache_dir=tmp_path / "cache")
+
+    first = cache.fetch(f"{base}/logo.png")
+    second = cache.fetch(f"{base}/logo.png")
+    assert first['string'] == second['string'] == PNG_BYTES
+    assert first['mime_type'] == 'image/png'
+    assert requests == ["/logo.png"]
+
+    # A new process-level cache reads the persistent copy
+    fresh = AssetCache(cache_dir=tmp_path / "cache")
+    assert fresh.fetch(f"{base}/logo.png")['string'] == PNG_BYTES
+    assert requests == ["/logo.png"]
+
+
+def test_prefetch_fetches_in_parallel(asset_server, tmp_path):
+    """Test that prefetching fills the cache and skips failing URLs."""
+    base, requests = asset_server
+    cache = AssetCache(cache_dir=tmp_path / "cache")
+    urls = [f"{base}/logo.png", f"{base}/banner.png", f"{base}/missing.png"]
+
+    assert cache.prefetch(urls + urls) == 2
+    assert sorted(requests) == ["/banner.png", "/logo.png", "/missing.png"]
+
+    cache.fetch(f"{base}/banner.png")
+    assert len(requests) == 3
+
+
+def test_local_files_invalidated_on_change(tmp_path):
+    """Test that changed local files are re-read and drop their decoded image."""
+    logo = tmp_path / "logo.png"
+    logo.write_bytes(PNG_BYTES)
+    url = logo.as_uri()
+    cache = AssetCache(cache_dir=tmp_path / "cache")
+
+    assert cache.fetch(url)['string'] == PNG_BYTES
+    cache.images[url] = object()
+    assert url in cache.images
+
+    logo.write_bytes(PNG_BYTES + b'\x00')
+    stat = logo.stat()
+    os.utime(logo, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert cache.fetch(url)['string'] == PNG_BYTES + b'\x00'
+    assert url not in cache.images
+    # Local files are never written to the persistent cache
+    assert not (tmp_path / "cache").exists()
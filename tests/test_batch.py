@@ -0,0 +1,146 @@
+"""
+Tests for resumable batch conversion.
+"""
+import time
+
+import pytest
+
+from enclose.core.batch import BatchRunner, RetryPolicy
+from enclose.utils.worker_pool import WorkerLimits
+
+
+class FakeProcessor:
+    """Writes the input's text upper-cased; fails on inputs named bad* and
+    hangs on inputs named slow*."""
+
+    supported_formats = ['md']
+
+    def __init__(self):
+        self.calls = []
+
+    def process(self, input_path, output_format, output_path, **options):
+        self.calls.append(input_path.name)
+        if input_path.name.startswith("bad"):
+            raise RuntimeError("layout exploded")
+        if input_path.name.startswith("slow"):
+            time.sleep(30)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(input_path.read_text().upper())
+        return str(output_path)
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    files = []
+    for name in ("a", "bad", "c"):
+        files.append(tmp_path / "in" / f"{name}.md")
+        files[-1].parent.mkdir(exist_ok=True)
+        files[-1].write_text(f"# {name}")
+    return files
+
+
+def test_resume_skips_intact_outputs(tmp_path, inputs):
+    """Test that a rerun converts only failed and damaged items."""
+    processor = FakeProcessor()
+    runner = BatchRunner(tmp_path / "out", retry=RetryPolicy(attempts=2, backoff=0),
+                         processor=processor)
+
+    summary = runner.run(inputs, 'pdf')
+    assert (summary['done'], summary['failed']) == (2, 1)
+    assert processor.calls == ["a.md", "bad.md", "bad.md", "c.md"]
+
+    # Damage one output without changing its size
+    (tmp_path / "out" / "c.pdf").write_text("# X")
+    processor.calls.clear()
+    summary = runner.run(inputs, 'pdf', resume=True)
+
+    assert processor.calls == ["bad.md", "c.md"]
+    assert summary['skipped'] == 1
+    assert (tmp_path / "out" / "c.pdf").read_text() == "# C"
+    statuses = [(r["input"].rsplit("/", 1)[-1], r["status"]) for r in runner.records()]
+    assert statuses[-2:] == [("bad.md", "quarantined"), ("c.md", "done")]
+
+    # Quarantined inputs are skipped from now on
+    processor.calls.clear()
+    summary = runner.run(inputs, 'pdf', resume=True)
+    assert processor.calls == []
+    assert (summary['skipped'], summary['quarantined']) == (2, 1)
+
+
+def test_resume_after_torn_manifest_line(tmp_path, inputs):
+    """Test that a record cut short by a crash does not break resuming."""
+    processor = FakeProcessor()
+    runner = BatchRunner(tmp_path / "out", processor=processor)
+    runner.run(inputs[:1], 'pdf')
+    with open(runner.manifest, 'a', encoding='utf-8') as f:
+        f.write('{"input": "a.m')
+
+    runner.run(inputs, 'pdf', resume=True)
+    processor.calls.clear()
+    summary = runner.run(inputs, 'pdf', resume=True)
+
+    assert processor.calls == ["bad.md"]
+    assert summary['skipped'] == 2
+    assert runner.manifest.read_text().count('"input": "a.m"') == 0
+
+
+def test_same_names_and_contents_get_own_outputs(tmp_path):
+    """Test inputs sharing a file name or their content."""
+    files = []
+    for name, text in (("a/report.md", "# a"), ("b/report.md", "# b"),
+                       ("b/x.md", "# same"), ("b/y.md", "# same")):
+        files.append(tmp_path / "in" / name)
+        files[-1].parent.mkdir(parents=True, exist_ok=True)
+        files[-1].write_text(text)
+    processor = FakeProcessor()
+    runner = BatchRunner(tmp_path / "out", processor=processor)
+
+    assert runner.run(files, 'pdf')['done'] == 4
+    out = tmp_path / "out"
+    assert (out / "a" / "report.pdf").read_text() == "# A"
+    assert (out / "b" / "report.pdf").read_text() == "# B"
+    assert (out / "b" / "y.pdf").read_text() == "# SAME"
+
+    # A rerun settles: nothing is converted again
+    processor.calls.clear()
+    assert runner.run(files, 'pdf', resume=True)['skipped'] == 4
+    assert processor.calls == []
+
+
+def test_quarantine_copies_input(tmp_path, inputs):
+    """Test quarantining after max_failures, and a fresh run."""
+    runner = BatchRunner(
+        tmp_path / "out", retry=RetryPolicy(attempts=1, max_failures=1),
+        quarantine_dir=tmp_path / "quarantine", processor=FakeProcessor(),
+    )
+    summary = runner.run(inputs[1:2], 'pdf')
+
+    assert summary['quarantined'] == 1
+    record = list(runner.records())[-1]
+    assert record["failures"] == 1
+    assert len(list((tmp_path / "quarantine").glob("*-bad.md"))) == 1
+    with open(record["quarantined_to"]) as f:
+        assert f.read() == "# bad"
+
+    # Without resume the manifest starts over
+    runner.run(inputs[:1], 'pdf')
+    assert [r["status"] for r in runner.records()] == ["done"]
+
+
+def test_timeout_recorded_as_failure(tmp_path, inputs):
+    """Test that a hanging conversion becomes a structured failure."""
+    slow = inputs[0].with_name("slow.md")
+    slow.write_text("# slow")
+    runner = BatchRunner(tmp_path / "out", retry=RetryPolicy(attempts=3, backoff=0),
+                         processor=FakeProcessor(), limits=WorkerLimits(timeout=0.5))
+
+    start = time.monotonic()
+    summary = runner.run([slow, inputs[2]], 'pdf')
+
+    assert time.monotonic() - start < 10
+    assert (summary['done'], summary['failed']) == (1, 1)
+    failed = [r for r in runner.records() if r["status"] == "failed"]
+    # Timeouts are not retried by default
+    assert len(failed) == 1
+    assert failed[0]["failure"]["kind"] == "timeout"
+    assert (tmp_path / "out" / "c.pdf").read_text() == "# C"
@@ -0,0 +1,45 @@
+"""
+Tests for blob_store module.
+"""
+import hashlib
+
+import pytest
+
+from enclose.utils.blob_store import BlobStore, file_digest
+
+
+def test_put_deduplicates(tmp_path):
+    """Test that identical content is stored once under its digest."""
+    store = BlobStore(tmp_path / "blobs")
+    digest = store.put(b"%PDF-1.7 same content")
+
+    assert digest == hashlib.sha256(b"%PDF-1.7 same content").hexdigest()
+    assert store.path(digest) == tmp_path / "blobs" / digest[:2] / digest
+    assert store.put(b"%PDF-1.7 same content") == digest
+    assert [p.name for p in (tmp_path / "blobs").rglob("*") if p.is_file()] == [digest]
+
+
+def test_put_file_and_get(tmp_path):
+    """Test storing a file and reading it back with verification."""
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"%PDF-1.7\n" + b"x" * 3_000_000)
+    store = BlobStore(tmp_path / "blobs")
+
+    digest = store.put_file(pdf)
+
+    assert digest == file_digest(pdf)
+    assert digest in store
+    assert store.get(digest) == pdf.read_bytes()
+
+
+def test_get_detects_corruption(tmp_path):
+    """Test that missing and corrupted blobs are reported."""
+    store = BlobStore(tmp_path / "blobs")
+    digest = store.put(b"original")
+    store.path(digest).write_bytes(b"tampered")
+
+    with pytest.raises(ValueError):
+        store.get(digest)
+    assert store.get(digest, verify=False) == b"tampered"
+    with pytest.raises(FileNotFoundError):
+        store.get("0" * 64)
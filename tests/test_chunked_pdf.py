@@ -0,0 +1,86 @@
+"""
+Tests for chunked_pdf module.
+"""
+import pytest
+
+from enclose.converters import chunked_pdf
+from enclose.converters.chunked_pdf import (
+    render_chunked_pdf,
+    split_markdown,
+    split_sections,
+)
+
+pypdf = pytest.importorskip("pypdf")
+
+LARGE_MARKDOWN = "Preface with a [link][home].\n\n" + "".join(
+    f"# Chapter {i}\n\n## Section {i}.1\n\nBody of chapter {i} with [a link][home].\n\n"
+    f"```\n# comment, not a heading\n```\n\n"
+    for i in range(1, 6)
+) + "[home]: https://example.com\n"
+
+
+def test_split_sections_at_top_level_headings():
+    """Sections start at '#' headings but never inside code fences."""
+    sections, references = split_sections(LARGE_MARKDOWN)
+    assert len(sections) == 6
+    assert sections[0].startswith("Preface")
+    assert all(s.startswith(f"# Chapter {i}") for i, s in enumerate(sections[1:], 1))
+    assert references == "[home]: https://example.com\n"
+
+    sections, _ = split_sections("# One\n#tag is text\n#\n# Two\n")
+    assert sections == ["# One\n#tag is text\n", "#\n", "# Two\n"]
+
+
+def test_split_markdown_groups_sections():
+    """Sections are grouped up to the chunk size and keep reference definitions."""
+    assert split_markdown(LARGE_MARKDOWN, chunk_chars=10 ** 6) == [LARGE_MARKDOWN]
+
+    chunks = split_markdown(LARGE_MARKDOWN, chunk_chars=200)
+    assert 1 < len(chunks) <= 6
+    assert all("[home]: https://example.com" in chunk for chunk in chunks)
+    assert "".join(chunks).count("# Chapter") == 5
+
+
+def test_chunked_pdf_keeps_outline_and_page_labels(temp_output_dir):
+    """Chunked rendering merges chunks with a continuous outline and page labels."""
+    md_file = temp_output_dir / "manual.md"
+    md_file.write_text(LARGE_MARKDOWN.replace("```\n# comment, not a heading\n```\n\n", ""))
+
+    # One chunk per section, so every chapter starts on its own page
+    pdf_path = render_chunked_pdf(md_file, temp_output_dir / "manual.pdf", workers=2,
+                                  chunk_chars=1, pdf_backend='reportlab')
+
+    reader = pypdf.PdfReader(str(pdf_path))
+    titles = [item.title for item in reader.outline if not isinstance(item, list)]
+    assert titles == [f"Chapter {i}" for i in range(1, 6)]
+    pages = [reader.get_destination_page_number(item)
+             for item in reader.outline if not isinstance(item, list)]
+    assert pages == list(range(1, 6))
+    assert reader.page_labels == [str(i) for i in range(1, len(reader.pages) + 1)]
+    assert sorted(p.name for p in temp_output_dir.iterdir()) == ["manual.md", "manual.pdf"]
+
+
+def test_one_backend_for_the_whole_document(monkeypatch, temp_output_dir):
+    """The backend is picked once, from the whole document, for every chunk."""
+    backends = []
+    decisions = []
+    select_pdf_backend = chunked_pdf.select_pdf_backend
+
+    def select(fragment, *args):
+        decisions.append(fragment)
+        return select_pdf_backend(fragment, *args)
+
+    def render_markdown_pdf(md_content, pdf_path, title, base_url, **options):
+        backends.append(options['pdf_backend'])
+        return pdf_path
+
+    monkeypatch.setattr(chunked_pdf, 'render_markdown_pdf', render_markdown_pdf)
+    monkeypatch.setattr(chunked_pdf, 'select_pdf_backend', select)
+    monkeypatch.setattr(chunked_pdf, 'merge_pdfs', lambda paths, output, title: output)
+    md_file = temp_output_dir / "mixed.md"
+    md_file.write_text("# Plain\n\nLatin text.\n\n# Греческий\n\nΑλφα.\n")
+
+    render_chunked_pdf(md_file, temp_output_dir / "mixed.pdf", workers=1, chunk_chars=1)
+
+    assert len(decisions) == 1
+    assert backends == ['weasyprint', 'weasyprint']
@@ -107,3 +107,16 @@ def test_cli_process_command(temp_output_dir, monkeypatch):
     finally:
         # Restore original sys.argv
         sys.argv = original_argv
+
+
+def test_cli_rejects_options_of_other_conversions(temp_output_dir, monkeypatch, capsys):
+    """Test that a flag the conversion does not use is an error."""
+    import enclose.__main__ as main
+
+    test_md = temp_output_dir / "test.md"
+    test_md.write_text("# Test Document\n")
+    monkeypatch.setattr(sys, "argv", ["enclose", str(test_md), "pdf", "--compress-level", "9"])
+
+    with pytest.raises(SystemExit):
+        main.main()
+    assert "--compress-level not used by md to pdf conversion" in capsys.readouterr().err
@@ -69,3 +69,39 @@ def test_full_processing_pipeline(example_markdown_file, temp_output_dir):
     # Save metadata
     metadata_path = processor.save_metadata(metadata3, "final_metadata.json")
     assert metadata_path.exists()
+
+
+def test_process_passes_each_conversion_its_own_options(temp_output_dir, monkeypatch):
+    """Test that options of other conversions are not passed on."""
+    from enclose.core import document_processor
+
+    calls = []
+    monkeypatch.setattr(document_processor, 'markdown_to_pdf',
+                        lambda *args, **options: calls.append(options) or "out.pdf")
+    md_file = temp_output_dir / "doc.md"
+    md_file.write_text("# Doc\n")
+
+    processor = DocumentProcessor(temp_output_dir)
+    processor.process(md_file, 'pdf', compresslevel=9, tile_size=512, theme=None)
+
+    assert calls == [{'theme': None}]
+    assert 'compresslevel' in processor.conversion_options('pdf', 'svgz')
+    assert processor.conversion_options('md', 'html') == ()
+
+
+def test_markdown_to_pdf_bundle_options(temp_output_dir, monkeypatch):
+    """Test that bundle options reach the renderer and empty bundles fail."""
+    from enclose.core import document_processor
+
+    calls = []
+    monkeypatch.setattr(document_processor, 'markdown_to_pdf_bundle',
+                        lambda *args, **options: calls.append(options) or "pack.pdf")
+    md_file = temp_output_dir / "doc.md"
+    md_file.write_text("# Doc\n")
+    processor = DocumentProcessor(temp_output_dir)
+
+    processor.markdown_to_pdf_bundle([md_file], theme="theme.css", pdf_backend='weasyprint')
+
+    assert calls == [{'theme': "theme.css", 'pdf_backend': 'weasyprint'}]
+    with pytest.raises(ValueError):
+        processor.markdown_to_pdf_bundle([])
@@ -3,7 +3,8 @@ Tests for file_utils module.
 """
 import pytest
 from pathlib import Path
-from enclose.utils.file_utils import search_svg_files
+from enclose.utils.file_utils import open_svg, search_svg_files
+from enclose.utils.file_validation import validate_file_signature
 
 
 def test_search_svg_files(example_markdown_file, temp_output_dir):
@@ -29,3 +30,19 @@ def test_search_svg_files(example_markdown_file, temp_output_dir):
     assert "modified" in file_info
     assert file_info["has_metadata"] is False
     assert file_info["has_pdf_data"] is False
+
+
+def test_svgz_files_are_read_transparently(temp_output_dir):
+    """Test that .svgz files are written compressed and found by search."""
+    svgz_file = temp_output_dir / "test.svgz"
+    with open_svg(svgz_file, 'w') as f:
+        f.write('<svg xmlns="http://www.w3.org/2000/svg"><metadata/></svg>')
+
+    assert svgz_file.read_bytes()[:2] == b'\x1f\x8b'
+    with open_svg(svgz_file) as f:
+        assert f.read().startswith('<svg')
+
+    found_files = search_svg_files(temp_output_dir)
+    assert [f["path"] for f in found_files] == [str(svgz_file)]
+    assert found_files[0]["has_metadata"] is True
+    assert validate_file_signature(svgz_file, 'svgz')[0] is True
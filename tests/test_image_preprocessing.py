@@ -0,0 +1,102 @@
+"""
+Tests for image_preprocessing module.
+"""
+import pytest
+from PIL import Image, ImageDraw
+
+from enclose.utils.image_preprocessing import (
+    PreprocessOptions,
+    adaptive_threshold,
+    content_box,
+    estimate_skew,
+    preprocess,
+    resolve_options,
+    to_grayscale,
+)
+from enclose.utils.ocr_processor import process_ocr
+
+np = pytest.importorskip("numpy")
+
+
+def text_page(angle=0.0, size=(800, 1000)):
+    """Draw a page of dark text-like bars, optionally rotated."""
+    page = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(page)
+    for y in range(150, size[1] - 150, 30):
+        draw.rectangle((100, y, size[0] - 100, y + 10), fill=(40, 40, 40))
+    if angle:
+        page = page.rotate(angle, expand=True, fillcolor='white')
+    return page
+
+
+def test_adaptive_threshold_matches_local_mean():
+    """Test the summed-area threshold against a direct computation."""
+    gray = np.random.RandomState(0).randint(0, 256, (30, 40)).astype(np.uint8)
+    binary = adaptive_threshold(gray, block_size=7, offset=5)
+
+    expected = np.empty_like(gray)
+    for y in range(gray.shape[0]):
+        for x in range(gray.shape[1]):
+            window = gray[max(0, y - 3):y + 4, max(0, x - 3):x + 4]
+            expected[y, x] = 0 if gray[y, x] < window.mean() - 5 else 255
+    assert (binary == expected).all()
+
+
+def test_to_grayscale_flattens_transparency():
+    """Test that transparent pixels become white, not black."""
+    image = Image.new('RGBA', (2, 1), (0, 0, 0, 0))
+    image.putpixel((1, 0), (255, 0, 0, 255))
+
+    assert to_grayscale(image).tolist() == [[255, 76]]
+
+
+def test_estimate_skew_and_content_box():
+    """Test that rotation is detected and the border located."""
+    assert estimate_skew(to_grayscale(text_page(3))) == pytest.approx(-3, abs=0.3)
+    assert estimate_skew(to_grayscale(text_page())) == pytest.approx(0, abs=0.2)
+
+    box = content_box(to_grayscale(text_page()), margin=5)
+    assert box[0] == 95 and box[2] == 706
+
+
+def test_preprocess_pipeline():
+    """Test that the page is rescaled, deskewed, cropped and binarized."""
+    page = text_page(2)
+    page.info['dpi'] = (150, 150)
+
+    image, stats = preprocess(page, PreprocessOptions(target_dpi=300))
+
+    assert image.mode == 'L'
+    assert set(np.unique(np.asarray(image))) <= {0, 255}
+    assert stats['scale'] == 2
+    assert stats['skew_angle'] == pytest.approx(-2, abs=0.3)
+    assert 'crop_box' in stats
+    assert image.info['dpi'] == (300, 300)
+
+
+def test_resolve_options():
+    """Test the per-job preprocess setting."""
+    assert resolve_options(None) is None and resolve_options(False) is None
+    assert resolve_options(True) == PreprocessOptions()
+    assert resolve_options({'deskew': False}).deskew is False
+
+
+def test_process_ocr_reports_preprocessing(fake_tesseract, tmp_path):
+    """Test that preprocessing stats and the baseline land in the metadata."""
+    images = fake_tesseract(
+        lambda image: [("some", 0, 0, 95 if image.mode == 'L' else 60), ("words", 20, 0, 95)]
+    )
+    page_file = tmp_path / "page.png"
+    text_page().save(page_file)
+
+    metadata = process_ocr([str(page_file)], {}, preprocess={'compare': True})
+
+    page = metadata['ocr_results'][0]
+    assert page['ocr_text'] == "some words"
+    assert page['ocr_confidence'] == 95
+    assert page['preprocessing']['baseline']['ocr_confidence'] == 77.5
+    assert sorted(image.mode for image in images) == ['L', 'RGB']
+    summary = metadata['preprocessing']
+    assert summary['pages'] == 1
+    assert summary['confidence_gain'] == 17.5
+    assert summary['options']['compare'] is True
@@ -0,0 +1,99 @@
+"""
+Tests for markdown_backends module.
+
+The optional backends must render tables, fenced code and highlighting the
+same way as the default Python-Markdown backend.
+"""
+import pytest
+from bs4 import BeautifulSoup
+
+from enclose.converters.markdown_backends import (
+    DEFAULT_BACKEND,
+    PythonMarkdownBackend,
+    available_backends,
+    get_markdown_backend,
+)
+
+FAST_BACKENDS = [name for name in available_backends() if name != DEFAULT_BACKEND]
+
+TABLE_MARKDOWN = """| Item | Quantity | Amount |
+|:-----|:--------:|-------:|
+| Web **Development** | 40 hrs | $4,000 |
+| Design `Services` | 20 hrs | $1,600 |
+"""
+
+FENCED_MARKDOWN = """Some text.
+
+```python
+def total(items):
+    return sum(item.amount for item in items)
+```
+
+```
+plain block
+```
+"""
+
+
+def _table_cells(html):
+    """Return table cells as (tag, alignment, inner HTML) rows."""
+    soup = BeautifulSoup(html, 'html.parser')
+    rows = []
+    for tr in soup.find_all('tr'):
+        row = []
+        for cell in tr.find_all(['th', 'td']):
+            align = cell.get('style', '').replace(' ', '').rstrip(';')
+            row.append((cell.name, align, cell.decode_contents().strip()))
+        rows.append(row)
+    return rows
+
+
+def _code_blocks(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    return [str(block) for block in soup.find_all(class_='codehilite')]
+
+
+def test_default_backend(monkeypatch):
+    """Test that Python-Markdown is the default backend."""
+    monkeypatch.delenv('ENCLOSE_MARKDOWN_BACKEND', raising=False)
+    assert isinstance(get_markdown_backend(), PythonMarkdownBackend)
+
+
+def test_backend_from_environment(monkeypatch):
+    """Test selecting the backend through ENCLOSE_MARKDOWN_BACKEND."""
+    monkeypatch.setenv('ENCLOSE_MARKDOWN_BACKEND', 'python-markdown')
+    assert get_markdown_backend().name == 'python-markdown'
+
+    monkeypatch.setenv('ENCLOSE_MARKDOWN_BACKEND', 'no-such-backend')
+    with pytest.raises(ValueError):
+        get_markdown_backend()
+
+
+@pytest.mark.parametrize('name', FAST_BACKENDS)
+def test_table_parity(name):
+    """Test that tables match the default backend, including alignment."""
+    expected = _table_cells(get_markdown_backend(DEFAULT_BACKEND).convert(TABLE_MARKDOWN))
+    actual = _table_cells(get_markdown_backend(name).convert(TABLE_MARKDOWN))
+
+    assert len(expected) == 3
+    assert actual == expected
+
+
+@pytest.mark.parametrize('name', FAST_BACKENDS)
+def test_fenced_code_parity(name):
+    """Test that fenced code blocks are highlighted identically."""
+    expected = _code_blocks(get_markdown_backend(DEFAULT_BACKEND).convert(FENCED_MARKDOWN))
+    actual = _code_blocks(get_markdown_backend(name).convert(FENCED_MARKDOWN))
+
+    assert len(expected) == 2
+    assert actual == expected
+
+
+@pytest.mark.parametrize('name', FAST_BACKENDS)
+def test_highlighting_parity(name):
+    """Test that syntax highlighting spans are produced by every backend."""
+    pytest.importorskip('pygments')
+    html = get_markdown_backend(name).convert(FENCED_MARKDOWN)
+
+    assert '<div class="codehilite">' in html
+    assert '<span class="k">def</span>' in html
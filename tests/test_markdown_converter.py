@@ -3,7 +3,14 @@ Tests for markdown_converter module.
 """
 import pytest
 from pathlib import Path
-from enclose.converters.markdown_converter import create_example_markdown, markdown_to_pdf
+from enclose.converters.markdown_converter import (
+    MarkdownRenderer,
+    bundle_section,
+    create_example_markdown,
+    markdown_to_html,
+    markdown_to_pdf,
+    markdown_to_pdf_bundle,
+)
 
 
 def test_create_example_markdown(temp_output_dir):
@@ -31,3 +38,83 @@ def test_markdown_to_pdf(example_markdown_file, temp_output_dir):
     assert pdf_file.exists()
     assert pdf_file.suffix == ".pdf"
     assert pdf_file.stat().st_size > 0  # File is not empty
+
+
+def test_markdown_renderer_matches_markdown_to_html(example_markdown_file, temp_output_dir):
+    """Test that a reused renderer produces the same page as markdown_to_html."""
+    html_path = markdown_to_html(example_markdown_file, temp_output_dir)
+
+    renderer = MarkdownRenderer()
+    page = renderer.render(example_markdown_file.read_text(), example_markdown_file.stem)
+
+    assert page == html_path.read_text(encoding='utf-8')
+    assert "<title>test</title>" in page
+    assert "<h1>Test Document</h1>" in page
+
+
+def test_markdown_renderer_resets_between_documents():
+    """Test that reference definitions do not leak into the next document."""
+    renderer = MarkdownRenderer()
+
+    first = renderer.convert("[link][ref]\n\n[ref]: https://example.com")
+    second = renderer.convert("[link][ref]")
+
+    assert 'href="https://example.com"' in first
+    assert "href" not in second
+
+
+def test_markdown_renderer_render_many(tmp_path, temp_output_dir):
+    """Test that render_many streams one HTML file per input, in order."""
+    md_files = []
+    for i in range(3):
+        md_file = tmp_path / f"doc_{i}.md"
+        md_file.write_text(f"# Document {i}")
+        md_files.append(md_file)
+
+    results = MarkdownRenderer().render_many(md_files, temp_output_dir)
+
+    # A generator: nothing is rendered until it is consumed
+    assert not list(temp_output_dir.glob("*.html"))
+    html_paths = list(results)
+    assert [p.name for p in html_paths] == ["doc_0.html", "doc_1.html", "doc_2.html"]
+    for i, html_path in enumerate(html_paths):
+        assert f"<h1>Document {i}</h1>" in html_path.read_text()
+
+
+def test_bundle_section_resolves_relative_links(tmp_path):
+    """Test that a bundled document keeps its own base directory."""
+    section = bundle_section(
+        '<p><img src="images/logo.png"> <a href="#total">Total</a></p>',
+        "statement", tmp_path,
+    )
+
+    assert section.startswith('<section class="bundle-document" data-title="statement">')
+    assert f'src="{(tmp_path / "images" / "logo.png").as_uri()}"' in section
+    assert 'href="#total"' in section
+
+
+def test_markdown_to_pdf_bundle(tmp_path, temp_output_dir):
+    """Test rendering several markdown files into one PDF."""
+    md_files = []
+    for i in range(3):
+        md_file = tmp_path / f"statement_{i}.md"
+        md_file.write_text(f"# Statement {i}\n\nBalance: {i * 100}")
+        md_files.append(md_file)
+
+    pdf_path = markdown_to_pdf_bundle(md_files, temp_output_dir, "pack")
+
+    assert pdf_path == temp_output_dir / "pack.pdf"
+    assert pdf_path.read_bytes().startswith(b'%PDF')
+    assert [p.name for p in temp_output_dir.iterdir()] == ["pack.pdf"]
+
+
+def test_markdown_to_pdf_bundle_rejects_bad_input(tmp_path, temp_output_dir):
+    """Test that empty bundles and the ReportLab backend are refused."""
+    md_file = tmp_path / "statement.md"
+    md_file.write_text("# Statement\n")
+
+    with pytest.raises(ValueError, match="at least one"):
+        markdown_to_pdf_bundle([], temp_output_dir)
+    with pytest.raises(ValueError, match="WeasyPrint"):
+        markdown_to_pdf_bundle([md_file], temp_output_dir, pdf_backend='reportlab')
+    assert not any(temp_output_dir.iterdir())
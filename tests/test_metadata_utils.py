@@ -3,7 +3,7 @@ Tests for metadata_utils module.
 """
 import json
 from pathlib import Path
-from enclose.utils.metadata_utils import save_metadata
+from enclose.utils.metadata_utils import JSONLWriter, read_jsonl, save_metadata
 
 
 def test_save_metadata(temp_output_dir):
@@ -32,3 +32,25 @@ def test_save_metadata(temp_output_dir):
         loaded_metadata = json.load(f)
     
     assert loaded_metadata == test_metadata
+
+
+def test_jsonl_writer_streams_records(tmp_path):
+    """Test that each record is readable as soon as it is written."""
+    jsonl_path = tmp_path / "out" / "results.jsonl"
+    with JSONLWriter(jsonl_path) as writer:
+        writer.write({"page": 1, "file": Path("a.png")})
+        assert list(read_jsonl(jsonl_path)) == [{"page": 1, "file": "a.png"}]
+        writer.write({"page": 2, "ocr_text": "zürich"})
+    assert writer.count == 2
+
+    # A line cut short by a crash is skipped
+    with open(jsonl_path, 'a') as f:
+        f.write('{"page": 3, "ocr_')
+    assert [r["page"] for r in read_jsonl(jsonl_path)] == [1, 2]
+
+    # Appending again drops the fragment first; undecodable lines are skipped
+    with JSONLWriter(jsonl_path) as writer:
+        writer.write({"page": 3})
+    with open(jsonl_path, 'a') as f:
+        f.write('{"page": \n')
+    assert [r["page"] for r in read_jsonl(jsonl_path)] == [1, 2, 3]
@@ -0,0 +1,164 @@
+"""
+Tests for ocr_backends module.
+"""
+import os
+import subprocess
+import sys
+import threading
+import types
+
+import pytest
+from PIL import Image
+
+from enclose.utils import ocr_backends
+from enclose.utils.ocr_backends import (
+    PytesseractBackend,
+    TesserocrBackend,
+    get_ocr_backend,
+    resolve_backend_name,
+)
+from enclose.utils.resource_governor import THREAD_ENV_VARS
+
+
+class FakeWord:
+    def __init__(self, text, box, conf, line_start):
+        self.text, self.box, self.conf, self.line_start = text, box, conf, line_start
+
+    def GetUTF8Text(self, level):
+        return self.text
+
+    def BoundingBox(self, level):
+        return self.box
+
+    def Confidence(self, level):
+        return self.conf
+
+    def IsAtBeginningOf(self, level):
+        return self.line_start
+
+
+class FakeAPI:
+    """Stand-in for tesserocr.PyTessBaseAPI that counts engines."""
+
+    created = []
+
+    def __init__(self, lang):
+        self.lang = lang
+        self.images = 0
+        self.ended = False
+        FakeAPI.created.append(self)
+
+    def SetImage(self, image):
+        self.images += 1
+
+    def Recognize(self):
+        pass
+
+    def GetIterator(self):
+        return [
+            FakeWord("Hello", (0, 0, 40, 10), 90.0, True),
+            FakeWord("world", (50, 0, 90, 10), 80.0, False),
+            FakeWord("Bye", (0, 20, 30, 30), 70.0, True),
+        ]
+
+    def Clear(self):
+        pass
+
+    def End(self):
+        self.ended = True
+
+
+@pytest.fixture
+def fake_tesserocr(monkeypatch):
+    FakeAPI.created = []
+    module = types.SimpleNamespace(
+        PyTessBaseAPI=FakeAPI,
+        RIL=types.SimpleNamespace(WORD='word', TEXTLINE='line'),
+        iterate_level=lambda iterator, level: iterator,
+    )
+    monkeypatch.setattr(ocr_backends, 'tesserocr', module)
+    return module
+
+
+def test_resolve_backend_name(monkeypatch, fake_tesserocr):
+    """Test auto selection, the environment variable and unknown names."""
+    monkeypatch.delenv(ocr_backends.BACKEND_ENV_VAR, raising=False)
+    assert resolve_backend_name() == 'tesserocr'
+    monkeypatch.setattr(ocr_backends, 'tesserocr', None)
+    assert resolve_backend_name('auto') == 'pytesseract'
+
+    monkeypatch.setenv(ocr_backends.BACKEND_ENV_VAR, 'PYTESSERACT')
+    assert resolve_backend_name() == 'pytesseract'
+    with pytest.raises(ValueError):
+        resolve_backend_name('easyocr')
+    with pytest.raises(ImportError):
+        TesserocrBackend()
+
+
+def test_backend_without_recognize_words_fails_on_creation():
+    """Test that the interface cannot be created without its engine call."""
+    class Incomplete(ocr_backends.OCRBackend):
+        name = 'incomplete'
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_get_ocr_backend_is_shared():
+    """Test that backends are created once per name and language."""
+    backend = get_ocr_backend('pytesseract')
+    assert get_ocr_backend('pytesseract') is backend
+    assert get_ocr_backend('pytesseract', lang='deu') is not backend
+    assert get_ocr_backend(backend) is backend
+
+
+def test_pytesseract_backend_runs_tesseract_once(fake_tesseract):
+    """Test that text and confidence come from a single word table."""
+    images = fake_tesseract(lambda image: [
+        ("Hello", 0, 0, 90), ("world", 20, 0, 80), ("", 0, 0, -1), ("Bye", 0, 20, 70),
+    ])
+
+    text, confidence = PytesseractBackend().recognize(Image.new('L', (10, 10)))
+
+    assert text == "Hello world\nBye"
+    assert confidence == 80
+    assert len(images) == 1
+
+
+def test_tesserocr_backend_reuses_engine_per_thread(fake_tesserocr):
+    """Test that each thread initializes one engine and reuses it."""
+    backend = TesserocrBackend()
+    image = Image.new('L', (10, 10))
+
+    text, confidence = backend.recognize(image)
+    backend.recognize(image)
+    assert text == "Hello world\nBye"
+    assert confidence == 80
+    assert backend.words(image)[1] == {
+        "text": "world", "left": 50, "top": 0, "width": 40, "height": 10, "conf": 80.0,
+    }
+
+    thread = threading.Thread(target=backend.recognize, args=(image,))
+    thread.start()
+    thread.join()
+
+    assert len(FakeAPI.created) == 2
+    assert FakeAPI.created[0].images == 3
+    backend.close()
+    assert all(api.ended for api in FakeAPI.created)
+
+
+def test_thread_limits_apply_when_a_backend_starts():
+    """Test that importing the backends leaves the thread settings alone."""
+    code = (
+        "import os\n"
+        "from enclose.utils import ocr_backends\n"
+        "print(os.environ.get('OMP_THREAD_LIMIT'))\n"
+        "ocr_backends.PytesseractBackend()\n"
+        "print(os.environ.get('OMP_THREAD_LIMIT'))\n"
+    )
+    env = {k: v for k, v in os.environ.items() if k not in THREAD_ENV_VARS}
+    output = subprocess.run([sys.executable, "-c", code], env=env, check=True,
+                            capture_output=True, text=True).stdout
+
+    assert output.split() == ["None", "1"]
@@ -37,3 +37,60 @@ def test_process_ocr(example_markdown_file, temp_output_dir):
         if page["ocr_text"]:  # Only check if OCR found text
             assert page["word_count"] > 0
             assert 0 <= page["ocr_confidence"] <= 100
+
+
+def test_ocr_tiles_stitches_words(fake_tesseract):
+    """Test that tile words are mapped to the page and deduplicated."""
+    from PIL import Image
+    from enclose.utils.ocr_processor import ocr_tiles
+
+    # Words per tile, in tile coordinates; "world" lies in the overlap
+    tile_words = {
+        0: [("Hello", 10, 10, 90), ("world", 85, 12, 90), ("", 0, 0, -1)],
+        80: [("world", 5, 12, 90), ("again", 40, 10, 90), ("Bye", -70, 60, 90)],
+    }
+    fake_tesseract(lambda image: tile_words[image.info['x']])
+
+    def tiles():
+        for x in (0, 80):
+            image = Image.new('L', (100, 100))
+            image.info['x'] = x
+            yield {'x': x, 'y': 0, 'width': 100, 'height': 100}, image
+
+    result = ocr_tiles(tiles(), 180, 100, overlap=20)
+
+    assert result['ocr_text'] == "Hello world again"
+    assert result['word_count'] == 3
+    assert [w['left'] for w in result['words'] if w['text'] == 'world'] == [85]
+    assert result['ocr_confidence'] == 90
+
+
+def test_results_stream_page_by_page(fake_tesseract, tmp_path):
+    """Test that each page is written and reported before the next is read."""
+    from PIL import Image
+    from enclose.utils.metadata_utils import read_jsonl
+    from enclose.utils.ocr_processor import iter_ocr
+
+    files = []
+    for shade in (1, 2, 3):
+        files.append(tmp_path / f"page_{shade}.png")
+        Image.new('L', (20, 20), shade).save(files[-1])
+    sink = tmp_path / "ocr.jsonl"
+    streamed = []
+
+    def words(image):
+        # Every earlier page is already in the sink
+        streamed.append(len(list(read_jsonl(sink))) if sink.exists() else 0)
+        return [(f"p{image.getpixel((0, 0))}", 0, 0, 90)]
+
+    fake_tesseract(words)
+    seen = []
+    metadata = process_ocr(files, {}, sink=sink, on_page=seen.append)
+
+    assert streamed == [0, 1, 2]
+    assert [r["ocr_text"] for r in read_jsonl(sink)] == ["p1", "p2", "p3"]
+    assert seen == metadata["ocr_results"]
+    assert metadata["ocr_results_file"] == str(sink)
+
+    pages = iter_ocr(files)
+    assert next(pages)["ocr_text"] == "p1"
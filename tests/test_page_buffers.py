@@ -0,0 +1,98 @@
+"""
+Tests for page_buffers module.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from PIL import Image
+
+pytest.importorskip("numpy")
+
+from enclose.utils.page_buffers import (  # noqa: E402
+    PageBufferPool,
+    open_page,
+    page_array,
+    stored_mode,
+)
+
+
+def segments():
+    return {name for name in os.listdir('/dev/shm') if name.startswith('psm_')}
+
+
+def first_pixel(ref):
+    image = open_page(ref)
+    return image.mode, image.getpixel((0, 0)), image.info.get('dpi')
+
+
+def crash(ref):
+    page_array(ref)
+    os._exit(1)
+
+
+def test_pages_are_shared_without_copies():
+    """Test that views read and write the segment itself."""
+    with PageBufferPool(1) as pool:
+        image = Image.new('RGB', (30, 20), (10, 20, 30))
+        image.info['dpi'] = (300, 300)
+        ref = pool.put(image)
+        assert ref.mode == 'RGBX' and ref.dpi == (300, 300)
+
+        array = page_array(ref)
+        assert array.shape == (20, 30, 4)
+        assert tuple(array[0, 0]) == (10, 20, 30, 255)
+        array[0, 0, 0] = 99
+        assert pool.image(ref).getpixel((0, 0))[0] == 99
+        del array
+
+
+def test_stored_modes():
+    """Test the modes pages are stored in."""
+    assert stored_mode(Image.new('1', (1, 1))) == 'L'
+    assert stored_mode(Image.new('LA', (1, 1))) == 'RGBA'
+    assert stored_mode(Image.new('P', (1, 1))) == 'RGBX'
+
+
+def test_slots_are_recycled_and_grown():
+    """Test blocking on a full pool, reuse and growth of segments."""
+    with PageBufferPool(1) as pool:
+        small = pool.put(Image.new('L', (10, 10), 1))
+        assert pool.put(Image.new('L', (10, 10)), timeout=0.01) is None
+        pool.release(small)
+
+        same = pool.put(Image.new('L', (5, 5), 2))
+        assert same.name == small.name
+        pool.release(same)
+
+        large = pool.put(Image.new('L', (100, 100), 3))
+        assert large.name != small.name
+        assert pool.in_use == 1
+        assert pool.image(large).getpixel((99, 99)) == 3
+
+
+@pytest.mark.skipif(not os.path.isdir('/dev/shm'), reason="needs POSIX shared memory")
+def test_worker_processes_and_crashes_leak_nothing():
+    """Test reading pages in workers and cleanup after a worker dies."""
+    before = segments()
+    context = multiprocessing.get_context('spawn')
+    pool = PageBufferPool(2)
+    with ProcessPoolExecutor(1, mp_context=context) as executor:
+        image = Image.new('L', (40, 30), 7)
+        image.info['dpi'] = (150, 150)
+        ref = pool.put(image)
+        assert executor.submit(first_pixel, ref).result() == ('L', 7, (150, 150))
+        pool.release(ref)
+
+    with ProcessPoolExecutor(1, mp_context=context) as executor:
+        ref = pool.put(Image.new('RGB', (40, 30)))
+        with pytest.raises(Exception):
+            executor.submit(crash, ref).result()
+        pool.release(ref)
+
+    assert pool.in_use == 0
+    pool.close()
+    assert segments() == before
+    with pytest.raises(ValueError):
+        pool.put(Image.new('L', (1, 1)))
@@ -0,0 +1,39 @@
+"""
+Tests for page_ranges module.
+"""
+import pytest
+
+from enclose.utils.page_ranges import (
+    format_pages,
+    iter_pages,
+    needs_page_count,
+    parse_pages,
+    resolve_pages,
+)
+
+
+def test_parse_pages_merges_ranges():
+    """Test that ranges are sorted and overlapping ones merged."""
+    assert parse_pages("10, 1-3,2-4") == [(1, 4), (10, 10)]
+    assert parse_pages("5-,1,7-9") == [(1, 1), (5, None)]
+    assert format_pages(parse_pages("3,1-2,20-")) == "1-3,20-"
+
+
+@pytest.mark.parametrize("spec", ["", "0", "3-1", "a-b", "1,,x"])
+def test_parse_pages_rejects_invalid(spec):
+    """Test that malformed selections raise ValueError."""
+    with pytest.raises(ValueError):
+        parse_pages(spec)
+
+
+def test_iter_pages_needs_count_only_for_open_ranges():
+    """Test iterating selections with and without a page count."""
+    assert not needs_page_count(resolve_pages("1-3,10"))
+    assert list(iter_pages(resolve_pages("1-3,10"))) == [1, 2, 3, 10]
+    assert list(iter_pages(resolve_pages([2, (5, 6)]), count=5)) == [2, 5]
+    assert needs_page_count(resolve_pages("4-"))
+    assert list(iter_pages(resolve_pages("4-"), count=6)) == [4, 5, 6]
+    assert list(iter_pages(None, count=2)) == [1, 2]
+    assert resolve_pages(None) is None
+    with pytest.raises(ValueError, match="needs the page count"):
+        list(iter_pages(resolve_pages("1,4-")))
@@ -0,0 +1,102 @@
+"""
+Tests for page_triage module.
+"""
+import io
+
+import pytest
+from PIL import Image, ImageDraw
+
+from enclose.utils.ocr_processor import process_ocr
+
+pytest.importorskip("numpy")
+
+from enclose.utils.page_triage import PageTriage, dhash, hamming, ink_coverage  # noqa: E402
+
+
+def page(lines, shift=0, noise=False):
+    """Draw a page with text-like bars at the given rows."""
+    image = Image.new('RGB', (600, 800), 'white')
+    draw = ImageDraw.Draw(image)
+    for y in lines:
+        draw.rectangle((80 + shift, y, 520 + shift, y + 12), fill='black')
+    if noise:
+        for x in range(0, 600, 97):
+            image.putpixel((x, 400), (0, 0, 0))
+    return image
+
+
+def invoice(number, amount):
+    """An A4 page at 150 DPI of a fixed invoice template."""
+    image = Image.new('L', (1240, 1754), 255)
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((100, 100, 1140, 210), outline=0, width=4)
+    draw.text((120, 140), "ACME Corporation Ltd - Invoice", fill=0)
+    draw.text((120, 260), f"Invoice number: {number}", fill=0)
+    for row in range(12):
+        draw.text((120, 350 + row * 40), f"Item {row}  consulting services  1 x 100.00", fill=0)
+        draw.line((100, 370 + row * 40, 1140, 370 + row * 40), fill=0, width=2)
+    draw.text((120, 900), f"Total amount due: {amount}", fill=0)
+    return image
+
+
+def jpeg_copy(image):
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=75)
+    return Image.open(io.BytesIO(buffer.getvalue()))
+
+
+def test_ink_coverage_and_hash():
+    """Test the coverage histogram and that hashes separate layouts."""
+    blank = page([], noise=True).convert('L')
+    assert ink_coverage(blank) < 0.001
+    assert ink_coverage(page([100]).convert('L')) == pytest.approx(441 * 13 / 480000, rel=0.01)
+
+    a = dhash(page(range(100, 700, 40)).convert('L'))
+    b = dhash(page(range(100, 700, 40), shift=1).convert('L'))
+    c = dhash(page(range(120, 400, 25)).convert('L'))
+    assert hamming(a, b) <= 8 < hamming(a, c)
+
+
+def test_triage_classifies_pages():
+    """Test blank and duplicate detection across calls."""
+    triage = PageTriage()
+    text = range(100, 700, 40)
+
+    assert 'skipped' not in triage.check(page(text), "a.png")
+    assert triage.check(page([], noise=True), "b.png")['skipped'] == 'blank'
+    duplicate = triage.check(jpeg_copy(page(text)), "c.png")
+    assert duplicate['skipped'] == 'duplicate' and duplicate['duplicate_of'] == "a.png"
+    assert 'skipped' not in triage.check(page(range(120, 400, 25)), "d.png")
+
+
+def test_same_template_with_different_text_is_not_duplicate():
+    """Test that pages differing only in a few words are both recognized."""
+    triage = PageTriage()
+    first = triage.check(invoice("INV-2024-00123", "1,234.56"), "a.png")
+    second = triage.check(invoice("INV-2024-00124", "1,234.56"), "b.png")
+
+    # The hash alone cannot tell them apart
+    assert hamming(int(first['dhash'], 16), int(second['dhash'], 16)) <= 8
+    assert 'skipped' not in second
+    rescan = triage.check(jpeg_copy(invoice("INV-2024-00124", "1,234.56")), "c.png")
+    assert rescan['duplicate_of'] == "b.png"
+
+
+def test_process_ocr_skips_and_copies(fake_tesseract, tmp_path):
+    """Test that skipped pages are marked and duplicates get the original's text."""
+    images = fake_tesseract(lambda image: [("cover", 0, 0, 90), ("sheet", 20, 0, 90)])
+    files = []
+    for name, image in [("cover", page(range(100, 700, 40))), ("blank", page([])),
+                        ("again", page(range(100, 700, 40)))]:
+        files.append(str(tmp_path / f"{name}.png"))
+        image.save(files[-1])
+
+    metadata = process_ocr(files, {}, triage=True)
+
+    cover, blank, again = metadata['ocr_results']
+    assert len(images) == 1
+    assert 'skipped' not in cover and cover['triage']['ink_coverage'] > 0
+    assert blank['skipped'] == 'blank' and blank['ocr_text'] == ""
+    assert again['skipped'] == 'duplicate' and again['duplicate_of'] == files[0]
+    assert again['ocr_text'] == "cover sheet"
+    assert metadata['triage'] == {'pages': 3, 'blank': 1, 'duplicate': 1}
@@ -1,11 +1,18 @@
 """
 Tests for pdf_converter module.
 """
+import hashlib
 import json
 import pytest
 from pathlib import Path
 from enclose.converters.markdown_converter import markdown_to_pdf
-from enclose.converters.pdf_converter import pdf_to_svg, svg_to_png
+from enclose.converters.pdf_converter import (
+    inline_svg_container,
+    pdf_to_svg,
+    read_container_pdf,
+    svg_to_png,
+)
+from enclose.utils.blob_store import BlobStore
 
 
 def test_pdf_to_svg(example_markdown_file, temp_output_dir):
@@ -50,3 +57,72 @@ def test_svg_to_png(example_markdown_file, temp_output_dir):
     assert len(updated_metadata["pages"]) == len(page_info)
     assert "converted_at" in updated_metadata
     assert updated_metadata["total_pages"] == len(page_info)
+
+
+def test_pdf_to_svg_referenced(example_markdown_file, temp_output_dir):
+    """Test referenced containers share one blob and inline on export."""
+    pdf_file = markdown_to_pdf(example_markdown_file, temp_output_dir)
+    first, metadata = pdf_to_svg(pdf_file, temp_output_dir / "a", container="referenced")
+    second, _ = pdf_to_svg(pdf_file, temp_output_dir / "b", container="referenced",
+                           blob_store=BlobStore(temp_output_dir / "a" / "blobs"))
+
+    pdf_bytes = Path(pdf_file).read_bytes()
+    assert metadata["pdf_embedded"] is False
+    assert metadata["pdf_sha256"] == hashlib.sha256(pdf_bytes).hexdigest()
+    assert "data:application/pdf;base64," not in first.read_text()
+    blobs = [p for p in (temp_output_dir / "a" / "blobs").rglob("*") if p.is_file()]
+    assert [p.name for p in blobs] == [metadata["pdf_sha256"]]
+    assert not (temp_output_dir / "b" / "blobs").exists()
+
+    assert read_container_pdf(first) == pdf_bytes
+    assert read_container_pdf(second, BlobStore(temp_output_dir / "a" / "blobs")) == pdf_bytes
+    # The default store is the one next to the container
+    with pytest.raises(ValueError, match="outside the blob store"):
+        read_container_pdf(second)
+
+    exported = inline_svg_container(first, temp_output_dir / "export.svg")
+    embedded, _ = pdf_to_svg(pdf_file, temp_output_dir / "embedded")
+    assert read_container_pdf(exported) == pdf_bytes
+    assert exported.read_text().replace(
+        _date(exported), "") == embedded.read_text().replace(_date(embedded), "")
+
+
+def _date(svg_path):
+    text = svg_path.read_text()
+    return text[text.index("<dc:date>"):text.index("</dc:date>")]
+
+
+def test_pdf_to_svgz(example_markdown_file, temp_output_dir):
+    """Test compressed containers carry the same PDF and convert to PNG."""
+    pdf_file = markdown_to_pdf(example_markdown_file, temp_output_dir)
+    svg_path, _ = pdf_to_svg(pdf_file, temp_output_dir / "plain")
+    svgz_path, metadata = pdf_to_svg(pdf_file, temp_output_dir / "gz", compress=True,
+                                     compresslevel=9)
+
+    assert svgz_path.suffix == ".svgz"
+    assert svgz_path.stat().st_size < svg_path.stat().st_size
+    assert read_container_pdf(svgz_path) == Path(pdf_file).read_bytes()
+
+    page_info, _ = svg_to_png(svgz_path, metadata, temp_output_dir / "gz")
+    assert Path(page_info[0]["file"]).name == "test.png"
+
+
+@pytest.mark.parametrize("src, attributes, error", [
+    ("../secret.pdf", ' data-sha256="{digest}"', "outside the blob store"),
+    ("{absolute}", ' data-sha256="{digest}"', "outside the blob store"),
+    ("blobs/../../secret.pdf", ' data-sha256="{digest}"', "outside the blob store"),
+    ("blobs/ab/ab.pdf", '', "without a SHA-256 checksum"),
+    ("blobs/ab/ab.pdf", ' data-sha256="../../secret"', "without a SHA-256 checksum"),
+])
+def test_read_container_pdf_rejects_unsafe_references(temp_output_dir, src, attributes, error):
+    """Test that referenced containers cannot read files outside the blob store."""
+    secret = temp_output_dir / "secret.pdf"
+    secret.write_bytes(b"%PDF-1.4 secret")
+    digest = hashlib.sha256(secret.read_bytes()).hexdigest()
+    container = temp_output_dir / "containers" / "doc.svg"
+    container.parent.mkdir()
+    src = src.format(absolute=secret)
+    container.write_text(f'<svg><embed src="{src}"{attributes.format(digest=digest)} /></svg>')
+
+    with pytest.raises(ValueError, match=error):
+        read_container_pdf(container)
@@ -0,0 +1,296 @@
+"""
+Tests for the streaming OCR pipeline.
+"""
+import io
+import multiprocessing
+import os
+import subprocess
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+from enclose.core import pipeline
+from enclose.core.pipeline import OCRPipeline, process_pdf_ocr
+from enclose.utils.resource_governor import ResourceGovernor
+
+
+def pages(count, rendered=None):
+    """Page images whose gray level is their page number."""
+    for number in range(1, count + 1):
+        if rendered is not None:
+            rendered.append(number)
+        yield f"doc#page={number}", Image.new('L', (40, 30), number)
+
+
+def page_word(image):
+    return [(f"p{image.getpixel((0, 0))}", 0, 0, 90)]
+
+
+def fake_poppler(monkeypatch, count):
+    """Fake a PDF of ``count`` pages; returns the poppler commands run."""
+    commands = []
+
+    def pdfinfo_from_path(path):
+        commands.append(['pdfinfo', str(path)])
+        return {'Pages': count}
+
+    def run(command, capture_output):
+        commands.append(command)
+        buffer = io.BytesIO()
+        number = int(command[command.index('-f') + 1])
+        Image.new('L', (40, 30), number).save(buffer, 'PPM')
+        return subprocess.CompletedProcess(command, 0, buffer.getvalue(), b'')
+
+    monkeypatch.setattr(pipeline, 'PdfReader', None)
+    monkeypatch.setattr(pipeline, 'pdfinfo_from_path', pdfinfo_from_path)
+    monkeypatch.setattr(pipeline.subprocess, 'run', run)
+    return commands
+
+
+def test_results_in_page_order(fake_tesseract):
+    """Test that out-of-order OCR still yields pages in order."""
+    def slow_first(image):
+        if image.getpixel((0, 0)) == 1:
+            time.sleep(0.05)
+        return page_word(image)
+
+    fake_tesseract(slow_first)
+    seen = []
+    results = list(OCRPipeline(workers=3).run(pages(6), on_page=seen.append))
+
+    assert [r["page"] for r in results] == [1, 2, 3, 4, 5, 6]
+    assert [r["ocr_text"] for r in results] == [f"p{n}" for n in range(1, 7)]
+    assert results[2]["file"] == "doc#page=3"
+    assert seen == results
+
+
+def test_queue_bounds_rendered_pages(fake_tesseract):
+    """Test that rendering stays at most queue depth ahead of OCR."""
+    rendered = []
+    recognized = []
+    ahead = []
+
+    def words(image):
+        ahead.append(len(rendered) - len(recognized))
+        time.sleep(0.01)
+        recognized.append(image)
+        return page_word(image)
+
+    fake_tesseract(words)
+    list(OCRPipeline(workers=1, queue_size=2).run(pages(10, rendered)))
+
+    # The page being recognized, the queue and the one being put
+    assert max(ahead) <= 1 + 2 + 1
+    assert len(recognized) == 10
+
+
+def test_governor_caps_concurrent_work(fake_tesseract):
+    """Test that rendering and OCR together stay within the CPU budget."""
+    def words(image):
+        time.sleep(0.01)
+        return page_word(image)
+
+    fake_tesseract(words)
+    governor = ResourceGovernor(cpus=2)
+    runner = OCRPipeline(workers=4, governor=governor)
+    results = list(runner.run(pages(8)))
+
+    metrics = runner.stats["governor"]
+    assert len(results) == 8
+    assert metrics["cpus_in_use"] == 0
+    assert metrics["stages"]["ocr"]["tasks"] == 8
+    assert metrics["stages"]["raster"]["tasks"] == 9
+    assert max(stage["peak"] for stage in metrics["stages"].values()) <= 2
+
+
+def test_early_close_stops_rendering(fake_tesseract):
+    """Test that closing the generator stops the producer."""
+    fake_tesseract(page_word)
+    rendered = []
+    threads = threading.active_count()
+    results = OCRPipeline(workers=1, queue_size=1).run(pages(100, rendered))
+    assert next(results)["page"] == 1
+    results.close()
+    time.sleep(0.3)
+    count = len(rendered)
+    time.sleep(0.2)
+    assert len(rendered) == count < 100
+    assert threading.active_count() == threads
+
+
+def test_render_error_after_earlier_pages(fake_tesseract):
+    """Test that a render error surfaces after the pages before it."""
+    fake_tesseract(page_word)
+
+    def failing():
+        yield from pages(2)
+        raise RuntimeError("render failed")
+
+    results = OCRPipeline().run(failing())
+    assert [next(results)["page"], next(results)["page"]] == [1, 2]
+    with pytest.raises(RuntimeError, match="render failed"):
+        next(results)
+
+
+def test_ocr_error_recorded_per_page(fake_tesseract):
+    """Test that a failed page does not stop the others."""
+    def words(image):
+        if image.getpixel((0, 0)) == 2:
+            raise RuntimeError("tesseract crashed")
+        return page_word(image)
+
+    fake_tesseract(words)
+    results = list(OCRPipeline().run(pages(3)))
+    assert results[1]["error"] == "tesseract crashed"
+    assert results[2]["ocr_text"] == "p3"
+
+
+def test_triage_copies_duplicates(fake_tesseract):
+    """Test blank and duplicate pages with concurrent workers."""
+    pytest.importorskip("numpy")
+    from PIL import ImageDraw
+
+    def page(rows):
+        image = Image.new('L', (600, 800), 255)
+        draw = ImageDraw.Draw(image)
+        for y in rows:
+            draw.rectangle((80, y, 520, y + 12), fill=0)
+        return image
+
+    images = [page(range(100, 700, 40)), page([]), page(range(100, 700, 40)),
+              page(range(120, 400, 25))]
+    fake_tesseract(lambda image: [("text", 0, 0, 90)])
+
+    metadata = OCRPipeline(workers=2, triage=True).process(
+        ((f"doc#page={i}", image) for i, image in enumerate(images, 1)), {}
+    )
+    results = metadata["ocr_results"]
+    assert results[1]["skipped"] == "blank"
+    assert results[2]["skipped"] == "duplicate"
+    assert results[2]["duplicate_of"] == "doc#page=1"
+    assert results[2]["ocr_text"] == "text"
+    assert metadata["triage"] == {"pages": 4, "blank": 1, "duplicate": 1}
+
+
+def test_process_pdf_ocr(fake_tesseract, monkeypatch, tmp_path):
+    """Test rendering a PDF page by page and saving the pages."""
+    commands = fake_poppler(monkeypatch, 3)
+    fake_tesseract(page_word)
+
+    metadata = process_pdf_ocr(tmp_path / "doc.pdf", dpi=150, output_dir=tmp_path / "pages")
+
+    # One page count, then one pdftoppm run per page
+    assert [c[0] for c in commands] == ['pdfinfo'] + ['pdftoppm'] * 3
+    assert commands[2] == ['pdftoppm', '-r', '150', '-f', '2', '-l', '2',
+                           str(tmp_path / "doc.pdf")]
+    assert [r["ocr_text"] for r in metadata["ocr_results"]] == ["p1", "p2", "p3"]
+    assert metadata["pipeline"]["pages"] == 3
+    assert metadata["pipeline"]["first_page_time"] <= metadata["pipeline"]["total_time"]
+    saved = metadata["ocr_results"][1]["image"]
+    assert "ocr_results_file" not in metadata
+    assert saved.endswith("doc_2.png")
+    with Image.open(saved) as image:
+        assert image.info['dpi'] == pytest.approx((150, 150), abs=0.1)
+
+
+def test_page_selection_renders_only_selected_pages(fake_tesseract, monkeypatch, tmp_path):
+    """Test that unselected pages are never rendered and keep their numbers."""
+    commands = fake_poppler(monkeypatch, 12)
+    fake_tesseract(page_word)
+
+    metadata = process_pdf_ocr(tmp_path / "doc.pdf", pages="10,1-2,12-15")
+
+    assert [int(c[4]) for c in commands[1:]] == [1, 2, 10, 12]
+    assert [r["page"] for r in metadata["ocr_results"]] == [1, 2, 10, 12]
+    assert [r["ocr_text"] for r in metadata["ocr_results"]] == ["p1", "p2", "p10", "p12"]
+    assert metadata["page_selection"] == "1-2,10,12-15"
+
+
+def test_rasterize_pdf_open_range(monkeypatch, tmp_path):
+    """Test writing the pages of an open range without OCR."""
+    fake_poppler(monkeypatch, 4)
+
+    page_info = pipeline.rasterize_pdf(tmp_path / "doc.pdf", tmp_path / "out", pages="3-")
+
+    assert [p["page"] for p in page_info] == [3, 4]
+    assert page_info[0]["file"].endswith("doc_3.png")
+    assert pipeline.parse_stages("ocr") == ("ocr",)
+    with pytest.raises(ValueError, match="Unknown stage"):
+        pipeline.parse_stages("raster,layout")
+
+
+def test_worker_processes_share_pages(fake_tesseract):
+    """Test recognizing pages in processes fed from shared memory."""
+    pytest.importorskip("numpy")
+    fake_tesseract(page_word)
+
+    pipeline = OCRPipeline(workers=2, queue_size=2, processes=True,
+                           mp_context=multiprocessing.get_context('fork'))
+    results = list(pipeline.run(pages(8)))
+
+    assert [r["ocr_text"] for r in results] == [f"p{n}" for n in range(1, 9)]
+    assert pipeline._pool is None
+
+
+def test_worker_process_crash_fails_one_page(fake_tesseract):
+    """Test that a page killing its worker process fails alone."""
+    pytest.importorskip("numpy")
+
+    def words(image):
+        if image.getpixel((0, 0)) == 3:
+            os._exit(1)
+        return page_word(image)
+
+    fake_tesseract(words)
+    pipeline = OCRPipeline(workers=1, processes=True,
+                           mp_context=multiprocessing.get_context('fork'))
+    results = list(pipeline.run(pages(5)))
+
+    assert "error" in results[2]
+    assert [r["ocr_text"] for r in results] == ["p1", "p2", "", "p4", "p5"]
+
+
+def test_page_timeout_fails_one_page(fake_tesseract):
+    """Test that a page hanging its worker times out alone."""
+    pytest.importorskip("numpy")
+    from enclose.utils.worker_pool import WorkerLimits
+
+    def words(image):
+        if image.getpixel((0, 0)) == 2:
+            time.sleep(30)
+        return page_word(image)
+
+    fake_tesseract(words)
+    pipeline = OCRPipeline(workers=1, limits=WorkerLimits(timeout=0.5),
+                           mp_context=multiprocessing.get_context('fork'))
+    results = list(pipeline.run(pages(3)))
+
+    assert results[1]["failure"]["kind"] == "timeout"
+    assert [r["ocr_text"] for r in results] == ["p1", "", "p3"]
+    assert pipeline.stats["worker_pool"]["timeouts"] == 1
+
+
+def test_results_stream_to_jsonl(fake_tesseract, tmp_path):
+    """Test that each page is in the sink before later pages are done."""
+    from enclose.utils.metadata_utils import read_jsonl
+
+    sink = tmp_path / "ocr.jsonl"
+    in_sink = []
+
+    def words(image):
+        # Wait for page 1 to reach the sink while this page is recognized
+        deadline = time.monotonic() + 5
+        while image.getpixel((0, 0)) == 4 and not in_sink and time.monotonic() < deadline:
+            if sink.exists():
+                in_sink.extend(r["page"] for r in read_jsonl(sink))
+            time.sleep(0.01)
+        return page_word(image)
+
+    fake_tesseract(words)
+    metadata = OCRPipeline(workers=1, queue_size=1).process(pages(4), {}, sink=sink)
+
+    assert in_sink[:1] == [1]
+    assert [r["ocr_text"] for r in read_jsonl(sink)] == ["p1", "p2", "p3", "p4"]
+    assert metadata["ocr_results_file"] == str(sink)
@@ -0,0 +1,175 @@
+"""
+Tests for raster module.
+"""
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from enclose.converters import raster
+from enclose.converters.pdf_converter import svg_to_png
+from enclose.converters.raster import (
+    ENCODING_PRESETS,
+    PROFILE_PRESETS,
+    OutputProfile,
+    encode_image,
+    parse_profiles,
+    render_dpi,
+    render_tiles,
+    render_variants,
+    svg_page_size,
+    tile_grid,
+    with_encoding,
+)
+from enclose.utils.file_validation import validate_file_signature
+
+SVG = (
+    '<svg width="100" height="100" xmlns="http://www.w3.org/2000/svg">'
+    '<rect width="100" height="100" fill="red"/></svg>'
+)
+
+
+@pytest.fixture
+def svg_file(tmp_path):
+    path = tmp_path / "page.svg"
+    path.write_text(SVG, encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def render_calls(monkeypatch):
+    """Count the SVG renders."""
+    calls = []
+    svg2png = raster.cairosvg.svg2png
+
+    def counting_svg2png(**kwargs):
+        calls.append(kwargs)
+        return svg2png(**kwargs)
+
+    monkeypatch.setattr(raster.cairosvg, 'svg2png', counting_svg2png)
+    return calls
+
+
+def test_parse_profiles():
+    """Test that presets are looked up by name."""
+    profiles = parse_profiles("ocr, thumbnail")
+    assert [p.name for p in profiles] == ['ocr', 'thumbnail']
+    assert profiles[0].mode == 'L' and profiles[1].format == 'webp'
+
+    with pytest.raises(ValueError):
+        parse_profiles("poster")
+    with pytest.raises(ValueError):
+        OutputProfile('tiff', format='tiff')
+
+
+def test_render_dpi_is_highest_profile_dpi():
+    """Test that width-based profiles do not raise the render resolution."""
+    assert render_dpi(parse_profiles("preview,ocr,thumbnail")) == 300
+    assert render_dpi(parse_profiles("thumbnail")) == raster.CSS_DPI
+
+
+def test_render_variants_renders_once(svg_file, tmp_path, render_calls):
+    """Test that every variant is derived from a single render."""
+    variants = render_variants(svg_file, tmp_path, parse_profiles("ocr,preview,thumbnail"))
+
+    assert len(render_calls) == 1
+    assert render_calls[0]['scale'] == pytest.approx(300 / 96)
+
+    ocr, preview, thumbnail = variants
+    assert preview['width'] == round(ocr['width'] * 96 / 300)
+    assert preview['dpi'] == pytest.approx(96, rel=0.01)
+    assert thumbnail['width'] == 200
+
+    with Image.open(ocr['file']) as img:
+        assert img.mode == 'L'
+        assert img.size == (ocr['width'], ocr['height'])
+    with Image.open(thumbnail['file']) as img:
+        assert img.format == 'WEBP'
+    assert Path(preview['file']).name == "page_preview.png"
+
+
+def test_svg_to_png_lists_variants(svg_file, tmp_path, render_calls):
+    """Test that the page info describes the first variant and lists all."""
+    page_info, metadata = svg_to_png(
+        svg_file, {}, tmp_path / "out", profiles=['preview', OutputProfile('small', width=50)]
+    )
+
+    page = page_info[0]
+    assert [v['profile'] for v in page['variants']] == ['preview', 'small']
+    assert page['file'] == page['variants'][0]['file']
+    assert page['width'] == page['variants'][0]['width']
+    assert metadata['pages'] == page_info
+    assert len(render_calls) == 1
+
+
+def test_with_encoding_applies_preset_and_overrides():
+    """Test that explicit options override the preset for every profile."""
+    profiles = with_encoding(parse_profiles("ocr,preview"), 'webp', quality=60, colors=None)
+
+    assert [p.format for p in profiles] == ['webp', 'webp']
+    assert [p.quality for p in profiles] == [60, 60]
+    assert profiles[0].mode == 'L' and profiles[0].dpi == 300
+
+    with pytest.raises(ValueError):
+        with_encoding(profiles, 'gif')
+    with pytest.raises(ValueError):
+        with_encoding(profiles, compress_level=12)
+
+
+@pytest.mark.parametrize('preset', list(ENCODING_PRESETS))
+def test_encoding_presets_write_valid_files(preset, tmp_path):
+    """Test that every preset encodes a transparent page as a valid file."""
+    image = Image.new('RGBA', (64, 64), (0, 0, 0, 0))
+    profile = with_encoding([OutputProfile('page')], preset)[0]
+    output = tmp_path / f"page.{raster.FORMAT_EXTENSIONS[profile.format]}"
+
+    encode_image(image, profile, output)
+
+    assert validate_file_signature(output, output.suffix[1:])[0] is True
+    with Image.open(output) as img:
+        if profile.colors:
+            assert img.mode == 'P'
+        if profile.colors or profile.format == 'jpeg':
+            # Transparent areas are flattened onto white, as on paper
+            assert img.convert('RGB').getpixel((0, 0)) == (255, 255, 255)
+
+
+def test_svg_to_png_encoding_without_profiles(svg_file, tmp_path):
+    """Test that an encoding alone re-encodes the single page image."""
+    page_info, _ = svg_to_png(svg_file, {}, tmp_path / "out", encoding={'preset': 'jpeg'})
+
+    assert Path(page_info[0]['file']).name == "page.jpg"
+    assert validate_file_signature(page_info[0]['file'], 'jpeg')[0] is True
+
+
+def test_tile_grid_covers_page_with_overlap():
+    """Test that tiles overlap and cover the page exactly."""
+    tiles = tile_grid(250, 120, tile_size=100, overlap=20)
+
+    assert [(t.x, t.width) for t in tiles if t.row == 0] == [(0, 100), (80, 100), (160, 90)]
+    assert [(t.y, t.height) for t in tiles if t.col == 0] == [(0, 100), (80, 40)]
+    with pytest.raises(ValueError):
+        tile_grid(100, 100, tile_size=50, overlap=50)
+
+
+def test_render_tiles_bounds_bitmap_size(tmp_path, render_calls):
+    """Test that a large page is rendered as tile-sized bitmaps only."""
+    svg_file = tmp_path / "poster.svg"
+    svg_file.write_text(
+        '<svg xmlns="http://www.w3.org/2000/svg" width="10in" height="5in" '
+        'viewBox="0 0 1000 500"><rect width="1000" height="500"/></svg>',
+        encoding='utf-8',
+    )
+    assert svg_page_size(svg_file, 300) == (3000, 1500)
+
+    page = render_tiles(svg_file, tmp_path, PROFILE_PRESETS['ocr'], tile_size=1024, overlap=64)
+
+    assert (page['width'], page['height']) == (3000, 1500)
+    assert len(page['tiles']) == len(render_calls) == 8
+    for call in render_calls:
+        assert call['output_width'] <= 1024 and call['output_height'] <= 1024
+    # The second tile's viewBox starts 960 pixels (320 user units) in
+    assert b'viewBox="320.0 0.0' in render_calls[1]['bytestring']
+    with Image.open(page['tiles'][-1]['file']) as img:
+        assert img.size == (page['tiles'][-1]['width'], page['tiles'][-1]['height'])
+        assert img.mode == 'L'
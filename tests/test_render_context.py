@@ -0,0 +1,58 @@
+"""
+Tests for render_context module.
+"""
+import os
+from pathlib import Path
+
+from enclose.converters.markdown_converter import PAGE_STYLE, markdown_to_pdf
+from enclose.converters.render_context import (
+    clear_render_context,
+    get_render_context,
+)
+
+
+def test_render_context_is_reused():
+    """Test that the font configuration and stylesheets are built once."""
+    clear_render_context()
+    first = get_render_context(PAGE_STYLE)
+    second = get_render_context(PAGE_STYLE)
+
+    assert first is second
+    assert first.font_config is second.font_config
+    assert len(first.stylesheets) == 1
+
+
+def test_render_context_invalidated_on_theme_change(tmp_path):
+    """Test that changing the theme file rebuilds the context."""
+    clear_render_context()
+    theme = tmp_path / "theme.css"
+    theme.write_text("h1 { color: red; }")
+
+    themed = get_render_context(PAGE_STYLE, theme)
+    assert len(themed.stylesheets) == 2
+    assert get_render_context(PAGE_STYLE, theme) is themed
+
+    # Rewriting the theme (new size and mtime) compiles it again
+    theme.write_text("h1 { color: blue; font-weight: bold; }")
+    stat = theme.stat()
+    os.utime(theme, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert get_render_context(PAGE_STYLE, theme) is not themed
+
+    # Dropping the theme goes back to the base stylesheet only
+    assert len(get_render_context(PAGE_STYLE).stylesheets) == 1
+
+
+def test_markdown_to_pdf_with_theme(example_markdown_file, temp_output_dir, tmp_path):
+    """Test rendering several documents with a shared, themed context."""
+    theme = tmp_path / "theme.css"
+    theme.write_text("body { font-size: 10pt; }")
+
+    first = markdown_to_pdf(example_markdown_file, temp_output_dir, "first", theme=theme)
+    context = get_render_context(PAGE_STYLE, theme)
+    second = markdown_to_pdf(example_markdown_file, temp_output_dir, "second", theme=theme)
+
+    assert get_render_context(PAGE_STYLE, theme) is context
+    for pdf_path in (first, second):
+        assert Path(pdf_path).read_bytes().startswith(b'%PDF')
+    # No intermediate HTML is left behind
+    assert not list(temp_output_dir.glob("*.html"))
@@ -0,0 +1,81 @@
+"""
+Tests for reportlab_backend module.
+"""
+import pytest
+
+from enclose.converters.markdown_backends import get_markdown_backend
+from enclose.converters.markdown_converter import markdown_to_pdf, select_pdf_backend
+from enclose.converters.reportlab_backend import is_simple_document, render_pdf
+
+SIMPLE_MARKDOWN = """# Invoice
+
+Thank you for your **business** & *prompt* payment of `INV-1`.
+
+- Web development
+- Design
+    - Logo
+
+| Item | Amount |
+|:-----|-------:|
+| Consulting | $1,200 |
+
+---
+"""
+
+
+def _fragment(md_content):
+    return get_markdown_backend('python-markdown').convert(md_content)
+
+
+def test_is_simple_document():
+    """Test detection of documents the ReportLab backend can render."""
+    assert is_simple_document(_fragment(SIMPLE_MARKDOWN))
+    assert not is_simple_document(_fragment("```python\nprint(1)\n```"))
+    assert not is_simple_document(_fragment("![logo](logo.png)"))
+    assert not is_simple_document(_fragment("> quoted"))
+    assert not is_simple_document(_fragment("<div>raw html</div>"))
+    # The standard fonts cannot show text outside Windows-1252
+    assert is_simple_document(_fragment("Total: 100 € – naïve café"))
+    assert not is_simple_document(_fragment("Faktura łódź: zażółć gęślą jaźń"))
+    assert not is_simple_document(_fragment("Счёт № 5"))
+    assert not is_simple_document(_fragment("| Paid | ✓ |\n|---|---|\n| yes | ✓ |"))
+
+
+def test_render_pdf(temp_output_dir):
+    """Test rendering a simple document with ReportLab."""
+    pdf_path = render_pdf(_fragment(SIMPLE_MARKDOWN), temp_output_dir / "simple.pdf", "simple")
+
+    content = pdf_path.read_bytes()
+    assert content.startswith(b'%PDF')
+    assert b'ReportLab' in content
+
+
+def test_select_pdf_backend(monkeypatch, tmp_path):
+    """Test automatic backend selection and explicit overrides."""
+    monkeypatch.delenv('ENCLOSE_PDF_BACKEND', raising=False)
+    simple = _fragment(SIMPLE_MARKDOWN)
+    complex_ = _fragment("```python\nprint(1)\n```")
+
+    assert select_pdf_backend(simple) == 'reportlab'
+    assert select_pdf_backend(complex_) == 'weasyprint'
+    assert select_pdf_backend(simple, 'weasyprint') == 'weasyprint'
+    # Themes only apply to WeasyPrint
+    assert select_pdf_backend(simple, theme=tmp_path / "theme.css") == 'weasyprint'
+
+    monkeypatch.setenv('ENCLOSE_PDF_BACKEND', 'weasyprint')
+    assert select_pdf_backend(simple) == 'weasyprint'
+
+    with pytest.raises(ValueError):
+        select_pdf_backend(simple, 'no-such-backend')
+
+
+def test_markdown_to_pdf_falls_back_to_weasyprint(tmp_path, temp_output_dir, monkeypatch):
+    """Test that unsupported constructs are rendered with WeasyPrint."""
+    monkeypatch.delenv('ENCLOSE_PDF_BACKEND', raising=False)
+    simple = tmp_path / "simple.md"
+    simple.write_text(SIMPLE_MARKDOWN)
+    code = tmp_path / "code.md"
+    code.write_text("# Code\n\n```python\nprint(1)\n```\n")
+
+    assert b'ReportLab' in markdown_to_pdf(simple, temp_output_dir).read_bytes()
+    assert b'WeasyPrint' in markdown_to_pdf(code, temp_output_dir).read_bytes()
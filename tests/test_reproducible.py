@@ -0,0 +1,85 @@
+"""
+Tests for reproducible output mode.
+"""
+import time
+
+import pytest
+
+from enclose.converters.markdown_converter import markdown_to_pdf
+from enclose.converters.pdf_converter import pdf_to_svg, svg_to_png
+from enclose.utils.reproducible import (
+    build_timestamp,
+    content_id,
+    is_reproducible,
+    set_reproducible,
+)
+
+
+@pytest.fixture
+def clean_env(monkeypatch):
+    """Start each test without any reproducible-mode settings.
+
+    Setting the variables first makes monkeypatch restore them afterwards,
+    including after ``set_reproducible`` wrote them directly.
+    """
+    for name in ('SOURCE_DATE_EPOCH', 'ENCLOSE_REPRODUCIBLE'):
+        monkeypatch.setenv(name, '0')
+        monkeypatch.delenv(name)
+    return monkeypatch
+
+
+def test_reproducible_mode_settings(clean_env):
+    """Test enabling the mode through SOURCE_DATE_EPOCH and explicitly."""
+    assert not is_reproducible()
+
+    clean_env.setenv('SOURCE_DATE_EPOCH', '1700000000')
+    assert is_reproducible()
+    assert build_timestamp() == '2023-11-14T22:13:20+00:00'
+
+    # An explicit setting wins over SOURCE_DATE_EPOCH
+    set_reproducible(False)
+    assert not is_reproducible()
+
+    clean_env.delenv('SOURCE_DATE_EPOCH')
+    set_reproducible(True)
+    assert build_timestamp() == '2000-01-01T00:00:00+00:00'
+
+
+def test_content_id_is_stable():
+    """Test that identifiers depend on content only."""
+    assert content_id("page", b"theme") == content_id("page", b"theme")
+    assert content_id("page") != content_id("other page")
+    assert len(content_id("page")) == 32
+
+
+@pytest.mark.parametrize("pdf_backend", ["reportlab", "weasyprint"])
+def test_outputs_are_bit_for_bit_stable(clean_env, example_markdown_file, tmp_path,
+                                        pdf_backend):
+    """Test that two runs on identical input produce identical bytes."""
+    clean_env.setenv('SOURCE_DATE_EPOCH', '1700000000')
+
+    outputs = []
+    for run in ("first", "second"):
+        output_dir = tmp_path / run
+        output_dir.mkdir()
+        pdf_path = markdown_to_pdf(example_markdown_file, output_dir, pdf_backend=pdf_backend)
+        svg_path, metadata = pdf_to_svg(pdf_path, output_dir)
+        outputs.append((pdf_path.read_bytes(), svg_path.read_bytes(), metadata))
+        # Cross a second boundary so wall-clock timestamps would differ
+        time.sleep(1.1)
+
+    (first_pdf, first_svg, _), (second_pdf, second_svg, _) = outputs
+    assert first_pdf == second_pdf
+    assert first_svg == second_svg
+    assert b'2023-11-14T22:13:20+00:00' in first_svg
+
+
+def test_svg_to_png_uses_build_date(clean_env, example_markdown_file, temp_output_dir):
+    """Test that converted_at is the build date in reproducible mode."""
+    clean_env.setenv('SOURCE_DATE_EPOCH', '1700000000')
+    pdf_file = markdown_to_pdf(example_markdown_file, temp_output_dir)
+    svg_path, metadata = pdf_to_svg(pdf_file, temp_output_dir)
+
+    _, updated = svg_to_png(svg_path, metadata, temp_output_dir)
+
+    assert updated['converted_at'] == '2023-11-14T22:13:20+00:00'
@@ -0,0 +1,126 @@
+"""
+Tests for the process-wide resource governor.
+"""
+import os
+import threading
+import time
+
+import pytest
+
+from enclose.utils import resource_governor
+from enclose.utils.resource_governor import (
+    THREAD_ENV_VARS,
+    ResourceGovernor,
+    apply_thread_env,
+    configure_governor,
+    get_governor,
+)
+
+
+def unset_env(monkeypatch, *names):
+    """Unset variables so that they are restored after the test, even when
+    the code under test sets them directly."""
+    for name in names:
+        monkeypatch.setenv(name, '0')
+        monkeypatch.delenv(name)
+
+
+def run_tasks(governor, stage, count, seconds=0.05, **slot):
+    """Run ``count`` tasks in threads, each holding a slot; return the peak."""
+    lock = threading.Lock()
+    running = [0, 0]
+
+    def task():
+        with governor.slot(stage, **slot):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(seconds)
+            with lock:
+                running[0] -= 1
+
+    threads = [threading.Thread(target=task) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return running[1]
+
+
+def test_slots_never_exceed_cpu_budget():
+    governor = ResourceGovernor(cpus=2)
+
+    assert run_tasks(governor, 'ocr', 6) == 2
+    stats = governor.metrics()["stages"]["ocr"]
+    assert stats["tasks"] == 6
+    assert stats["peak"] == 2
+    assert stats["in_use"] == 0
+    assert stats["wait_seconds"] > 0
+
+
+def test_memory_budget_limits_concurrency():
+    governor = ResourceGovernor(cpus=4, memory_mb=100)
+
+    assert run_tasks(governor, 'ocr', 4, memory_mb=60) == 1
+
+
+def test_oversized_requests_are_cut_to_budget():
+    governor = ResourceGovernor(cpus=2, memory_mb=10)
+
+    with governor.slot('layout', cpus=8, memory_mb=50) as cpus:
+        assert cpus == 2
+        assert governor.metrics()["cpus_in_use"] == 2
+    assert governor.metrics()["cpus_in_use"] == 0
+
+
+def test_share_takes_free_tokens():
+    governor = ResourceGovernor(cpus=4)
+
+    with governor.slot('raster'):
+        with governor.share('layout', 8) as workers:
+            assert workers == 3
+    with governor.share('layout', 2) as workers:
+        assert workers == 2
+
+
+def test_metrics_report_utilization():
+    governor = ResourceGovernor(cpus=1)
+
+    with governor.slot('ocr'):
+        time.sleep(0.05)
+    metrics = governor.metrics()
+
+    assert metrics["cpus"] == 1
+    assert 0 < metrics["utilization"] <= 1
+    assert metrics["stages"]["ocr"]["busy_seconds"] >= 0.05
+
+
+def test_invalid_budget():
+    with pytest.raises(ValueError):
+        ResourceGovernor(cpus=0)
+    with pytest.raises(ValueError):
+        ResourceGovernor(cpus=1, memory_mb=0)
+
+
+def test_configure_governor_sets_environment(monkeypatch):
+    monkeypatch.setattr(resource_governor, '_governor', None)
+    unset_env(monkeypatch, 'ENCLOSE_CPUS')
+    monkeypatch.setenv('ENCLOSE_MEMORY_MB', '512')
+
+    assert get_governor().memory_mb == 512
+    governor = configure_governor(3)
+
+    assert get_governor() is governor
+    assert governor.cpus == 3
+    assert os.environ['ENCLOSE_CPUS'] == '3'
+    monkeypatch.setattr(resource_governor, '_governor', None)
+
+
+def test_apply_thread_env_keeps_explicit_settings(monkeypatch):
+    unset_env(monkeypatch, *THREAD_ENV_VARS)
+    monkeypatch.setenv('OMP_THREAD_LIMIT', '4')
+
+    apply_thread_env()
+
+    assert os.environ['OMP_THREAD_LIMIT'] == '4'
+    assert os.environ['OMP_NUM_THREADS'] == '1'
@@ -0,0 +1,130 @@
+"""
+Tests for priority- and deadline-aware scheduling.
+"""
+import threading
+import time
+
+import pytest
+
+from enclose.core import scheduler as scheduler_module
+from enclose.core.scheduler import DeadlineExceeded, Scheduler, estimate_pages
+
+
+class FakeProcessor:
+    """Records the order of conversions; PDFs take ``page_seconds`` per page
+    and report every page, inputs named gate* wait for ``gate``."""
+
+    def __init__(self, log, gate=None, pages=1, page_seconds=0.0):
+        self.log = log
+        self.gate = gate
+        self.pages = pages
+        self.page_seconds = page_seconds
+
+    def process(self, input_path, output_format, output_path=None, **options):
+        if input_path.name.startswith("gate"):
+            self.gate.wait(5)
+        if input_path.suffix == '.pdf':
+            for number in range(1, self.pages + 1):
+                time.sleep(self.page_seconds)
+                options['on_page']({"page": number})
+        self.log.append(input_path.stem)
+        return input_path.stem
+
+
+def make_inputs(tmp_path, **sizes):
+    files = {}
+    for name, size in sizes.items():
+        suffix = '.pdf' if name.startswith("pdf") else '.md'
+        files[name] = tmp_path / f"{name}{suffix}"
+        files[name].write_text("x" * size)
+    return files
+
+
+def test_priority_then_shortest_job_first(tmp_path):
+    """Test that queued jobs start by class, then by page count."""
+    files = make_inputs(tmp_path, gate=1, big=30000, small=10, normal=10, urgent=50000)
+    log = []
+    gate = threading.Event()
+
+    with Scheduler(workers=1, processor_factory=lambda: FakeProcessor(log, gate)) as jobs:
+        jobs.submit(files["gate"], 'pdf')
+        time.sleep(0.05)
+        jobs.submit(files["big"], 'pdf', priority='batch')
+        jobs.submit(files["small"], 'pdf', priority='batch')
+        jobs.submit(files["normal"], 'pdf')
+        jobs.submit(files["urgent"], 'pdf', priority='interactive')
+        gate.set()
+
+    assert log == ["gate", "urgent", "normal", "small", "big"]
+    metrics = jobs.metrics()
+    assert metrics["classes"]["batch"]["jobs"] == 2
+    assert metrics["classes"]["interactive"]["p99"] is not None
+    assert metrics["queued"] == 0
+
+
+def test_deadlines(tmp_path):
+    """Test earliest-deadline-first and jobs expiring in the queue."""
+    files = make_inputs(tmp_path, gate=1, late=10, soon=10, expired=10)
+    log = []
+    gate = threading.Event()
+
+    with Scheduler(workers=1, processor_factory=lambda: FakeProcessor(log, gate)) as jobs:
+        jobs.submit(files["gate"], 'pdf')
+        time.sleep(0.05)
+        late = jobs.submit(files["late"], 'pdf', priority='batch', deadline=600)
+        jobs.submit(files["soon"], 'pdf', priority='batch', deadline=300)
+        expired = jobs.submit(files["expired"], 'pdf', priority='batch', deadline=0.01)
+        time.sleep(0.05)
+        gate.set()
+
+    assert log == ["gate", "soon", "late"]
+    assert late.result() == "late"
+    with pytest.raises(DeadlineExceeded):
+        expired.result()
+    assert jobs.metrics()["classes"]["batch"]["deadline_missed"] == 1
+
+
+def test_batch_preempted_at_page_boundary(tmp_path, monkeypatch):
+    """Test that an interactive job runs between two pages of a backfill."""
+    monkeypatch.setattr(scheduler_module, 'pdf_page_count', lambda path: 20)
+    files = make_inputs(tmp_path, pdf_backfill=1, quick=10)
+    log = []
+
+    def factory():
+        return FakeProcessor(log, pages=20, page_seconds=0.02)
+
+    with Scheduler(workers=1, processor_factory=factory) as jobs:
+        backfill = jobs.submit(files["pdf_backfill"], 'png', priority='batch')
+        time.sleep(0.1)
+        quick = jobs.submit(files["quick"], 'pdf', priority='interactive')
+        assert quick.result(5) == "quick"
+        assert not backfill.done()
+
+    assert log == ["quick", "pdf_backfill"]
+    assert backfill.pages == 20
+    assert backfill.preemptions == 1
+    assert quick.latency < backfill.latency
+    assert jobs.metrics()["preemptions"] == 1
+
+
+def test_estimate_pages(tmp_path, monkeypatch):
+    """Test page estimates for PDFs, page selections, Markdown and images."""
+    monkeypatch.setattr(scheduler_module, 'pdf_page_count', lambda path: 12)
+    files = make_inputs(tmp_path, pdf=1, doc=9000)
+
+    assert estimate_pages(files["pdf"]) == 12
+    assert estimate_pages(files["pdf"], "1-3,10-") == 6
+    assert estimate_pages(files["doc"]) == 3
+    assert estimate_pages(tmp_path / "page.png") == 1
+
+
+def test_invalid_jobs(tmp_path):
+    """Test that bad priorities, deadlines and closed schedulers are refused."""
+    jobs = Scheduler(workers=1, processor_factory=lambda: FakeProcessor([]))
+    with pytest.raises(ValueError):
+        jobs.submit(tmp_path / "a.md", 'pdf', priority='urgent')
+    with pytest.raises(ValueError):
+        jobs.submit(tmp_path / "a.md", 'pdf', deadline=0)
+    jobs.close()
+    with pytest.raises(RuntimeError):
+        jobs.submit(tmp_path / "a.md", 'pdf')
@@ -0,0 +1,121 @@
+"""
+Tests for supervised worker processes.
+"""
+import multiprocessing
+import os
+import subprocess
+import time
+
+import pytest
+
+from enclose.utils.worker_pool import (
+    StageTimeout,
+    WorkerCrashed,
+    WorkerLimits,
+    WorkerMemoryExceeded,
+    WorkerPool,
+    parse_timeouts,
+)
+
+FORK = multiprocessing.get_context('fork')
+
+
+def square(x):
+    return x * x
+
+
+def nap(seconds):
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def crash(code):
+    os._exit(code)
+
+
+def allocate(mb):
+    return len(bytearray(mb * 2 ** 20))
+
+
+def fail(message):
+    raise ValueError(message)
+
+
+def hang_in_child(pid_file):
+    child = subprocess.Popen(['sleep', '30'])
+    with open(pid_file, 'w') as f:
+        f.write(str(child.pid))
+    child.wait()
+
+
+def running(pid):
+    """Whether a process exists and is not a zombie waiting to be reaped."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+    except OSError:
+        return True
+
+
+def test_timeout_kills_only_the_stuck_task():
+    """Test that a hanging task fails fast and the pool keeps working."""
+    with WorkerPool(2, WorkerLimits(timeout=0.3), FORK, stage='ocr') as pool:
+        start = time.monotonic()
+        with pytest.raises(StageTimeout) as excinfo:
+            pool.call(nap, 10)
+        assert time.monotonic() - start < 5
+        assert excinfo.value.as_dict()["kind"] == "timeout"
+        assert excinfo.value.as_dict()["stage"] == "ocr"
+        assert pool.map(square, range(5)) == [0, 1, 4, 9, 16]
+        assert pool.stats["timeouts"] == 1
+
+
+def test_timeout_kills_child_processes(tmp_path):
+    """Test that a timed-out task's child tool does not outlive it."""
+    pid_file = tmp_path / "child.pid"
+    with WorkerPool(1, WorkerLimits(timeout=0.5), FORK) as pool:
+        with pytest.raises(StageTimeout):
+            pool.call(hang_in_child, str(pid_file))
+    child = int(pid_file.read_text())
+    # The orphaned child is reaped by init in its own time
+    deadline = time.monotonic() + 5
+    while running(child) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not running(child)
+
+
+def test_crash_memory_and_errors_are_reported():
+    """Test worker deaths, the memory cap and task exceptions."""
+    with WorkerPool(1, WorkerLimits(max_memory_mb=512), FORK) as pool:
+        with pytest.raises(WorkerCrashed, match="exit code 3"):
+            pool.call(crash, 3)
+        with pytest.raises(WorkerMemoryExceeded):
+            pool.call(allocate, 1024)
+        with pytest.raises(ValueError, match="bad input"):
+            pool.call(fail, "bad input")
+        assert pool.call(allocate, 16) == 16 * 2 ** 20
+
+
+def test_workers_recycled_after_max_tasks():
+    """Test that a worker is replaced after max_tasks tasks."""
+    with WorkerPool(1, WorkerLimits(max_tasks=2), FORK) as pool:
+        pids = [pool.call(nap, 0) for _ in range(5)]
+    assert len(set(pids)) == 3
+    assert pids[0] == pids[1] != pids[2]
+    assert pool.stats["recycled"] == 2
+
+
+def test_parse_timeouts():
+    """Test per-stage timeout specs."""
+    assert parse_timeouts("90") == {"document": 90}
+    assert parse_timeouts("layout=120, ocr=2.5") == {"layout": 120, "ocr": 2.5}
+    with pytest.raises(ValueError, match="Unknown timeout stage"):
+        parse_timeouts("raster=3")
+    with pytest.raises(ValueError):
+        parse_timeouts("ocr=-1")